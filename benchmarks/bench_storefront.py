@@ -0,0 +1,239 @@
+"""
+Request-level benchmarks for the storefront hot paths.
+"""
+
+import json
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+import stripe
+from django.contrib.sessions.backends.db import SessionStore
+from django.db.models import Count
+from django.template.loader import render_to_string
+from django.test import Client, RequestFactory
+from django.urls import reverse
+
+from catalog.models import Category, Product
+from checkout.cart import get_cart, line_key
+from checkout.models import Cart, CartItem, CheckoutSession
+from orders.models import Order
+from shipping.models import ShippingZone
+from shipping.services import ShippingCalculator
+
+HX = {'HTTP_HX_REQUEST': 'true'}
+
+# Shoppers and lines per shopper in each round of bench_anonymous_cart_add
+ANONYMOUS_CARTS = 10
+ANONYMOUS_CART_LINES = 5
+
+
+@pytest.fixture
+def products(db):
+    return list(
+        Product.objects.filter(is_active=True, sku__startswith='bench-').order_by('pk')[:20]
+    )
+
+
+@pytest.fixture
+def customer(db):
+    """
+    The generated customer with the most orders.
+    """
+    row = Order.objects.values('user').annotate(total=Count('id')).order_by('-total', 'user').first()
+    return Order.objects.filter(user_id=row['user']).first().user
+
+
+@pytest.fixture
+def customer_client(client, customer):
+    client.force_login(customer)
+    return client
+
+
+@pytest.fixture
+def cart(customer, products):
+    cart = Cart.objects.filter(user=customer).first() or Cart.objects.create(user=customer)
+    cart.items.all().delete()
+    return cart
+
+
+def fill_cart(cart, products, count=3):
+    cart.items.all().delete()
+    keys = []
+    for product in products[:count]:
+        variant = product.variants.first()
+        CartItem.objects.create(cart=cart, product=product, variant=variant, quantity=1)
+        keys.append(line_key(product.pk, variant.pk if variant else None))
+    return keys
+
+
+def get_ok(client, url, **extra):
+    response = client.get(url, **extra)
+    assert response.status_code == 200, response.status_code
+    return response
+
+
+def bench_home(benchmark, client):
+    benchmark(lambda: get_ok(client, reverse('catalog:home')))
+
+
+def bench_product_list_page_1(benchmark, client):
+    benchmark(lambda: get_ok(client, reverse('catalog:products')))
+
+
+def bench_product_list_page_500(benchmark, client):
+    url = f"{reverse('catalog:products')}?page=500"
+    benchmark(lambda: get_ok(client, url))
+
+
+def bench_product_detail(benchmark, client, products):
+    slug = products[0].safe_translation_getter('slug', any_language=True)
+    url = reverse('catalog:product_detail', args=[slug])
+    benchmark(lambda: get_ok(client, url))
+
+
+def bench_category_list(benchmark, client):
+    assert Category.objects.exists()
+    benchmark(lambda: get_ok(client, reverse('catalog:categories')))
+
+
+def bench_cart_add(benchmark, customer_client, cart, products):
+    candidates = iter(products)
+
+    def add(product):
+        response = customer_client.post(
+            reverse('checkout:add_to_cart', args=[product.pk]), {'quantity': 1}, **HX
+        )
+        assert response.status_code == 200
+
+    benchmark(add, setup=lambda: {'product': next(candidates)})
+
+
+@pytest.mark.parametrize('backend', ['database', 'redis'])
+def bench_anonymous_cart_add(benchmark, backend, products, settings):
+    """
+    A burst of add-to-cart requests from anonymous shoppers, one cart each.
+    """
+    if backend == 'redis':
+        if 'redis' not in settings.CACHES:
+            pytest.skip('Set BENCHMARK_REDIS_URL to benchmark Redis carts')
+        settings.CART_ANONYMOUS_BACKEND = 'checkout.cart.RedisCartBackend'
+        settings.CART_REDIS_CACHE = 'redis'
+    else:
+        settings.CART_ANONYMOUS_BACKEND = 'checkout.cart.DatabaseCartBackend'
+
+    def burst(clients):
+        for client in clients:
+            for product in products[:ANONYMOUS_CART_LINES]:
+                response = client.post(
+                    reverse('checkout:add_to_cart', args=[product.pk]), {'quantity': 1}, **HX
+                )
+                assert response.status_code == 200
+        assert response.json()['cart_count'] == ANONYMOUS_CART_LINES
+
+    benchmark(burst, setup=lambda: {'clients': [Client() for _ in range(ANONYMOUS_CARTS)]})
+
+
+def bench_cart_update(benchmark, customer_client, cart, products):
+    def update(key):
+        response = customer_client.post(
+            reverse('checkout:update_cart', args=[key]), {'quantity': 3}, **HX
+        )
+        assert response.status_code == 200
+
+    benchmark(update, setup=lambda: {'key': fill_cart(cart, products)[0]})
+
+
+def bench_cart_remove(benchmark, customer_client, cart, products):
+    def remove(key):
+        response = customer_client.post(reverse('checkout:remove_from_cart', args=[key]), **HX)
+        assert response.status_code == 200
+
+    benchmark(remove, setup=lambda: {'key': fill_cart(cart, products)[0]})
+
+
+def bench_cart_drawer_render(benchmark, customer, cart, products):
+    fill_cart(cart, products, count=5)
+    request = RequestFactory().get('/')
+    request.user = customer
+    request.session = SessionStore()
+    request.session.save()
+
+    def render():
+        request.__dict__.pop('_cart', None)
+        return render_to_string('base/cart_drawer.html', {'cart': get_cart(request)}, request=request)
+
+    benchmark(render)
+
+
+def bench_checkout_post(benchmark, customer_client, cart, products, monkeypatch):
+    sessions = iter(range(1, 1000))
+    monkeypatch.setattr(
+        stripe.checkout.Session, 'create',
+        lambda **kwargs: SimpleNamespace(id=f'cs_test_bench_{next(sessions)}'),
+    )
+
+    def checkout():
+        response = customer_client.post(reverse('checkout:checkout'))
+        assert response.status_code == 200, response.content
+        assert 'sessionId' in response.json()
+
+    benchmark(checkout, setup=lambda: fill_cart(cart, products) and {})
+
+
+def bench_order_list(benchmark, customer_client):
+    benchmark(lambda: get_ok(customer_client, reverse('orders:list')))
+
+
+def bench_order_detail(benchmark, customer_client, customer):
+    order = Order.objects.filter(user=customer).order_by('-item_count', 'pk').first()
+    benchmark(lambda: get_ok(customer_client, reverse('orders:detail', args=[order.pk])))
+
+
+@pytest.mark.skipif(
+    not hasattr(CheckoutSession, 'shipping_address'),
+    reason='CheckoutSession has no shipping address to select a method for',
+)
+def bench_shipping_method_select(benchmark, customer_client, customer, cart, products):
+    fill_cart(cart, products)
+    session = customer_client.session
+    session.save()
+    CheckoutSession.objects.create(
+        user=customer,
+        session_key=session.session_key,
+        email=customer.email,
+        shipping_address=customer.shipping_addresses.filter(is_default=True).first(),
+    )
+    benchmark(lambda: get_ok(customer_client, reverse('shipping:select_method')))
+
+
+def bench_shipping_quote(benchmark):
+    zone = ShippingZone.objects.filter(name__startswith='bench ').order_by('pk').first()
+    destinations = [
+        (country, Decimal(weight), Decimal(total))
+        for country in zone.countries
+        for weight, total in [('0.5', '20'), ('4', '150'), ('30', '900')]
+    ]
+
+    def quote():
+        for country, weight, total in destinations:
+            calculator = ShippingCalculator(country, weight=weight, order_total=total)
+            assert calculator.get_available_rates()
+
+    benchmark(quote)
+
+
+def bench_shipping_quote_batch(benchmark, client):
+    countries = ShippingZone.objects.filter(name__startswith='bench ').values_list('countries', flat=True)
+    payload = json.dumps({'destinations': [
+        {'country': country, 'weight': weight, 'order_total': total}
+        for zone_countries in countries
+        for country in zone_countries
+        for weight, total in [('0.5', '20'), ('4', '150'), ('30', '900'), ('80', '40')]
+    ]})
+
+    def quote():
+        response = client.post(reverse('shipping:quotes'), payload, content_type='application/json')
+        assert response.status_code == 200, response.content
+
+    benchmark(quote)
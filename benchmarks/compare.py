@@ -0,0 +1,69 @@
+"""
+Compare two benchmark result files written with ``--bench-json``.
+
+    python benchmarks/compare.py baseline.json current.json [--threshold 10]
+
+Exits with status 1 when any benchmark issues more queries than before or its
+median time grows by more than the threshold percentage.
+"""
+
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path) as handle:
+        return json.load(handle)
+
+
+def compare(baseline, current, threshold):
+    rows = []
+    regressions = 0
+    for name in sorted(set(baseline['results']) | set(current['results'])):
+        before = baseline['results'].get(name)
+        after = current['results'].get(name)
+        if before is None or after is None:
+            rows.append((name, before, after, None, 'added' if before is None else 'removed'))
+            continue
+
+        change = (after['median_ms'] - before['median_ms']) / before['median_ms'] * 100
+        flags = []
+        if after['queries'] > before['queries']:
+            flags.append('queries')
+        if change > threshold:
+            flags.append('time')
+        regressions += bool(flags)
+        rows.append((name, before, after, change, ', '.join(flags)))
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('baseline')
+    parser.add_argument('current')
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help='Allowed median slowdown in percent')
+    args = parser.parse_args(argv)
+
+    baseline = load(args.baseline)
+    current = load(args.current)
+    if baseline['meta'].get('database') != current['meta'].get('database'):
+        print('warning: results come from different databases', file=sys.stderr)
+
+    rows, regressions = compare(baseline, current, args.threshold)
+    print(f"{'name':<32}{'before ms':>12}{'after ms':>12}{'change':>10}{'queries':>12}  regression")
+    for name, before, after, change, flags in rows:
+        if change is None:
+            print(f'{name:<32}{"":>46}  {flags}')
+            continue
+        queries = f"{before['queries']}->{after['queries']}"
+        print(
+            f"{name:<32}{before['median_ms']:>12.2f}{after['median_ms']:>12.2f}"
+            f"{change:>+9.1f}%{queries:>12}  {flags}"
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
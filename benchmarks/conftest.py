@@ -0,0 +1,31 @@
+"""
+Fixtures for the request-level benchmark suite.
+
+The dataset is generated once per session with the ``generate_benchmark_data``
+command, so every benchmark runs against the same deterministic catalog.
+"""
+
+import pytest
+from django.core.management import call_command
+
+from .plugin import Benchmark, dataset_options
+
+
+@pytest.fixture(scope='session')
+def django_db_setup(django_db_setup, django_db_blocker, pytestconfig):
+    """
+    Build the benchmark dataset once, outside the per-test transactions.
+    """
+    with django_db_blocker.unblock():
+        call_command('generate_benchmark_data', verbosity=0, **dataset_options(pytestconfig))
+
+
+@pytest.fixture
+def benchmark(request, db):
+    """
+    Callable that records wall time and query counts under the test's name.
+    """
+    name = request.node.name
+    if name.startswith('bench_'):
+        name = name[len('bench_'):]
+    return Benchmark(name, request.config._bench_results, request.config.getoption('--bench-rounds'))
@@ -0,0 +1,131 @@
+"""
+pytest plugin for the request-level benchmark suite.
+
+Times each hot path over several rounds while counting the queries it issues.
+Results are printed at the end of the run and can be written to JSON with
+``--bench-json`` for comparison with ``benchmarks/compare.py``.
+"""
+
+import json
+import platform
+import statistics
+import subprocess
+import time
+from pathlib import Path
+
+import django
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('benchmarks')
+    group.addoption('--bench-json', default=None, help='Write benchmark results to this JSON file')
+    group.addoption('--bench-rounds', type=int, default=5, help='Timed rounds per benchmark')
+    group.addoption('--bench-products', type=int, default=6200,
+                    help='Products in the generated dataset (page 500 needs ~6100)')
+    group.addoption('--bench-orders', type=int, default=2000, help='Orders in the generated dataset')
+    group.addoption('--bench-users', type=int, default=200, help='Users in the generated dataset')
+    group.addoption('--bench-seed', type=int, default=42)
+
+
+def pytest_configure(config):
+    config._bench_results = {}
+
+
+def dataset_options(config):
+    return {
+        'users': config.getoption('--bench-users'),
+        'categories': 20,
+        'products': config.getoption('--bench-products'),
+        'variants': 3,
+        'images': 2,
+        'carts': 50,
+        'orders': config.getoption('--bench-orders'),
+        'shipping_zones': 5,
+        'seed': config.getoption('--bench-seed'),
+    }
+
+
+class Benchmark:
+    def __init__(self, name, results, rounds):
+        self.name = name
+        self.results = results
+        self.rounds = rounds
+
+    def __call__(self, func, setup=None):
+        """
+        Time ``func`` over the configured rounds and return its last result.
+
+        ``setup`` runs before every round, outside the timed section, and its
+        return value is passed to ``func`` as keyword arguments.
+        """
+        timings = []
+        queries = []
+        result = None
+
+        # One untimed warm-up round fills the template, URL resolver and
+        # translation caches. Query budgets describe warm requests, so they
+        # are only logged while it runs.
+        with override_settings(QUERY_BUDGET_ACTION='log'):
+            func(**(setup() if setup else {}))
+
+        for _ in range(self.rounds):
+            kwargs = setup() if setup else {}
+            with CaptureQueriesContext(connection) as context:
+                started = time.perf_counter()
+                result = func(**kwargs)
+                elapsed = time.perf_counter() - started
+            timings.append(elapsed * 1000)
+            queries.append(len(context.captured_queries))
+
+        self.results[self.name] = {
+            'rounds': self.rounds,
+            'min_ms': round(min(timings), 3),
+            'median_ms': round(statistics.median(timings), 3),
+            'mean_ms': round(statistics.mean(timings), 3),
+            'max_ms': round(max(timings), 3),
+            'queries': max(queries),
+        }
+        return result
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    results = config._bench_results
+    if not results:
+        return
+    terminalreporter.section('benchmarks')
+    terminalreporter.write_line(f"{'name':<32}{'median ms':>12}{'min ms':>12}{'queries':>10}")
+    for name, result in sorted(results.items()):
+        terminalreporter.write_line(
+            f"{name:<32}{result['median_ms']:>12.2f}{result['min_ms']:>12.2f}{result['queries']:>10}"
+        )
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    path = config.getoption('--bench-json')
+    if not path or not config._bench_results:
+        return
+    payload = {
+        'meta': {
+            'revision': _git_revision(),
+            'database': connection.vendor,
+            'django': django.get_version(),
+            'python': platform.python_version(),
+            'dataset': dataset_options(config),
+        },
+        'results': config._bench_results,
+    }
+    Path(path).write_text(json.dumps(payload, indent=2, sort_keys=True) + '\n')
@@ -39,6 +39,9 @@ class ProductAdmin(TranslatableAdmin):
         ('Status', {
             'fields': ('is_active', 'featured')
         }),
+        ('Shipping', {
+            'fields': ('weight', ('length', 'width', 'height'))
+        }),
         ('SEO', {
             'fields': ('meta_title', 'meta_description'),
             'classes': ('collapse',)
@@ -0,0 +1,156 @@
+"""
+Product feeds for marketplaces (Google Shopping XML, CSV and JSONL).
+
+Feeds are generated from a chunked iterator over the active catalog so that
+memory use stays flat no matter how many products are exported.
+"""
+
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db.models import Prefetch
+from django.urls import reverse
+from django.utils import translation
+
+from ecommerce.streaming import buffered, csv_chunks, encode, gzip_chunks, jsonl_chunks
+from .models import Product, ProductVariant
+
+FEED_FORMATS = ('csv', 'jsonl', 'xml')
+
+FEED_CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+    'xml': 'application/xml',
+}
+
+FEED_FIELDS = [
+    'id', 'item_group_id', 'title', 'description', 'link', 'image_link',
+    'price', 'currency', 'availability', 'product_type', 'condition',
+]
+
+GOOGLE_NAMESPACE = 'http://base.google.com/ns/1.0'
+
+
+def get_feed_queryset():
+    """
+    Active products with everything a feed row needs loaded per chunk.
+    """
+    return Product.objects.filter(
+        is_active=True
+    ).select_related(
+        'category'
+    ).prefetch_related(
+        'translations',
+        'category__translations',
+        'images',
+        Prefetch(
+            'variants',
+            queryset=ProductVariant.objects.filter(is_active=True).order_by('pk')
+        ),
+    ).order_by('pk')
+
+
+def _absolute(base_url, url):
+    if not url or url.startswith(('http://', 'https://')):
+        return url
+    return f"{base_url.rstrip('/')}{url}"
+
+
+def iter_feed_items(language=None, base_url='', currency=None, chunk_size=2000):
+    """
+    Yield one feed item per active variant, or per product without variants.
+    """
+    language = language or translation.get_language() or settings.LANGUAGE_CODE
+    currency = currency or settings.CATALOG_FEED_CURRENCY
+
+    # Resolve the URL pattern once instead of reversing for every product
+    with translation.override(language):
+        link_template = reverse('catalog:product_detail', args=['__slug__'])
+
+    for product in get_feed_queryset().iterator(chunk_size=chunk_size):
+        images = product.images.all()
+        slug = product.safe_translation_getter('slug', language_code=language, any_language=True)
+        item = {
+            'item_group_id': product.sku,
+            'title': product.safe_translation_getter('name', language_code=language, any_language=True),
+            'description': product.safe_translation_getter('description', language_code=language, any_language=True),
+            'link': _absolute(base_url, link_template.replace('__slug__', slug or '')),
+            'image_link': _absolute(base_url, images[0].image.url) if images else '',
+            'currency': currency,
+            'product_type': product.category.safe_translation_getter(
+                'name', language_code=language, any_language=True
+            ),
+            'condition': 'new',
+        }
+
+        variants = product.variants.all()
+        if not variants:
+            yield {
+                **item,
+                'id': product.sku,
+                'price': f"{product.base_price:.2f}",
+                'availability': 'in stock',
+            }
+            continue
+
+        for variant in variants:
+            yield {
+                **item,
+                'id': variant.sku,
+                'title': f"{item['title']} - {variant.name}",
+                'price': f"{variant.price:.2f}",
+                'availability': 'in stock' if variant.stock_quantity > 0 else 'out of stock',
+            }
+
+
+def xml_chunks(items, title='', link=''):
+    """
+    Yield a Google Shopping RSS 2.0 feed, one <item> at a time.
+    """
+    yield (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<rss version="2.0" xmlns:g="{GOOGLE_NAMESPACE}">\n'
+        f'<channel>\n<title>{escape(title)}</title>\n<link>{escape(link)}</link>\n'
+    )
+    for item in items:
+        parts = ['<item>']
+        for field in FEED_FIELDS:
+            if field == 'currency':
+                continue
+            value = item.get(field)
+            if field == 'price':
+                value = f"{value} {item['currency']}"
+            if value:
+                parts.append(f'<g:{field}>{escape(str(value))}</g:{field}>')
+        parts.append('</item>\n')
+        yield ''.join(parts)
+    yield '</channel>\n</rss>\n'
+
+
+def render_feed(fmt, items, title='', link=''):
+    """
+    Format feed items as text chunks in the requested format.
+    """
+    if fmt == 'csv':
+        return csv_chunks(FEED_FIELDS, items)
+    if fmt == 'jsonl':
+        return jsonl_chunks(items)
+    if fmt == 'xml':
+        return xml_chunks(items, title=title, link=link)
+    raise ValueError(f"Unknown feed format: {fmt}")
+
+
+def stream_feed(fmt, compress=False, language=None, base_url='', currency=None, chunk_size=2000):
+    """
+    Return an iterator of byte chunks for the full catalog feed.
+    """
+    items = iter_feed_items(
+        language=language,
+        base_url=base_url,
+        currency=currency,
+        chunk_size=chunk_size,
+    )
+    chunks = encode(buffered(render_feed(fmt, items, title=settings.CATALOG_FEED_TITLE, link=base_url)))
+    if compress:
+        chunks = gzip_chunks(chunks)
+    return chunks
@@ -0,0 +1,46 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from catalog.feeds import FEED_FORMATS, stream_feed
+
+
+class Command(BaseCommand):
+    help = 'Export the active catalog as a CSV, JSONL or Google Shopping XML feed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=FEED_FORMATS, default='csv')
+        parser.add_argument('--output', default='-', help='File to write to, "-" for stdout')
+        parser.add_argument('--gzip', action='store_true', help='Compress the feed with gzip')
+        parser.add_argument('--language', default=None, help='Language code for translated fields')
+        parser.add_argument('--base-url', default='', help='Prefix for product and image links')
+        parser.add_argument('--currency', default=None)
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        chunks = stream_feed(
+            options['format'],
+            compress=options['gzip'],
+            language=options['language'],
+            base_url=options['base_url'],
+            currency=options['currency'],
+            chunk_size=options['chunk_size'],
+        )
+
+        if options['output'] == '-':
+            self._write(sys.stdout.buffer, chunks)
+            return
+
+        with open(options['output'], 'wb') as output:
+            written = self._write(output, chunks)
+        self.stdout.write(self.style.SUCCESS(
+            f"Exported catalog feed to {options['output']} ({written} bytes)"
+        ))
+
+    def _write(self, output, chunks):
+        written = 0
+        for chunk in chunks:
+            output.write(chunk)
+            written += len(chunk)
+        output.flush()
+        return written
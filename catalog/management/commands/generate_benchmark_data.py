@@ -0,0 +1,489 @@
+import multiprocessing
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.utils import timezone
+
+from catalog.models import Category, Product, ProductVariant, ProductImage
+from customers.models import CustomerProfile, Address
+from shipping.models import ShippingAddress, ShippingZone, ShippingMethod, ShippingRate
+from shipping.rates import invalidate_rate_table
+from checkout.models import Cart, CartItem
+from orders.models import Order, OrderItem
+
+User = get_user_model()
+
+WORDS = [
+    'alpine', 'amber', 'aqua', 'arctic', 'basic', 'bold', 'breeze', 'canyon', 'classic', 'cloud',
+    'coastal', 'comet', 'coral', 'crest', 'dawn', 'delta', 'desert', 'ember', 'echo', 'field',
+    'flint', 'forest', 'frost', 'glacier', 'harbor', 'horizon', 'iron', 'ivory', 'jade', 'lunar',
+    'maple', 'meadow', 'metro', 'mist', 'nova', 'oak', 'ocean', 'onyx', 'orbit', 'pearl',
+    'pine', 'prairie', 'quartz', 'rapid', 'ridge', 'river', 'sage', 'sierra', 'slate', 'solar',
+    'spruce', 'stone', 'storm', 'summit', 'terra', 'tide', 'timber', 'urban', 'valley', 'zen',
+]
+NOUNS = [
+    'backpack', 'blender', 'boots', 'camera', 'chair', 'desk', 'drone', 'headphones', 'jacket',
+    'kettle', 'lamp', 'mug', 'notebook', 'pan', 'phone case', 'rug', 'scarf', 'sneakers', 'speaker',
+    'tent', 'tablet stand', 'toaster', 'umbrella', 'wallet', 'watch',
+]
+VARIANT_NAMES = ['Red', 'Blue', 'Green', 'Black', 'White', 'Grey', 'S', 'M', 'L', 'XL']
+FIRST_NAMES = ['Alex', 'Sam', 'Jordan', 'Taylor', 'Casey', 'Morgan', 'Riley', 'Jamie', 'Avery', 'Quinn']
+LAST_NAMES = ['Smith', 'Garcia', 'Chen', 'Okafor', 'Novak', 'Silva', 'Kim', 'Moreau', 'Rossi', 'Berg']
+CITIES = [
+    ('Springfield', 'IL'), ('Portland', 'OR'), ('Austin', 'TX'), ('Denver', 'CO'), ('Madison', 'WI'),
+    ('Raleigh', 'NC'), ('Boise', 'ID'), ('Tucson', 'AZ'), ('Albany', 'NY'), ('Salem', 'MA'),
+]
+COUNTRIES = [
+    'US', 'CA', 'MX', 'GB', 'IE', 'FR', 'DE', 'NL', 'BE', 'ES', 'PT', 'IT', 'AT', 'CH', 'SE',
+    'NO', 'DK', 'FI', 'PL', 'CZ', 'JP', 'KR', 'CN', 'IN', 'AU', 'NZ', 'BR', 'AR', 'CL', 'ZA',
+]
+ORDER_STATUSES = ['pending', 'processing', 'shipped', 'delivered', 'cancelled']
+ORDER_STATUS_WEIGHTS = [10, 15, 20, 50, 5]
+
+# Populated once per process by _load_order_context()
+_ORDER_CONTEXT = {}
+
+
+def _rng(seed, section, chunk=0):
+    # String seeds are hashed deterministically, so every chunk is reproducible
+    # regardless of which process generates it.
+    return random.Random(f'{seed}:{section}:{chunk}')
+
+
+def _money(value):
+    return Decimal(value).quantize(Decimal('0.01'))
+
+
+def _chunks(total, size):
+    for start in range(0, total, size):
+        yield start // size, start, min(size, total - start)
+
+
+@contextmanager
+def _manual_timestamps(model, *field_names):
+    """
+    Let bulk_create keep explicit values for auto_now/auto_now_add fields.
+    """
+    fields = [model._meta.get_field(name) for name in field_names]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _address_text(rng, first_name, last_name):
+    city, state = rng.choice(CITIES)
+    return (
+        f"{first_name} {last_name}\n{rng.randint(1, 9999)} {rng.choice(WORDS).title()} St\n"
+        f"{city}, {state} {rng.randint(10000, 99999)}\nUS"
+    )
+
+
+def _load_order_context(prefix):
+    """
+    Load the user and catalog lookups order generation needs into this process.
+    """
+    connections.close_all()
+    variants = {}
+    for variant_id, product_id, price_override, name in ProductVariant.objects.filter(
+        product__sku__startswith=f'{prefix}-P'
+    ).order_by('id').values_list('id', 'product_id', 'price_override', 'name').iterator(chunk_size=10000):
+        variants.setdefault(product_id, []).append((variant_id, price_override, name))
+
+    names = dict(
+        Product._parler_meta.root_model.objects.filter(
+            master__sku__startswith=f'{prefix}-P', language_code='en'
+        ).values_list('master_id', 'name').iterator(chunk_size=10000)
+    )
+    images = dict(
+        ProductImage.objects.filter(
+            product__sku__startswith=f'{prefix}-P', is_primary=True
+        ).values_list('product_id', 'image').iterator(chunk_size=10000)
+    )
+
+    _ORDER_CONTEXT['users'] = list(
+        User.objects.filter(username__startswith=f'{prefix}_user_').order_by('id').values_list(
+            'id', 'email', 'first_name', 'last_name'
+        )
+    )
+    _ORDER_CONTEXT['products'] = [
+        (product_id, base_price, names.get(product_id, ''), images.get(product_id, ''), variants.get(product_id, []))
+        for product_id, base_price in Product.objects.filter(
+            sku__startswith=f'{prefix}-P'
+        ).order_by('id').values_list('id', 'base_price').iterator(chunk_size=10000)
+    ]
+
+
+def _generate_order_chunk(task):
+    """
+    Create one batch of orders and their items. Runs in worker processes.
+    """
+    chunk, count, options = task
+    rng = _rng(options['seed'], 'orders', chunk)
+    users = _ORDER_CONTEXT['users']
+    products = _ORDER_CONTEXT['products']
+    now = timezone.now()
+    span = options['days'] * 86400
+
+    orders = []
+    lines = []
+    for _ in range(count):
+        user_id, email, first_name, last_name = rng.choice(users)
+        created_at = now - timedelta(seconds=rng.randint(0, span))
+        address = _address_text(rng, first_name, last_name)
+        items = []
+        subtotal = Decimal('0')
+        for product_id, base_price, name, image, variants in rng.sample(products, min(len(products), rng.randint(1, options['items_per_order']))):
+            variant_id, price_override, variant_name = rng.choice(variants) if variants else (None, None, '')
+            price = price_override or base_price
+            quantity = rng.randint(1, 3)
+            subtotal += price * quantity
+            items.append((product_id, variant_id, name, variant_name, image, quantity, price))
+
+        tax = _money(subtotal * Decimal('0.10'))
+        shipping_cost = Decimal('10.00')
+        orders.append(Order(
+            user_id=user_id,
+            status=rng.choices(ORDER_STATUSES, ORDER_STATUS_WEIGHTS)[0],
+            email=email,
+            shipping_address=address,
+            billing_address=address,
+            currency='USD',
+            subtotal=subtotal,
+            shipping_cost=shipping_cost,
+            tax=tax,
+            total=subtotal + tax + shipping_cost,
+            stripe_payment_intent=f'pi_{rng.getrandbits(96):024x}',
+            created_at=created_at,
+            updated_at=created_at,
+            item_count=sum(item[5] for item in items),
+            line_count=len(items),
+            first_item_name=items[0][2],
+            first_item_thumbnail=items[0][4],
+        ))
+        lines.append(items)
+
+    with transaction.atomic(), _manual_timestamps(Order, 'created_at', 'updated_at'):
+        Order.objects.bulk_create(orders, batch_size=options['batch_size'])
+        order_items = [
+            OrderItem(
+                order_id=order.pk,
+                product_id=product_id,
+                variant_id=variant_id,
+                product_name=name,
+                variant_name=variant_name,
+                quantity=quantity,
+                price=price,
+                currency='USD',
+            )
+            for order, items in zip(orders, lines)
+            for product_id, variant_id, name, variant_name, _image, quantity, price in items
+        ]
+        OrderItem.objects.bulk_create(order_items, batch_size=options['batch_size'])
+
+    return len(orders), len(order_items)
+
+
+class Command(BaseCommand):
+    help = 'Generate a large, deterministic dataset for load testing and benchmarks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=30)
+        parser.add_argument('--category-depth', type=int, default=2, help='Levels in the category tree')
+        parser.add_argument('--products', type=int, default=10000)
+        parser.add_argument('--variants', type=int, default=3, help='Maximum variants per product')
+        parser.add_argument('--images', type=int, default=2, help='Images per product')
+        parser.add_argument('--carts', type=int, default=1000)
+        parser.add_argument('--orders', type=int, default=10000)
+        parser.add_argument('--items-per-order', type=int, default=4, help='Maximum lines per order')
+        parser.add_argument('--shipping-zones', type=int, default=5)
+        parser.add_argument('--days', type=int, default=365, help='Spread order dates over this many days')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--workers', type=int, default=1, help='Processes used to generate orders')
+        parser.add_argument('--prefix', default='bench', help='Prefix for usernames, SKUs and slugs')
+
+    def handle(self, *args, **options):
+        if options['category_depth'] < 1:
+            raise CommandError('--category-depth must be at least 1')
+        if options['categories'] < options['category_depth']:
+            raise CommandError('--categories must be at least --category-depth')
+        if options['orders'] and not (options['users'] and options['products']):
+            raise CommandError('Generating orders needs at least one user and one product')
+
+        prefix = options['prefix']
+        if Product.objects.filter(sku__startswith=f'{prefix}-').exists():
+            raise CommandError(f'Benchmark data with prefix "{prefix}" already exists')
+
+        started = time.monotonic()
+        self.step('users', self.create_users, options)
+        self.step('categories', self.create_categories, options)
+        self.step('products', self.create_products, options)
+        self.step('shipping', self.create_shipping, options)
+        self.step('carts', self.create_carts, options)
+        self.step('orders', self.create_orders, options)
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated benchmark data in {time.monotonic() - started:.1f}s'
+        ))
+
+    def step(self, name, func, options):
+        started = time.monotonic()
+        result = func(options)
+        self.stdout.write(f'  {name}: {result} in {time.monotonic() - started:.1f}s')
+
+    def create_users(self, options):
+        prefix = options['prefix']
+        rng = _rng(options['seed'], 'users')
+        password = make_password('password123')
+
+        for _, start, count in _chunks(options['users'], options['batch_size']):
+            users = []
+            for i in range(start, start + count):
+                users.append(User(
+                    username=f'{prefix}_user_{i}',
+                    email=f'{prefix}_user_{i}@example.com',
+                    password=password,
+                    first_name=rng.choice(FIRST_NAMES),
+                    last_name=rng.choice(LAST_NAMES),
+                ))
+
+            with transaction.atomic():
+                User.objects.bulk_create(users)
+                CustomerProfile.objects.bulk_create([CustomerProfile(user=user) for user in users])
+                addresses = []
+                for user in users:
+                    city, state = rng.choice(CITIES)
+                    for address_type in ['shipping', 'billing']:
+                        addresses.append(Address(
+                            user=user,
+                            type=address_type,
+                            is_default=True,
+                            first_name=user.first_name,
+                            last_name=user.last_name,
+                            address1=f'{rng.randint(1, 9999)} {rng.choice(WORDS).title()} St',
+                            city=city,
+                            state=state,
+                            postal_code=str(rng.randint(10000, 99999)),
+                            country='US',
+                        ))
+                Address.objects.bulk_create(addresses)
+                ShippingAddress.objects.bulk_create([
+                    ShippingAddress(
+                        user=address.user,
+                        first_name=address.first_name,
+                        last_name=address.last_name,
+                        address_line1=address.address1,
+                        city=address.city,
+                        state=address.state,
+                        country=address.country,
+                        postal_code=address.postal_code,
+                        is_default=True,
+                    )
+                    for address in addresses if address.type == 'shipping'
+                ])
+
+        return f"{options['users']} users"
+
+    def create_categories(self, options):
+        prefix = options['prefix']
+        rng = _rng(options['seed'], 'categories')
+        depth = options['category_depth']
+        translation_model = Category._parler_meta.root_model
+
+        # Spread categories across the levels, each level hanging off the previous one
+        per_level = [options['categories'] // depth] * depth
+        per_level[0] += options['categories'] % depth
+        parents = [None]
+        number = 0
+        for level_size in per_level:
+            with transaction.atomic():
+                level = Category.objects.bulk_create([
+                    Category(parent=rng.choice(parents), is_active=True)
+                    for _ in range(level_size)
+                ])
+                translations = []
+                for category in level:
+                    name = f'{rng.choice(WORDS).title()} {rng.choice(NOUNS).title()}s'
+                    translations.append(translation_model(
+                        master_id=category.pk,
+                        language_code='en',
+                        name=name,
+                        slug=f'{prefix}-category-{number}',
+                    ))
+                    number += 1
+                translation_model.objects.bulk_create(translations)
+            parents = level
+
+        return f"{options['categories']} categories over {depth} levels"
+
+    def create_products(self, options):
+        prefix = options['prefix']
+        translation_model = Product._parler_meta.root_model
+        category_ids = list(
+            Category.objects.filter(
+                translations__slug__startswith=f'{prefix}-'
+            ).order_by('id').values_list('id', flat=True)
+        )
+        variant_total = 0
+
+        for chunk, start, count in _chunks(options['products'], options['batch_size']):
+            rng = _rng(options['seed'], 'products', chunk)
+            products = [
+                Product(
+                    category_id=rng.choice(category_ids),
+                    base_price=_money(rng.uniform(5, 500)),
+                    sku=f'{prefix}-P{i:08d}',
+                    is_active=rng.random() > 0.02,
+                    featured=rng.random() < 0.05,
+                    weight=Decimal(rng.randint(50, 20000)) / 1000,
+                    length=Decimal(rng.randint(5, 80)),
+                    width=Decimal(rng.randint(5, 60)),
+                    height=Decimal(rng.randint(1, 40)),
+                )
+                for i in range(start, start + count)
+            ]
+
+            with transaction.atomic():
+                Product.objects.bulk_create(products)
+                translations = []
+                variants = []
+                images = []
+                for i, product in enumerate(products, start=start):
+                    name = f'{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {rng.choice(NOUNS).title()}'
+                    translations.append(translation_model(
+                        master_id=product.pk,
+                        language_code='en',
+                        name=name,
+                        slug=f'{prefix}-product-{i}',
+                        description=f'{name} made for everyday use.',
+                    ))
+                    if options['variants']:
+                        names = rng.sample(VARIANT_NAMES, min(len(VARIANT_NAMES), rng.randint(1, options['variants'])))
+                        for n, variant_name in enumerate(names):
+                            variants.append(ProductVariant(
+                                product_id=product.pk,
+                                name=variant_name,
+                                sku=f'{product.sku}-{n}',
+                                price_override=_money(product.base_price + Decimal(rng.randint(0, 2000)) / 100) if rng.random() < 0.3 else None,
+                                stock_quantity=rng.randint(0, 200),
+                                weight=product.weight * Decimal('1.5') if rng.random() < 0.2 else None,
+                            ))
+                    for n in range(options['images']):
+                        images.append(ProductImage(
+                            product_id=product.pk,
+                            image=f'products/{prefix}-{rng.randint(1, 50)}.jpg',
+                            alt_text=name,
+                            is_primary=n == 0,
+                        ))
+                translation_model.objects.bulk_create(translations)
+                ProductVariant.objects.bulk_create(variants)
+                ProductImage.objects.bulk_create(images)
+                variant_total += len(variants)
+
+        return f"{options['products']} products, {variant_total} variants"
+
+    def create_shipping(self, options):
+        prefix = options['prefix']
+        rng = _rng(options['seed'], 'shipping')
+        zones = options['shipping_zones']
+        methods = []
+        rates = []
+
+        with transaction.atomic():
+            for i in range(zones):
+                countries = COUNTRIES[i::zones] if zones <= len(COUNTRIES) else [COUNTRIES[i % len(COUNTRIES)]]
+                zone = ShippingZone.objects.create(
+                    name=f'{prefix} zone {i}',
+                    countries=countries,
+                    description=f'Benchmark zone {i}',
+                )
+                for method_name, days, base in [('Standard', 7, 5), ('Express', 3, 12), ('Next Day', 1, 25)]:
+                    method = ShippingMethod(
+                        name=f'{prefix} {method_name} {i}',
+                        calculation_type=rng.choice(['flat', 'weight']),
+                        estimated_days=days,
+                    )
+                    methods.append(method)
+                    rates.append((method, zone, base))
+
+            ShippingMethod.objects.bulk_create(methods)
+            ShippingRate.objects.bulk_create([
+                ShippingRate(
+                    shipping_method=method,
+                    shipping_zone=zone,
+                    base_rate=_money(base + rng.uniform(0, 5)),
+                    weight_rate=_money(rng.uniform(0.5, 3)),
+                    max_weight=Decimal('50.00'),
+                )
+                for method, zone, base in rates
+            ])
+        invalidate_rate_table()
+
+        return f'{zones} zones, {len(rates)} rates'
+
+    def create_carts(self, options):
+        prefix = options['prefix']
+        products = list(
+            Product.objects.filter(sku__startswith=f'{prefix}-').order_by('id').values_list('id', flat=True)[:5000]
+        )
+        item_total = 0
+
+        for chunk, start, count in _chunks(options['carts'], options['batch_size']):
+            rng = _rng(options['seed'], 'carts', chunk)
+            with transaction.atomic():
+                carts = Cart.objects.bulk_create([
+                    Cart(session_key=f'{prefix}{i:036d}'[-40:]) for i in range(start, start + count)
+                ])
+                items = [
+                    CartItem(cart_id=cart.pk, product_id=product_id, quantity=rng.randint(1, 3))
+                    for cart in carts
+                    for product_id in rng.sample(products, min(len(products), rng.randint(1, 4)))
+                ]
+                CartItem.objects.bulk_create(items)
+                item_total += len(items)
+
+        return f"{options['carts']} carts, {item_total} items"
+
+    def create_orders(self, options):
+        workers = options['workers']
+        if workers > 1 and connection.vendor == 'sqlite':
+            self.stdout.write(self.style.WARNING('SQLite cannot take concurrent writers, using one worker'))
+            workers = 1
+
+        prefix = options['prefix']
+        task_options = {
+            'seed': options['seed'],
+            'days': options['days'],
+            'items_per_order': options['items_per_order'],
+            'batch_size': options['batch_size'],
+        }
+        tasks = [
+            (chunk, count, task_options)
+            for chunk, _, count in _chunks(options['orders'], options['batch_size'])
+        ]
+
+        if workers > 1:
+            # Children must open their own connections rather than share the parent's
+            connections.close_all()
+            context = multiprocessing.get_context('fork')
+            with context.Pool(workers, initializer=_load_order_context, initargs=(prefix,)) as pool:
+                results = list(pool.imap_unordered(_generate_order_chunk, tasks))
+        else:
+            _load_order_context(prefix)
+            results = [_generate_order_chunk(task) for task in tasks]
+
+        orders = sum(result[0] for result in results)
+        items = sum(result[1] for result in results)
+        return f'{orders} orders, {items} items'
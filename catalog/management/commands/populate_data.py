@@ -206,4 +206,5 @@ class Command(BaseCommand):
                 order.subtotal = subtotal
                 order.tax = tax
                 order.total = total
+                order.refresh_summary(save=False)
                 order.save()
\ No newline at end of file
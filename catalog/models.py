@@ -41,6 +41,11 @@ class Product(TranslatableModel):
     sku = models.CharField(_("SKU"), max_length=50, unique=True)
     is_active = models.BooleanField(_("Active"), default=True)
     featured = models.BooleanField(_("Featured"), default=False)
+    # Shipping weight in kg and packed dimensions in cm
+    weight = models.DecimalField(_("Weight"), max_digits=8, decimal_places=3, default=0, validators=[MinValueValidator(0)])
+    length = models.DecimalField(_("Length"), max_digits=8, decimal_places=2, default=0, validators=[MinValueValidator(0)])
+    width = models.DecimalField(_("Width"), max_digits=8, decimal_places=2, default=0, validators=[MinValueValidator(0)])
+    height = models.DecimalField(_("Height"), max_digits=8, decimal_places=2, default=0, validators=[MinValueValidator(0)])
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -55,6 +60,19 @@ class Product(TranslatableModel):
     def get_absolute_url(self):
         return reverse('catalog:product_detail', args=[self.slug])
 
+    @property
+    def shipping_weight(self):
+        return self.weight
+
+    @property
+    def dimensions(self):
+        return (self.length, self.width, self.height)
+
+    @property
+    def volume(self):
+        length, width, height = self.dimensions
+        return length * width * height
+
 
 class ProductImage(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='images')
@@ -77,6 +95,11 @@ class ProductVariant(models.Model):
     price_override = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     stock_quantity = models.PositiveIntegerField(default=0)
     is_active = models.BooleanField(default=True)
+    # Blank uses the product's weight and dimensions
+    weight = models.DecimalField(max_digits=8, decimal_places=3, null=True, blank=True, validators=[MinValueValidator(0)])
+    length = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True, validators=[MinValueValidator(0)])
+    width = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True, validators=[MinValueValidator(0)])
+    height = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True, validators=[MinValueValidator(0)])
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -89,3 +112,19 @@ class ProductVariant(models.Model):
     @property
     def price(self):
         return self.price_override if self.price_override else self.product.base_price
+
+    @property
+    def shipping_weight(self):
+        return self.weight if self.weight is not None else self.product.weight
+
+    @property
+    def dimensions(self):
+        return tuple(
+            own if own is not None else inherited
+            for own, inherited in zip((self.length, self.width, self.height), self.product.dimensions)
+        )
+
+    @property
+    def volume(self):
+        length, width, height = self.dimensions
+        return length * width * height
@@ -1,4 +1,4 @@
-from django.urls import path
+from django.urls import path, re_path
 from . import views
 
 app_name = 'catalog'
@@ -9,4 +9,5 @@ urlpatterns = [
     path('products/<slug:category_slug>/', views.ProductListView.as_view(), name='category_products'),
     path('product/<slug:product_slug>/', views.ProductDetailView.as_view(), name='product_detail'),
     path('categories/', views.CategoryListView.as_view(), name='categories'),
+    re_path(r'^feeds/catalog\.(?P<fmt>csv|jsonl|xml)(?P<compressed>\.gz)?$', views.catalog_feed, name='catalog_feed'),
 ]
\ No newline at end of file
@@ -1,7 +1,18 @@
+import logging
+
 from django.shortcuts import render, get_object_or_404
 from django.views.generic import ListView, DetailView
 from django.db.models import Prefetch
+from django.http import Http404, StreamingHttpResponse, HttpResponseForbidden
+from django.conf import settings
+from django.utils.crypto import constant_time_compare
+from django.utils.translation import gettext as _
 from .models import Product, Category, ProductVariant
+from .feeds import FEED_CONTENT_TYPES, stream_feed
+from ecommerce.streaming import bearer_token
+from shipping.delivery import delivery_estimates, shopper_country
+
+logger = logging.getLogger(__name__)
 
 class ProductListView(ListView):
     model = Product
@@ -15,7 +26,7 @@ class ProductListView(ListView):
         
         if category_slug:
             # Get the category using translated slug
-            category = Category.objects.translated(slug=category_slug).first()
+            category = Category.objects.active_translations(slug=category_slug).distinct().first()
             if category:
                 queryset = queryset.filter(category=category)
         
@@ -28,6 +39,14 @@ class ProductListView(ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['categories'] = Category.objects.all()
+        # Same for every card on the page: the fastest method's arrival date
+        try:
+            estimates = delivery_estimates(shopper_country(self.request))
+        except Exception:
+            # An estimate is a nicety; the catalog must render without one
+            logger.exception('Delivery estimates failed')
+            estimates = []
+        context['delivery_estimate'] = estimates[0] if estimates else None
         return context
 
 class ProductDetailView(DetailView):
@@ -42,14 +61,15 @@ class ProductDetailView(DetailView):
         
         slug = self.kwargs.get(self.slug_url_kwarg)
         if slug is not None:
-            # Get the product using translated slug
-            product = Product.objects.translated(slug=slug).prefetch_related(
+            # Get the product using translated slug, falling back to the default language
+            product = Product.objects.active_translations(slug=slug).prefetch_related(
                 'variants',
                 'images',
                 'category'
-            ).first()
+            ).distinct().first()
             if product:
                 return product
+            raise Http404(_("No product found matching the query"))
         
         return super().get_object(queryset)
 
@@ -69,7 +89,8 @@ class CategoryListView(ListView):
         return super().get_queryset().prefetch_related(
             Prefetch(
                 'products',
-                queryset=Product.objects.filter(is_active=True)[:4]
+                queryset=Product.objects.filter(is_active=True)[:4],
+                to_attr='featured_products'
             )
         )
 
@@ -113,3 +134,30 @@ def home(request):
         'new_arrivals': new_arrivals,
         'categories': categories,
     })
+
+def _feed_authorized(request):
+    if request.user.is_authenticated and request.user.is_staff:
+        return True
+    token = settings.CATALOG_FEED_TOKEN
+    if not token:
+        return False
+    supplied = bearer_token(request)
+    return bool(supplied) and constant_time_compare(supplied, token)
+
+def catalog_feed(request, fmt, compressed=None):
+    # Marketplaces authenticate with a bearer token, staff can use their session
+    if not _feed_authorized(request):
+        return HttpResponseForbidden()
+
+    compress = bool(compressed)
+    response = StreamingHttpResponse(
+        stream_feed(
+            fmt,
+            compress=compress,
+            base_url=request.build_absolute_uri('/'),
+        ),
+        content_type='application/gzip' if compress else FEED_CONTENT_TYPES[fmt],
+    )
+    filename = f"catalog.{fmt}.gz" if compress else f"catalog.{fmt}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
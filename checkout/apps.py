@@ -5,3 +5,6 @@ class CheckoutConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'checkout'
     verbose_name = 'Checkout'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,443 @@
+"""
+The shopping cart.
+
+Views and templates talk to a ``ShoppingCart``, which keeps the lines as a
+mapping of (product id, variant id) to quantity in a storage backend and
+loads the products and variants for display in a fixed number of queries.
+Backends are chosen by the CART_BACKEND and CART_ANONYMOUS_BACKEND settings,
+so anonymous carts can live somewhere cheaper than the database; whatever
+they use, a cart is promoted to the database backend when its owner logs in
+or checks out.
+"""
+
+import secrets
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import IntegrityError, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Least
+from django.utils.module_loading import import_string
+from django_redis import get_redis_connection
+
+from catalog.models import Product, ProductVariant
+from .models import Cart, CartItem
+
+SESSION_KEY = 'cart_id'
+TOKEN_SESSION_KEY = 'cart_token'
+
+DEFAULT_CURRENCY = 'USD'
+
+# HINCRBY that stops at CART_MAX_LINE_QUANTITY, refreshing the TTL
+ADD_LINE = """
+local quantity = redis.call('HINCRBY', KEYS[1], ARGV[1], ARGV[2])
+if quantity > tonumber(ARGV[3]) then
+    redis.call('HSET', KEYS[1], ARGV[1], ARGV[3])
+end
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return 1
+"""
+
+# HSET that leaves missing lines alone, refreshing the TTL when it writes
+SET_EXISTING_LINE = """
+if redis.call('HEXISTS', KEYS[1], ARGV[1]) == 0 then
+    return 0
+end
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return 1
+"""
+
+
+def line_key(product_id, variant_id=None):
+    return f'{product_id}-{variant_id or 0}'
+
+
+def parse_line_key(key):
+    """
+    (product_id, variant_id) for a line key, or None if it is malformed.
+    """
+    try:
+        product_id, variant_id = (int(part) for part in str(key).split('-'))
+    except ValueError:
+        return None
+    return product_id, variant_id or None
+
+
+def merge_lines(cart, lines):
+    """
+    Add ``lines`` ({(product_id, variant_id): quantity}) to a Cart's items.
+    Lines whose product or variant no longer exists are dropped.
+    """
+    product_ids = set(Product.objects.filter(
+        id__in={product_id for product_id, _ in lines}
+    ).values_list('id', flat=True))
+    variant_ids = set(ProductVariant.objects.filter(
+        id__in={variant_id for _, variant_id in lines if variant_id}
+    ).values_list('id', flat=True))
+
+    with transaction.atomic():
+        current = {
+            (item.product_id, item.variant_id): item
+            for item in cart.items.select_for_update()
+        }
+        updated, new_items = [], []
+        for (product_id, variant_id), quantity in lines.items():
+            if product_id not in product_ids or (variant_id and variant_id not in variant_ids):
+                continue
+            match = current.get((product_id, variant_id))
+            if match is not None:
+                match.quantity = min(match.quantity + quantity, settings.CART_MAX_LINE_QUANTITY)
+                updated.append(match)
+            else:
+                new_items.append(CartItem(
+                    cart=cart, product_id=product_id, variant_id=variant_id,
+                    quantity=min(quantity, settings.CART_MAX_LINE_QUANTITY),
+                ))
+        CartItem.objects.bulk_update(updated, ['quantity'])
+        CartItem.objects.bulk_create(new_items)
+
+
+def _user_cart(user):
+    return Cart.objects.filter(user=user).order_by('id').first() or Cart.objects.create(user=user)
+
+
+class DatabaseCartBackend:
+    """
+    Lines stored as CartItem rows of a Cart found through the session (or
+    the user, once logged in). The Cart row is only created on first write.
+    """
+    def __init__(self, request):
+        self.request = request
+        self._cart = None
+
+    def _find_cart(self):
+        user = self.request.user
+        if user.is_authenticated:
+            cart = Cart.objects.filter(user=user).order_by('id').first()
+            if cart is not None:
+                return cart
+        cart_id = self.request.session.get(SESSION_KEY)
+        if cart_id:
+            return Cart.objects.filter(id=cart_id, user__isnull=True).first()
+        return None
+
+    def get_cart(self, create=False):
+        if self._cart is None:
+            self._cart = self._find_cart()
+        if self._cart is None and create:
+            user = self.request.user
+            self._cart = Cart.objects.create(
+                user=user if user.is_authenticated else None,
+                session_key=self.request.session.session_key or '',
+            )
+            if not user.is_authenticated:
+                self.request.session[SESSION_KEY] = self._cart.pk
+        return self._cart
+
+    def currency(self):
+        cart = self.get_cart()
+        return cart.get_currency() if cart else DEFAULT_CURRENCY
+
+    def lines(self):
+        cart = self.get_cart()
+        if cart is None:
+            return {}
+        return {
+            (product_id, variant_id): quantity
+            for product_id, variant_id, quantity in cart.items.order_by('id').values_list(
+                'product_id', 'variant_id', 'quantity'
+            )
+        }
+
+    def add(self, product_id, variant_id, quantity):
+        cart = self.get_cart(create=True)
+        items = CartItem.objects.filter(cart=cart, product_id=product_id, variant_id=variant_id)
+        # Increment in SQL so concurrent adds of the same product both count
+        incremented = Least(F('quantity') + quantity, Value(settings.CART_MAX_LINE_QUANTITY))
+        if items.update(quantity=incremented):
+            return
+        try:
+            with transaction.atomic():
+                CartItem.objects.create(cart=cart, product_id=product_id, variant_id=variant_id, quantity=quantity)
+        except IntegrityError:
+            items.update(quantity=incremented)
+
+    def set(self, product_id, variant_id, quantity):
+        cart = self.get_cart()
+        if cart is not None:
+            cart.items.filter(product_id=product_id, variant_id=variant_id).update(quantity=quantity)
+
+    def remove(self, product_id, variant_id):
+        cart = self.get_cart()
+        if cart is not None:
+            cart.items.filter(product_id=product_id, variant_id=variant_id).delete()
+
+    def clear(self):
+        cart = self.get_cart()
+        if cart is not None:
+            cart.items.all().delete()
+
+    def promote(self, user):
+        """
+        Hand the session's anonymous cart to ``user``, merging it into the
+        cart they already have.
+        """
+        cart_id = self.request.session.pop(SESSION_KEY, None)
+        anonymous = Cart.objects.filter(id=cart_id, user__isnull=True).first() if cart_id else None
+        if anonymous is None:
+            return
+
+        existing = Cart.objects.filter(user=user).order_by('id').first()
+        if existing is None:
+            anonymous.user = user
+            anonymous.save(update_fields=['user', 'updated_at'])
+            return
+
+        lines = {
+            (product_id, variant_id): quantity
+            for product_id, variant_id, quantity in anonymous.items.values_list(
+                'product_id', 'variant_id', 'quantity'
+            )
+        }
+        with transaction.atomic():
+            merge_lines(existing, lines)
+            anonymous.delete()
+
+
+class RedisCartBackend:
+    """
+    Lines stored as a Redis hash (line key -> quantity) on the connection of
+    the CART_REDIS_CACHE cache, expiring CART_REDIS_TTL seconds after the
+    last change. Every change is a single atomic command, and the database
+    is not touched until the cart is promoted at login or checkout.
+
+    Only meant for anonymous carts: CART_ANONYMOUS_BACKEND.
+    """
+    def __init__(self, request):
+        self.request = request
+        self.redis = get_redis_connection(settings.CART_REDIS_CACHE)
+        self._make_key = caches[settings.CART_REDIS_CACHE].make_key
+
+    def get_key(self, create=False):
+        token = self.request.session.get(TOKEN_SESSION_KEY)
+        if token is None and create:
+            token = self.request.session[TOKEN_SESSION_KEY] = secrets.token_hex(16)
+        return self._make_key(f'cart:{token}') if token else None
+
+    def currency(self):
+        return DEFAULT_CURRENCY
+
+    @staticmethod
+    def _parse(fields):
+        lines = {}
+        for field, quantity in fields.items():
+            parsed = parse_line_key(field.decode())
+            if parsed is not None and int(quantity) > 0:
+                lines[parsed] = int(quantity)
+        return lines
+
+    def lines(self):
+        key = self.get_key()
+        if key is None:
+            return {}
+        return self._parse(self.redis.hgetall(key))
+
+    def add(self, product_id, variant_id, quantity):
+        self.redis.eval(
+            ADD_LINE, 1, self.get_key(create=True), line_key(product_id, variant_id), quantity,
+            settings.CART_MAX_LINE_QUANTITY, settings.CART_REDIS_TTL,
+        )
+
+    def set(self, product_id, variant_id, quantity):
+        key = self.get_key()
+        if key is not None:
+            # Only lines already in the cart; update_cart must not create new ones
+            self.redis.eval(
+                SET_EXISTING_LINE, 1, key, line_key(product_id, variant_id), quantity, settings.CART_REDIS_TTL
+            )
+
+    def remove(self, product_id, variant_id):
+        key = self.get_key()
+        if key is not None:
+            self.redis.hdel(key, line_key(product_id, variant_id))
+
+    def clear(self):
+        key = self.get_key()
+        if key is not None:
+            self.redis.delete(key)
+
+    def promote(self, user):
+        """
+        Copy the lines into ``user``'s database cart and drop the hash.
+        """
+        key = self.get_key()
+        if key is not None:
+            # Read and delete in one MULTI, so an add landing in between is not lost
+            pipe = self.redis.pipeline()
+            pipe.hgetall(key)
+            pipe.delete(key)
+            fields, _deleted = pipe.execute()
+            lines = self._parse(fields)
+            if lines:
+                merge_lines(_user_cart(user), lines)
+        self.request.session.pop(TOKEN_SESSION_KEY, None)
+
+
+def get_backend_class(request):
+    path = settings.CART_BACKEND if request.user.is_authenticated else settings.CART_ANONYMOUS_BACKEND
+    return import_string(path)
+
+
+class CartLine:
+    def __init__(self, product, variant, quantity):
+        self.product = product
+        self.variant = variant
+        self.quantity = quantity
+        self.key = line_key(product.pk, variant.pk if variant else None)
+
+    # Templates address lines by ``item.id``
+    @property
+    def id(self):
+        return self.key
+
+    def get_price(self):
+        if self.variant:
+            return self.variant.price
+        return self.product.base_price
+
+    def get_total(self):
+        return self.get_price() * self.quantity
+
+    total = property(get_total)
+
+    def get_price_display(self):
+        return f"{self.get_price():.2f}"
+
+    def get_total_display(self):
+        return f"{self.get_total():.2f}"
+
+
+class CartLines(list):
+    """
+    The loaded lines, with the bits of the related-manager API the cart
+    templates use (``cart.items.all``, ``cart.items.exists``).
+    """
+    def all(self):
+        return self
+
+    def exists(self):
+        return bool(self)
+
+    def count(self):
+        return len(self)
+
+
+class ShoppingCart:
+    def __init__(self, request):
+        self.request = request
+        self.backend = get_backend_class(request)(request)
+        self._lines = None
+
+    @property
+    def items(self):
+        if self._lines is None:
+            self._lines = self._load()
+        return self._lines
+
+    def _load(self):
+        quantities = self.backend.lines()
+        if not quantities:
+            return CartLines()
+        products = Product.objects.filter(
+            id__in={product_id for product_id, _ in quantities}
+        ).prefetch_related('translations', 'images').in_bulk()
+        variants = ProductVariant.objects.filter(
+            id__in={variant_id for _, variant_id in quantities if variant_id}
+        ).in_bulk()
+        lines = CartLines()
+        for (product_id, variant_id), quantity in quantities.items():
+            product = products.get(product_id)
+            if product is None or (variant_id and variant_id not in variants):
+                continue
+            variant = variants.get(variant_id)
+            if variant is not None:
+                # Already loaded above; saves a query per line for variant.price
+                variant.product = product
+            lines.append(CartLine(product, variant, quantity))
+        return lines
+
+    def _changed(self):
+        self._lines = None
+
+    def add_item(self, product, quantity=1, variant=None):
+        quantity = min(max(quantity, 1), settings.CART_MAX_LINE_QUANTITY)
+        self.backend.add(product.pk, variant.pk if variant else None, quantity)
+        self._changed()
+
+    def update_quantity(self, key, quantity):
+        parsed = parse_line_key(key)
+        if parsed is None:
+            return
+        if quantity > 0:
+            self.backend.set(*parsed, min(quantity, settings.CART_MAX_LINE_QUANTITY))
+        else:
+            self.backend.remove(*parsed)
+        self._changed()
+
+    def remove_item(self, key):
+        parsed = parse_line_key(key)
+        if parsed is not None:
+            self.backend.remove(*parsed)
+            self._changed()
+
+    def clear(self):
+        self.backend.clear()
+        self._changed()
+
+    def get_currency(self):
+        return self.backend.currency()
+
+    def get_total(self):
+        return sum((line.get_total() for line in self.items), Decimal('0'))
+
+    subtotal = property(get_total)
+
+    def get_total_display(self):
+        return f"{self.get_total():.2f}"
+
+    def get_subtotal_display(self):
+        return self.get_total_display()
+
+    def get_item_total_display(self, key):
+        for line in self.items:
+            if line.key == key:
+                return line.get_total_display()
+        return "0.00"
+
+    @property
+    def total_items(self):
+        return len(self.items)
+
+    @property
+    def total_quantity(self):
+        return sum(line.quantity for line in self.items)
+
+
+def get_cart(request):
+    """
+    The request's cart, loaded once per request.
+    """
+    if not hasattr(request, '_cart'):
+        request._cart = ShoppingCart(request)
+    return request._cart
+
+
+def promote_cart(request, user):
+    """
+    Move the session's anonymous cart into ``user``'s database cart. Called
+    at login and again at checkout, where it is a no-op if nothing is left.
+    """
+    import_string(settings.CART_ANONYMOUS_BACKEND)(request).promote(user)
+    request.__dict__.pop('_cart', None)
@@ -0,0 +1,43 @@
+"""
+Housekeeping for checkout sessions.
+
+A session that never reaches payment stays ``pending`` forever. Stale pending
+sessions are marked ``abandoned`` (keeping them around for a while for
+abandoned-checkout reporting) and abandoned or failed sessions are deleted
+once they are old enough.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import CheckoutSession
+
+PURGE_STATUSES = ('abandoned', 'failed')
+
+
+def mark_abandoned_sessions():
+    """
+    Mark pending sessions untouched for CHECKOUT_ABANDON_AFTER as abandoned.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.CHECKOUT_ABANDON_AFTER)
+    return CheckoutSession.objects.filter(
+        status='pending', updated_at__lt=cutoff
+    ).update(status='abandoned', updated_at=timezone.now())
+
+
+def purge_checkout_sessions(batch_size=1000):
+    """
+    Delete abandoned and failed sessions older than CHECKOUT_PURGE_AFTER_DAYS,
+    a batch at a time so no single DELETE holds locks for long.
+    """
+    cutoff = timezone.now() - timedelta(days=settings.CHECKOUT_PURGE_AFTER_DAYS)
+    stale = CheckoutSession.objects.filter(status__in=PURGE_STATUSES, updated_at__lt=cutoff)
+    purged = 0
+    while True:
+        ids = list(stale.order_by('id').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return purged
+        CheckoutSession.objects.filter(id__in=ids).delete()
+        purged += len(ids)
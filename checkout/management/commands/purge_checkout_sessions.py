@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from checkout.cleanup import mark_abandoned_sessions, purge_checkout_sessions
+
+
+class Command(BaseCommand):
+    help = 'Mark stale pending checkout sessions as abandoned and delete old abandoned or failed ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        abandoned = mark_abandoned_sessions()
+        purged = purge_checkout_sessions(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'{abandoned} session(s) abandoned, {purged} purged'))
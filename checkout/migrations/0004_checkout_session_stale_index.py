@@ -0,0 +1,19 @@
+# Generated by Django 5.0 on 2026-10-19 16:37
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('checkout', '0003_add_cart_currency_field'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='checkoutsession',
+            index=models.Index(fields=['status', 'updated_at'], name='checkout_session_stale_idx'),
+        ),
+    ]
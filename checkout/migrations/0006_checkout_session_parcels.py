@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-19 16:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('checkout', '0005_checkout_session_shipping_snapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='checkoutsession',
+            name='parcels',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
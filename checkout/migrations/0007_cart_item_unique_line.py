@@ -0,0 +1,38 @@
+# Generated by Django 5.0 on 2026-10-19 17:32
+
+from django.db import migrations, models
+
+
+def merge_duplicate_lines(apps, schema_editor):
+    # NULL variants slipped past unique_together; fold each set into its oldest row
+    CartItem = apps.get_model('checkout', 'CartItem')
+    duplicates = (
+        CartItem.objects.filter(variant__isnull=True)
+        .values('cart_id', 'product_id').annotate(lines=models.Count('id'), total=models.Sum('quantity'))
+        .filter(lines__gt=1)
+    )
+    for line in duplicates.iterator():
+        items = CartItem.objects.filter(cart_id=line['cart_id'], product_id=line['product_id'], variant__isnull=True)
+        keep = items.order_by('id').values_list('id', flat=True)[0]
+        items.exclude(id=keep).delete()
+        CartItem.objects.filter(id=keep).update(quantity=line['total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0002_product_shipping_dimensions'),
+        ('checkout', '0006_checkout_session_parcels'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_lines, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='cartitem',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='cartitem',
+            constraint=models.UniqueConstraint(fields=('cart', 'product', 'variant'), name='cart_item_unique_line', nulls_distinct=False),
+        ),
+    ]
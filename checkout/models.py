@@ -5,6 +5,9 @@ from django.core.exceptions import ValidationError
 from decimal import Decimal
 
 class Cart(models.Model):
+    """
+    Database storage for carts; see checkout.cart for the cart itself.
+    """
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -21,93 +24,11 @@ class Cart(models.Model):
         verbose_name = _('Cart')
 
     def __str__(self):
-        return f'Cart {self.id} - {self.user.username if self.user else "Anonymous"}'
+        return f"Cart {self.id} - {self.user.email if self.user else 'Anonymous'}"
 
     def get_currency(self):
         return self.currency or 'USD'
-        return self.currency or 'USD'
-        verbose_name_plural = _('Carts')
-
-    def __str__(self):
-        return f"Cart {self.id} - {self.user.email if self.user else 'Anonymous'}"
-
-    @classmethod
-    def get_or_create(cls, request):
-        if request.user.is_authenticated:
-            cart = cls.objects.filter(user=request.user).first()
-            if cart:
-                return cart
-            if request.session.session_key:
-                # If there's an existing cart with this session key, assign it to the user
-                cart = cls.objects.filter(
-                    session_key=request.session.session_key,
-                    user__isnull=True
-                ).first()
-                if cart:
-                    cart.user = request.user
-                    cart.save()
-                    return cart
-        else:
-            if not request.session.session_key:
-                request.session.create()
-            cart = cls.objects.filter(session_key=request.session.session_key).first()
-            if cart:
-                return cart
-
-        return cls.objects.create(
-            user=request.user if request.user.is_authenticated else None,
-            session_key=request.session.session_key
-        )
-
-    def add_item(self, product, quantity=1, variant=None):
-        item, created = CartItem.objects.get_or_create(
-            cart=self,
-            product=product,
-            variant=variant,
-            defaults={'quantity': quantity}
-        )
-        if not created:
-            item.quantity += quantity
-            item.save()
-        return item
-
-    def remove_item(self, item_id):
-        try:
-            item = self.items.get(id=item_id)
-            item.delete()
-        except CartItem.DoesNotExist:
-            pass
-
-    def update_quantity(self, item_id, quantity):
-        try:
-            item = self.items.get(id=item_id)
-            if quantity > 0:
-                item.quantity = quantity
-                item.save()
-            else:
-                item.delete()
-        except CartItem.DoesNotExist:
-            pass
-
-    def clear(self):
-        self.items.all().delete()
-
-    def get_total(self):
-        return sum(item.get_total() for item in self.items.all())
-
-    def get_total_display(self):
-        return f"{self.get_total():.2f}"
 
-    def get_item_total_display(self, item_id):
-        try:
-            item = self.items.get(id=item_id)
-            return f"{item.get_total():.2f}"
-        except CartItem.DoesNotExist:
-            return "0.00"
-
-    @property
-    def total_items(self):
-        return self.items.count()
 
 class CartItem(models.Model):
     cart = models.ForeignKey(Cart, related_name='items', on_delete=models.CASCADE)
@@ -126,14 +47,15 @@ class CartItem(models.Model):
     class Meta:
         verbose_name = _('Cart Item')
         verbose_name_plural = _('Cart Items')
-        unique_together = ('cart', 'product', 'variant')
+        constraints = [
+            # NULLs not distinct, so a product without a variant is one line too
+            models.UniqueConstraint(
+                fields=['cart', 'product', 'variant'], nulls_distinct=False, name='cart_item_unique_line'
+            ),
+        ]
 
-    def get_total(self):
-        if self.variant:
-            price = self.variant.price
-        else:
-            price = self.product.price
-        return price * self.quantity
+    def __str__(self):
+        return f"{self.quantity}x product {self.product_id} in Cart {self.cart_id}"
 
 
 class OrderItem(models.Model):
@@ -177,6 +99,26 @@ class CheckoutSession(models.Model):
     stripe_payment_intent = models.CharField(max_length=100, blank=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     billing_address = models.JSONField(null=True)
+    shipping_address = models.ForeignKey(
+        'shipping.ShippingAddress',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='checkout_sessions'
+    )
+    shipping_method = models.ForeignKey(
+        'shipping.ShippingMethod',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='checkout_sessions'
+    )
+    # Snapshot of the cart taken by freeze_cart(); kg, cm³ and order currency
+    total_weight = models.DecimalField(max_digits=10, decimal_places=3, null=True, blank=True)
+    total_volume = models.DecimalField(max_digits=14, decimal_places=2, null=True, blank=True)
+    subtotal = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    # Packed by shipping.packing.pack(): [{"box": id, "weight": "kg", "volume": "cm³"}]
+    parcels = models.JSONField(null=True, blank=True)
     shipping_cost = models.DecimalField(
         max_digits=10,
         decimal_places=2,
@@ -187,52 +129,84 @@ class CheckoutSession(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
-    def calculate_shipping_cost(self):
+    class Meta:
+        indexes = [
+            # Finding stale sessions to abandon and purge (checkout.cleanup)
+            models.Index(fields=['status', 'updated_at'], name='checkout_session_stale_idx'),
+        ]
+
+    def freeze_cart(self, lines):
         """
-        Calculate the shipping cost based on the selected shipping method and address
+        Snapshot the weight, volume and subtotal of the cart being checked
+        out, and pack it into parcels, from (product, variant, quantity,
+        unit price) tuples. Shipping quotes for the session use these
+        instead of the line items.
         """
+        from shipping.packing import pack
+
+        weight = volume = subtotal = Decimal('0')
+        items = []
+        for product, variant, quantity, unit_price in lines:
+            source = variant or product
+            weight += source.shipping_weight * quantity
+            volume += source.volume * quantity
+            subtotal += unit_price * quantity
+            items.append((source.shipping_weight, source.dimensions, quantity))
+        self.total_weight = weight
+        self.total_volume = volume
+        self.subtotal = subtotal
+        self.parcels = [parcel.as_dict() for parcel in pack(items)]
+
+    def _ensure_snapshot(self):
+        # Sessions created before carts were frozen at checkout
+        if self.total_weight is None or self.parcels is None:
+            self.freeze_cart(
+                (item.product, item.variant, item.quantity, item.unit_price)
+                for item in self.items.filter(product__isnull=False).select_related('product', 'variant__product')
+            )
+            self.save(update_fields=['total_weight', 'total_volume', 'subtotal', 'parcels'])
+
+    def get_shipping_calculator(self):
+        from shipping.packing import PackedParcel
         from shipping.services import ShippingCalculator
 
-        if not self.shipping_method or not self.shipping_address:
-            return None
-
-        cart_items = self.parent_order.items.all() if self.parent_order else []
-        total_weight = sum(item.quantity * item.product.weight for item in cart_items)
-        order_total = sum(item.get_total() for item in cart_items)
-
-        calculator = ShippingCalculator(
+        self._ensure_snapshot()
+        return ShippingCalculator(
             country_code=self.shipping_address.country,
-            weight=total_weight,
-            order_total=order_total
+            weight=self.total_weight,
+            order_total=self.subtotal,
+            parcels=[PackedParcel.from_dict(parcel) for parcel in self.parcels],
         )
 
-        shipping_cost = calculator.calculate_cost(self.shipping_method.id)
-        if shipping_cost is not None:
-            self.shipping_cost = Decimal(str(shipping_cost))
-            self.save(update_fields=['shipping_cost'])
+    def calculate_shipping_cost(self):
+        """
+        Calculate the shipping cost based on the selected shipping method and address
+        """
+        if not self.shipping_method_id or not self.shipping_address_id:
+            return None
+
+        shipping_cost = self.get_shipping_calculator().calculate_cost(self.shipping_method_id)
+        from shipping.services import round_cost
+        # No quote for the method any more: drop the old cost rather than charge it
+        self.shipping_cost = round_cost(shipping_cost) if shipping_cost is not None else None
+        self.save(update_fields=['shipping_cost'])
 
         return shipping_cost
 
-    def get_available_shipping_methods(self):
+    def get_shipping_quotes(self):
         """
-        Get available shipping methods based on the shipping address and cart contents
+        Available shipping methods with their cost, cheapest first
         """
-        from shipping.services import ShippingCalculator
-
-        if not self.shipping_address:
+        if not self.shipping_address_id:
             return []
 
-        cart_items = self.parent_order.items.all() if self.parent_order else []
-        total_weight = sum(item.quantity * item.product.weight for item in cart_items)
-        order_total = sum(item.get_total() for item in cart_items)
+        return self.get_shipping_calculator().get_quotes()
 
-        calculator = ShippingCalculator(
-            country_code=self.shipping_address.country,
-            weight=total_weight,
-            order_total=order_total
-        )
-
-        return [rate.shipping_method for rate in calculator.get_available_rates()]
+    def get_available_shipping_methods(self):
+        """
+        Get available shipping methods based on the shipping address and cart contents
+        """
+        return [quote.method for quote in self.get_shipping_quotes()]
 
     def get_total(self):
         """
@@ -0,0 +1,14 @@
+from celery import shared_task
+
+from .cleanup import mark_abandoned_sessions, purge_checkout_sessions
+
+
+@shared_task
+def clean_up_checkout_sessions():
+    """
+    Periodic task: mark stale checkout sessions abandoned and purge old ones.
+    """
+    return {
+        'abandoned': mark_abandoned_sessions(),
+        'purged': purge_checkout_sessions(),
+    }
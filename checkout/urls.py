@@ -6,8 +6,8 @@ app_name = 'checkout'
 urlpatterns = [
     path('cart/', views.cart_detail, name='cart_detail'),
     path('cart/add/<int:product_id>/', views.add_to_cart, name='add_to_cart'),
-    path('cart/remove/<int:item_id>/', views.remove_from_cart, name='remove_from_cart'),
-    path('cart/update/<int:item_id>/', views.update_cart, name='update_cart'),
+    path('cart/remove/<str:line_key>/', views.remove_from_cart, name='remove_from_cart'),
+    path('cart/update/<str:line_key>/', views.update_cart, name='update_cart'),
     path('checkout/', views.checkout, name='checkout'),
     path('checkout/success/', views.checkout_success, name='success'),
 ]
\ No newline at end of file
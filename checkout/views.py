@@ -1,27 +1,40 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_POST
-from django.http import JsonResponse
+from django.http import HttpResponseBadRequest, JsonResponse
 from django.urls import reverse
+from django.utils.translation import gettext as _
 from django.conf import settings
 import stripe
 
-from .models import Cart, CartItem, CheckoutSession, OrderItem
+from .cart import get_cart, promote_cart
+from .models import CheckoutSession, OrderItem
 from catalog.models import Product, ProductVariant
 
 stripe.api_key = settings.STRIPE_SECRET_KEY
 
+def _posted_quantity(request):
+    """
+    The POSTed quantity as an int, or None if it is not a whole number.
+    """
+    try:
+        return int(request.POST.get('quantity', 1))
+    except (TypeError, ValueError):
+        return None
+
 def cart_detail(request):
-    cart = Cart.get_or_create(request)
+    cart = get_cart(request)
     return render(request, 'checkout/cart.html', {'cart': cart})
 
 @require_POST
 def add_to_cart(request, product_id):
     product = get_object_or_404(Product, id=product_id)
     variant_id = request.POST.get('variant_id')
-    quantity = int(request.POST.get('quantity', 1))
+    quantity = _posted_quantity(request)
+    if quantity is None or quantity < 1:
+        return HttpResponseBadRequest(_('Quantity must be a positive whole number.'))
     
-    cart = Cart.get_or_create(request)
+    cart = get_cart(request)
     
     if variant_id:
         variant = get_object_or_404(ProductVariant, id=variant_id)
@@ -29,7 +42,7 @@ def add_to_cart(request, product_id):
     else:
         cart.add_item(product, quantity)
     
-    if request.htmx:
+    if request.headers.get('HX-Request'):
         return JsonResponse({
             'cart_count': cart.total_items,
             'cart_total': cart.get_total_display()
@@ -37,11 +50,11 @@ def add_to_cart(request, product_id):
     return redirect('checkout:cart_detail')
 
 @require_POST
-def remove_from_cart(request, item_id):
-    cart = Cart.get_or_create(request)
-    cart.remove_item(item_id)
+def remove_from_cart(request, line_key):
+    cart = get_cart(request)
+    cart.remove_item(line_key)
     
-    if request.htmx:
+    if request.headers.get('HX-Request'):
         return JsonResponse({
             'cart_count': cart.total_items,
             'cart_total': cart.get_total_display()
@@ -49,22 +62,27 @@ def remove_from_cart(request, item_id):
     return redirect('checkout:cart_detail')
 
 @require_POST
-def update_cart(request, item_id):
-    cart = Cart.get_or_create(request)
-    quantity = int(request.POST.get('quantity', 1))
-    cart.update_quantity(item_id, quantity)
+def update_cart(request, line_key):
+    quantity = _posted_quantity(request)
+    if quantity is None:
+        return HttpResponseBadRequest(_('Quantity must be a whole number.'))
+    # Zero or less removes the line
+    cart = get_cart(request)
+    cart.update_quantity(line_key, quantity)
     
-    if request.htmx:
+    if request.headers.get('HX-Request'):
         return JsonResponse({
             'cart_count': cart.total_items,
             'cart_total': cart.get_total_display(),
-            'item_total': cart.get_item_total_display(item_id)
+            'item_total': cart.get_item_total_display(line_key)
         })
     return redirect('checkout:cart_detail')
 
 @login_required
 def checkout(request):
-    cart = Cart.get_or_create(request)
+    # Anything still in an anonymous cart has to be in the database by now
+    promote_cart(request, request.user)
+    cart = get_cart(request)
     
     if not cart.items.exists():
         return redirect('checkout:cart_detail')
@@ -77,7 +95,7 @@ def checkout(request):
                 line_items=[{
                     'price_data': {
                         'currency': 'usd',
-                        'unit_amount': int(item.get_total() * 100),
+                        'unit_amount': int(item.get_price() * 100),
                         'product_data': {
                             'name': item.product.name,
                             'images': [item.product.images.first().image.url] if item.product.images.exists() else [],
@@ -91,13 +109,19 @@ def checkout(request):
                 customer_email=request.user.email,
             )
             
-            # Create order
-            order = CheckoutSession.objects.create(
+            # Create order, with the cart's weight and totals frozen for shipping quotes
+            order = CheckoutSession(
                 user=request.user,
+                session_key=request.session.session_key or '',
                 email=request.user.email,
-                total=cart.get_total(),
-                stripe_session_id=checkout_session.id
+                currency=cart.get_currency(),
+                stripe_payment_intent=checkout_session.id,
+                shipping_address=request.user.shipping_addresses.filter(is_default=True).first(),
+            )
+            order.freeze_cart(
+                (item.product, item.variant, item.quantity, item.get_price()) for item in cart.items.all()
             )
+            order.save()
             
             # Create order items
             for item in cart.items.all():
@@ -105,9 +129,10 @@ def checkout(request):
                     order=order,
                     product=item.product,
                     variant=item.variant,
+                    product_name=item.product.name,
+                    variant_name=item.variant.name if item.variant else '',
                     quantity=item.quantity,
-                    price=item.get_price(),
-                    total=item.get_total()
+                    unit_price=item.get_price()
                 )
             
             # Clear the cart
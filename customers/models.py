@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 
@@ -41,17 +41,37 @@ class Address(models.Model):
 
     class Meta:
         verbose_name_plural = 'Addresses'
-        unique_together = ('user', 'type', 'is_default')
+        constraints = [
+            # One default per user and type; also the index for default lookups
+            models.UniqueConstraint(
+                fields=['user', 'type'],
+                condition=models.Q(is_default=True),
+                name='customers_address_one_default',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.type.title()} address for {self.user.email}"
 
+    def _clear_other_defaults(self):
+        # Touches the current default row only, found through the partial index
+        Address.objects.filter(
+            user_id=self.user_id, type=self.type, is_default=True
+        ).exclude(pk=self.pk).update(is_default=False)
+
     def save(self, *args, **kwargs):
-        if self.is_default:
-            # Set all other addresses of this type for this user to non-default
-            Address.objects.filter(
-                user=self.user,
-                type=self.type,
-                is_default=True
-            ).update(is_default=False)
-        super().save(*args, **kwargs)
+        if not self.is_default:
+            return super().save(*args, **kwargs)
+        with transaction.atomic():
+            self._clear_other_defaults()
+            super().save(*args, **kwargs)
+
+    def make_default(self):
+        """
+        Make this the user's default address of its type, writing only the
+        flag.
+        """
+        with transaction.atomic():
+            self._clear_other_defaults()
+            Address.objects.filter(pk=self.pk).update(is_default=True)
+        self.is_default = True
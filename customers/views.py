@@ -37,6 +37,11 @@ class CustomerRegistrationView(CreateView):
         context['title'] = _('Register')
         return context
 
+def _address_list(user):
+    # Defaults first. Loaded through the related manager, each address
+    # already has ``user`` set, so templates can use it without a query.
+    return list(user.addresses.order_by('type', '-is_default', '-updated_at'))
+
 @login_required
 def dashboard(request):
     # Get recent orders
@@ -45,7 +50,7 @@ def dashboard(request):
     ).order_by('-created_at')[:5]
     
     # Get saved addresses
-    addresses = request.user.addresses.all()
+    addresses = _address_list(request.user)
     
     return render(request, 'customers/dashboard.html', {
         'recent_orders': recent_orders,
@@ -74,7 +79,7 @@ def profile(request):
 
 @login_required
 def addresses(request):
-    addresses = request.user.addresses.all()
+    addresses = _address_list(request.user)
     return render(request, 'customers/addresses.html', {
         'addresses': addresses,
     })
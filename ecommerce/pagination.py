@@ -0,0 +1,149 @@
+"""
+Keyset (cursor) pagination.
+
+Offset pagination gets slower the deeper you page, because the database has to
+walk past every skipped row, and it needs a COUNT for the page links. Keyset
+pagination instead remembers the sort key of the last row shown and asks for
+rows beyond it, which an index on the sort columns answers in constant time.
+"""
+
+import base64
+import json
+from functools import cmp_to_key
+
+from django.db.models import Q
+
+
+def _json_default(value):
+    # Keep full microsecond precision; DjangoJSONEncoder rounds to milliseconds,
+    # which would make cursors skip or repeat rows
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def encode_cursor(values):
+    data = json.dumps(values, default=_json_default, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode()))
+
+
+class KeysetPage:
+    def __init__(self, object_list, has_next, has_previous, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+
+class KeysetPaginator:
+    """
+    Paginate ``queryset`` by ``ordering``, which must end in a unique field
+    so that every row has a distinct position, e.g. ('-created_at', '-id').
+
+    ``queryset`` may also be a list of querysets over models with the same
+    ordering fields (say live and archived rows); each is read with the same
+    keyset condition and the rows are merged into one sequence.
+    """
+    def __init__(self, queryset, per_page, ordering=('-created_at', '-id')):
+        self.querysets = list(queryset) if isinstance(queryset, (list, tuple)) else [queryset]
+        self.per_page = per_page
+        self.ordering = list(ordering)
+        self.fields = [name.lstrip('-') for name in self.ordering]
+
+    def _position(self, obj):
+        return [getattr(obj, field) for field in self.fields]
+
+    def _parse(self, cursor):
+        try:
+            values = decode_cursor(cursor)
+            if len(values) != len(self.fields):
+                return None
+            model = self.querysets[0].model
+            return [
+                model._meta.get_field(field).to_python(value)
+                for field, value in zip(self.fields, values)
+            ]
+        except Exception:
+            # Tampered or stale cursors just start from the first page
+            return None
+
+    def _beyond(self, values, reverse=False):
+        """
+        Q matching rows that sort after ``values`` (or before, if ``reverse``).
+        """
+        condition = Q()
+        for index, name in enumerate(self.ordering):
+            descending = name.startswith('-') != reverse
+            lookup = 'lt' if descending else 'gt'
+            field = self.fields[index]
+            term = Q(**{f'{field}__{lookup}': values[index]})
+            for previous, value in zip(self.fields[:index], values[:index]):
+                term &= Q(**{previous: value})
+            condition |= term
+        return condition
+
+    def _compare(self, ordering, first, second):
+        for name in ordering:
+            field = name.lstrip('-')
+            a, b = getattr(first, field), getattr(second, field)
+            if a != b:
+                result = -1 if a < b else 1
+                return -result if name.startswith('-') else result
+        return 0
+
+    def _rows(self, values, reverse=False):
+        """
+        Up to per_page + 1 rows beyond ``values`` in (reversed) order.
+        """
+        ordering = self.ordering
+        if reverse:
+            ordering = [name[1:] if name.startswith('-') else f'-{name}' for name in self.ordering]
+        rows = []
+        for queryset in self.querysets:
+            queryset = queryset.order_by(*ordering)
+            if values is not None:
+                queryset = queryset.filter(self._beyond(values, reverse=reverse))
+            rows.extend(queryset[:self.per_page + 1])
+        if len(self.querysets) > 1:
+            rows.sort(key=cmp_to_key(lambda a, b: self._compare(ordering, a, b)))
+        return rows[:self.per_page + 1]
+
+    def get_page(self, after=None, before=None):
+        values = self._parse(before) if before else None
+        if values is not None:
+            rows = self._rows(values, reverse=True)
+            has_previous = len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            has_next = True
+        else:
+            values = self._parse(after) if after else None
+            rows = self._rows(values)
+            has_next = len(rows) > self.per_page
+            rows = rows[:self.per_page]
+            has_previous = values is not None
+
+        return KeysetPage(
+            rows,
+            has_next=has_next and bool(rows),
+            has_previous=has_previous and bool(rows),
+            next_cursor=encode_cursor(self._position(rows[-1])) if rows else None,
+            previous_cursor=encode_cursor(self._position(rows[0])) if rows else None,
+        )
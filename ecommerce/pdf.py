@@ -0,0 +1,156 @@
+"""
+A small PDF writer for documents made of text and rules (invoices, packing
+slips, manifests).
+
+It only knows the standard Helvetica fonts, which every PDF reader ships, so
+no font files or native libraries are needed and rendering is cheap enough to
+run for thousands of documents in a batch. Output is deterministic: the same
+drawing calls always produce the same bytes.
+"""
+
+import zlib
+
+A4 = (595, 842)
+
+# Advance widths of printable ASCII in Helvetica, in 1/1000 em (from the AFM)
+_HELVETICA_WIDTHS = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+
+FONTS = {
+    'regular': ('F1', 'Helvetica'),
+    'bold': ('F2', 'Helvetica-Bold'),
+}
+
+
+def _encode(text):
+    # WinAnsiEncoding is close enough to cp1252; anything else becomes '?'
+    return text.encode('cp1252', errors='replace')
+
+
+def _escape(data):
+    return data.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+
+def text_width(text, size, bold=False):
+    """
+    Approximate rendered width of ``text`` in points.
+    """
+    width = 0
+    for char in text:
+        code = ord(char)
+        width += _HELVETICA_WIDTHS[code - 32] if 32 <= code < 127 else 556
+    if bold:
+        width *= 1.05
+    return width * size / 1000
+
+
+def truncate(text, width, size, bold=False):
+    """
+    Shorten ``text`` with an ellipsis so it fits in ``width`` points.
+    """
+    if text_width(text, size, bold) <= width:
+        return text
+    while text and text_width(text + '...', size, bold) > width:
+        text = text[:-1]
+    return text + '...'
+
+
+class Page:
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.operations = []
+
+    def text(self, x, y, text, size=10, bold=False, align='left'):
+        """
+        Draw a line of text with its baseline at ``y`` (from the bottom).
+        ``align='right'`` ends the text at ``x`` instead of starting there.
+        """
+        text = str(text)
+        if align == 'right':
+            x -= text_width(text, size, bold)
+        font = FONTS['bold' if bold else 'regular'][0]
+        self.operations.append(
+            b'BT /%s %d Tf %.2f %.2f Td (%s) Tj ET' % (
+                font.encode(), size, x, y, _escape(_encode(text))
+            )
+        )
+
+    def line(self, x1, y1, x2, y2, width=0.5):
+        self.operations.append(b'%.2f w %.2f %.2f m %.2f %.2f l S' % (width, x1, y1, x2, y2))
+
+    def content(self):
+        return b'\n'.join(self.operations)
+
+
+class Document:
+    """
+    Collect pages with ``add_page()`` and draw on them, then ``render()``.
+    """
+    def __init__(self, size=A4, title=''):
+        self.width, self.height = size
+        self.title = title
+        self.pages = []
+
+    def add_page(self):
+        page = Page(self.width, self.height)
+        self.pages.append(page)
+        return page
+
+    def render(self):
+        if not self.pages:
+            self.add_page()
+
+        # Object numbers: 1 catalog, 2 page tree, 3 info, then the fonts,
+        # then a page object and a content stream per page
+        font_ids = {}
+        objects = {}
+        next_id = 4
+        for key, (name, base_font) in FONTS.items():
+            font_ids[name] = next_id
+            objects[next_id] = (
+                b'<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>'
+                % base_font.encode()
+            )
+            next_id += 1
+
+        fonts = b' '.join(b'/%s %d 0 R' % (name.encode(), number) for name, number in font_ids.items())
+        page_ids = []
+        for page in self.pages:
+            page_id, content_id = next_id, next_id + 1
+            next_id += 2
+            page_ids.append(page_id)
+            objects[page_id] = (
+                b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] '
+                b'/Resources << /Font << %s >> >> /Contents %d 0 R >>'
+                % (page.width, page.height, fonts, content_id)
+            )
+            stream = zlib.compress(page.content())
+            objects[content_id] = (
+                b'<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream' % (len(stream), stream)
+            )
+
+        objects[1] = b'<< /Type /Catalog /Pages 2 0 R >>'
+        objects[2] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (
+            b' '.join(b'%d 0 R' % number for number in page_ids), len(page_ids)
+        )
+        objects[3] = b'<< /Title (%s) /Producer (ecommerce.pdf) >>' % _escape(_encode(self.title))
+
+        output = bytearray(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        offsets = []
+        for number in range(1, next_id):
+            offsets.append(len(output))
+            output += b'%d 0 obj\n%s\nendobj\n' % (number, objects[number])
+
+        xref = len(output)
+        output += b'xref\n0 %d\n0000000000 65535 f \n' % next_id
+        for offset in offsets:
+            output += b'%010d 00000 n \n' % offset
+        output += b'trailer\n<< /Size %d /Root 1 0 R /Info 3 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (next_id, xref)
+        return bytes(output)
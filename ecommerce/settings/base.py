@@ -16,6 +16,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.humanize',
     
     # Third party apps
     'rest_framework',
@@ -30,9 +31,13 @@ INSTALLED_APPS = [
     'customers.apps.CustomersConfig',
     'marketing.apps.MarketingConfig',
     'shipping.apps.ShippingConfig',
+    'monitoring.apps.MonitoringConfig',
+    'reports.apps.ReportsConfig',
 ]
 
 MIDDLEWARE = [
+    'monitoring.middleware.ProfilingMiddleware',
+    'monitoring.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -49,7 +54,7 @@ ROOT_URLCONF = 'ecommerce.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'monitoring.templates.DjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -119,7 +124,7 @@ REST_FRAMEWORK = {
 # Cache configuration
 CACHES = {
     "default": {
-        "BACKEND": "django_redis.cache.RedisCache",
+        "BACKEND": "monitoring.cache.RedisCache",
         "LOCATION": os.getenv('REDIS_URL', 'redis://redis:6379/0'),
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
@@ -134,6 +139,24 @@ CELERY_ACCEPT_CONTENT = ['application/json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULE = {
+    'refresh-active-tracking': {
+        'task': 'orders.tasks.refresh_active_tracking',
+        'schedule': int(os.getenv('TRACKING_REFRESH_INTERVAL', 15 * 60)),
+    },
+    'update-sales-rollups': {
+        'task': 'reports.tasks.update_sales_rollups',
+        'schedule': int(os.getenv('REPORTS_ROLLUP_INTERVAL', 10 * 60)),
+    },
+    'archive-old-orders': {
+        'task': 'orders.tasks.archive_old_orders',
+        'schedule': 24 * 60 * 60,
+    },
+    'clean-up-checkout-sessions': {
+        'task': 'checkout.tasks.clean_up_checkout_sessions',
+        'schedule': 60 * 60,
+    },
+}
 
 # Parler (Translation) settings
 PARLER_LANGUAGES = {
@@ -155,4 +178,89 @@ STRIPE_WEBHOOK_SECRET = os.getenv('STRIPE_WEBHOOK_SECRET')
 
 # Mailchimp settings
 MAILCHIMP_API_KEY = os.getenv('MAILCHIMP_API_KEY')
-MAILCHIMP_LIST_ID = os.getenv('MAILCHIMP_LIST_ID')
\ No newline at end of file
+MAILCHIMP_LIST_ID = os.getenv('MAILCHIMP_LIST_ID')
+
+# Catalog feed settings
+CATALOG_FEED_TOKEN = os.getenv('CATALOG_FEED_TOKEN')
+CATALOG_FEED_TITLE = os.getenv('CATALOG_FEED_TITLE', 'Product feed')
+CATALOG_FEED_CURRENCY = os.getenv('CATALOG_FEED_CURRENCY', 'USD')
+
+# Request metrics and per-view query budgets (see monitoring/)
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+QUERY_BUDGET_ACTION = os.getenv('QUERY_BUDGET_ACTION', 'log')  # 'log' or 'raise'
+QUERY_BUDGET_DEFAULT = None
+QUERY_BUDGETS = {
+    'catalog:home': 10,
+    'catalog:products': 12,
+    'catalog:category_products': 12,
+    'catalog:product_detail': 20,
+    'catalog:categories': 8,
+    'checkout:cart_detail': 15,
+    'checkout:add_to_cart': 20,
+    'checkout:update_cart': 20,
+    'checkout:remove_from_cart': 15,
+    'checkout:checkout': 40,
+    'orders:list': 10,
+    'orders:detail': 12,
+}
+
+# Request profiling: profile PROFILING_SAMPLE_RATE of requests (or any request
+# with a signed X-Profile-Request header) and keep those slower than the threshold
+PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', '0'))
+PROFILING_THRESHOLD_MS = int(os.getenv('PROFILING_THRESHOLD_MS', '500'))
+PROFILING_MODE = os.getenv('PROFILING_MODE', 'sampler')  # 'sampler' or 'cprofile'
+PROFILING_INTERVAL = 0.005
+PROFILING_MAX_PROFILES = 200
+PROFILING_HEADER_MAX_AGE = 60 * 60
+
+# Shipment tracking: carrier adapters by code (see shipping/carriers.py)
+SHIPPING_CARRIERS = {
+    'stub': 'shipping.carriers.StubCarrier',
+    'json': 'shipping.carriers.JSONCarrier',
+}
+SHIPPING_DEFAULT_CARRIER = os.getenv('SHIPPING_DEFAULT_CARRIER', 'stub')
+SHIPPING_CARRIER_TIMEOUT = 10
+# Shipping labels (orders/shipments.py): 'pdf' or 'zpl' for the stub carrier,
+# concurrent carrier calls per batch, orders per queued batch, and seconds
+# after which a shipment a dead batch left pending is claimed again
+SHIPPING_LABEL_FORMAT = os.getenv('SHIPPING_LABEL_FORMAT', 'pdf')
+SHIPPING_LABEL_WORKERS = int(os.getenv('SHIPPING_LABEL_WORKERS', 8))
+SHIPPING_LABEL_BATCH_SIZE = 200
+SHIPPING_LABEL_CLAIM_TIMEOUT = int(os.getenv('SHIPPING_LABEL_CLAIM_TIMEOUT', 60 * 60))
+TRACKING_CACHE_TIMEOUT = 24 * 60 * 60
+# Seconds between checks of the shared rate table version (shipping/rates.py)
+SHIPPING_RATE_TABLE_CHECK_INTERVAL = 5
+# How long a packing is remembered for identical cart contents (shipping/packing.py)
+SHIPPING_PACKING_CACHE_TIMEOUT = 24 * 60 * 60
+# How long checkout shipping quotes are cached; rate changes bypass them (shipping/services.py)
+SHIPPING_QUOTE_CACHE_TIMEOUT = 60 * 60
+# Largest batch accepted by the shipping quote endpoint
+SHIPPING_QUOTE_MAX_DESTINATIONS = 1000
+# Delivery date estimates (shipping/delivery.py)
+SHIPPING_WAREHOUSE_TIMEZONE = os.getenv('SHIPPING_WAREHOUSE_TIMEZONE', TIME_ZONE)
+SHIPPING_DISPATCH_CUTOFF = os.getenv('SHIPPING_DISPATCH_CUTOFF', '14:00')
+SHIPPING_BUSINESS_DAYS = (0, 1, 2, 3, 4)  # Monday to Friday
+SHIPPING_DELIVERY_PROMISE_PERCENTILE = 0.95
+SHIPPING_DEFAULT_COUNTRY = os.getenv('SHIPPING_DEFAULT_COUNTRY', 'US')
+# Postal code indexes built by `manage.py build_postal_index` (shipping/postal.py)
+POSTAL_INDEX_DIR = os.getenv('POSTAL_INDEX_DIR', os.path.join(BASE_DIR, 'data', 'postal'))
+
+# Fulfillment order export (see orders/exports.py)
+ORDER_EXPORT_TOKEN_MAX_AGE = int(os.getenv('ORDER_EXPORT_TOKEN_MAX_AGE', 90 * 24 * 60 * 60))
+ORDER_EXPORT_PENDING_GRACE = 24 * 60 * 60
+
+# Archival of old orders (orders/archive.py) and checkout sessions (checkout/cleanup.py)
+ORDER_ARCHIVE_AFTER_DAYS = int(os.getenv('ORDER_ARCHIVE_AFTER_DAYS', 2 * 365))
+CHECKOUT_ABANDON_AFTER = 24 * 60 * 60
+CHECKOUT_PURGE_AFTER_DAYS = int(os.getenv('CHECKOUT_PURGE_AFTER_DAYS', 90))
+
+# Cart storage backends (see checkout/cart.py); anonymous carts may use a
+# cheaper backend and are moved to CART_BACKEND at login or checkout
+CART_BACKEND = 'checkout.cart.DatabaseCartBackend'
+CART_ANONYMOUS_BACKEND = os.getenv('CART_ANONYMOUS_BACKEND', 'checkout.cart.RedisCartBackend')
+# Cache alias whose django_redis connection holds Redis carts, and how long
+# an untouched anonymous cart is kept
+CART_REDIS_CACHE = 'default'
+CART_REDIS_TTL = int(os.getenv('CART_REDIS_TTL', 14 * 24 * 60 * 60))
+# Most units of one product a cart line can hold; larger quantities are capped
+CART_MAX_LINE_QUANTITY = int(os.getenv('CART_MAX_LINE_QUANTITY', 999))
@@ -0,0 +1,42 @@
+"""
+Benchmark settings
+
+Used by the request-level benchmark suite in ``benchmarks/``. Runs against
+SQLite by default; set BENCHMARK_DB=postgresql to use the PostgreSQL database
+configured through the usual DB_* variables.
+"""
+
+from .development import *
+
+DEBUG = False
+
+ALLOWED_HOSTS = ['testserver', 'localhost', '127.0.0.1']
+
+if os.getenv('BENCHMARK_DB', 'sqlite') != 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'benchmark.sqlite3',
+        }
+    }
+
+# Hashing passwords is not what we are measuring
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+]
+
+STRIPE_SECRET_KEY = 'sk_test_benchmark'
+STRIPE_PUBLISHABLE_KEY = 'pk_test_benchmark'
+
+# Fail the run when a view goes over its query budget
+QUERY_BUDGET_ACTION = 'raise'
+
+# Set BENCHMARK_REDIS_URL to also time the Redis cart backend
+if os.getenv('BENCHMARK_REDIS_URL'):
+    CACHES['redis'] = {
+        'BACKEND': 'monitoring.cache.RedisCache',
+        'LOCATION': os.getenv('BENCHMARK_REDIS_URL'),
+        'OPTIONS': {
+            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+        },
+    }
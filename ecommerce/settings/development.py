@@ -33,11 +33,14 @@ CORS_ALLOW_ALL_ORIGINS = True
 # Use local memory cache for development
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': 'monitoring.cache.LocMemCache',
         'LOCATION': 'unique-snowflake',
     }
 }
 
+# Redis carts need a django_redis cache; keep anonymous carts in the database
+CART_ANONYMOUS_BACKEND = 'checkout.cart.DatabaseCartBackend'
+
 # Disable Celery for development
 CELERY_TASK_ALWAYS_EAGER = True
 
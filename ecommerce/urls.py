@@ -25,12 +25,14 @@ from django.views.i18n import JavaScriptCatalog
 urlpatterns = [
     path('i18n/', include('django.conf.urls.i18n')),
     path('jsi18n/', JavaScriptCatalog.as_view(), name='javascript-catalog'),
+    path('', include('monitoring.urls')),
 ]
 
 # Translatable URLs
 urlpatterns += i18n_patterns(
     # Authentication URLs
     path('auth/', include('django.contrib.auth.urls')),
+    path('admin/reports/', include('reports.urls')),
     path('admin/', admin.site.urls),
     
     # App URLs
@@ -10,7 +10,7 @@ from django.db.models import Q
 
 from .models import PromoBanner, DiscountCode, NewsletterSubscription
 from .forms import NewsletterSubscriptionForm, DiscountForm
-from checkout.models import Cart
+from checkout.cart import get_cart
 
 def deals(request):
     active_banners = PromoBanner.objects.filter(
@@ -66,7 +66,7 @@ def apply_discount(request):
                 is_active=True,
                 valid_from__lte=timezone.now()
             ).filter(Q(valid_until__isnull=True) | Q(valid_until__gte=timezone.now())).first()
-            cart = Cart.get_or_create(request)
+            cart = get_cart(request)
             if cart.can_apply_discount(discount):
                 cart.apply_discount(discount)
                 if request.htmx:
@@ -96,7 +96,7 @@ def apply_discount(request):
 
 @require_POST
 def remove_discount(request):
-    cart = Cart.get_or_create(request)
+    cart = get_cart(request)
     cart.remove_discount()
     
     if request.htmx:
@@ -0,0 +1,45 @@
+from django.contrib import admin
+from django.http import HttpResponse
+from django.utils.translation import gettext_lazy as _
+
+from .models import RequestProfile
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    list_display = [
+        'created_at', 'view_name', 'method', 'status_code', 'duration_ms',
+        'queries', 'language', 'user_type', 'trigger', 'mode',
+    ]
+    list_filter = ['view_name', 'language', 'user_type', 'trigger', 'mode', 'created_at']
+    search_fields = ['view_name', 'path']
+    date_hierarchy = 'created_at'
+    actions = ['download_folded_stacks']
+
+    fieldsets = (
+        (None, {
+            'fields': ('view_name', 'method', 'path', 'status_code', 'created_at')
+        }),
+        ('Request', {
+            'fields': ('language', 'user_type', 'trigger', 'duration_ms', 'queries')
+        }),
+        ('Profile', {
+            'fields': ('mode', 'samples', 'folded_stacks', 'stats')
+        }),
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.action(description=_('Download folded stacks (flame graph input)'))
+    def download_folded_stacks(self, request, queryset):
+        # Folded stacks from several profiles can simply be concatenated
+        content = '\n'.join(
+            profile.folded_stacks for profile in queryset.order_by('id') if profile.folded_stacks
+        )
+        response = HttpResponse(content + '\n', content_type='text/plain; charset=utf-8')
+        response['Content-Disposition'] = 'attachment; filename="profiles.folded"'
+        return response
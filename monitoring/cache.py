@@ -0,0 +1,38 @@
+"""
+Cache backends that report hits and misses to the request metrics.
+
+Use them in place of the stock backends in CACHES, e.g.
+``'BACKEND': 'monitoring.cache.RedisCache'``.
+"""
+
+from django.core.cache.backends.locmem import LocMemCache as BaseLocMemCache
+from django_redis.cache import RedisCache as BaseRedisCache
+
+from .metrics import record_cache_access
+
+_MISSING = object()
+
+
+class InstrumentedCacheMixin:
+    def get(self, key, default=None, version=None, **kwargs):
+        value = super().get(key, _MISSING, version=version, **kwargs)
+        if value is _MISSING:
+            record_cache_access(False)
+            return default
+        record_cache_access(True)
+        return value
+
+    def get_many(self, keys, version=None, **kwargs):
+        keys = list(keys)
+        values = super().get_many(keys, version=version, **kwargs)
+        record_cache_access(True, len(values))
+        record_cache_access(False, len(keys) - len(values))
+        return values
+
+
+class LocMemCache(InstrumentedCacheMixin, BaseLocMemCache):
+    pass
+
+
+class RedisCache(InstrumentedCacheMixin, BaseRedisCache):
+    pass
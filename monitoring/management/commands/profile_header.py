@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from monitoring.profiling import make_header_token
+
+
+class Command(BaseCommand):
+    help = 'Print a signed X-Profile-Request header value that forces a request to be profiled'
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'X-Profile-Request: {make_header_token()}')
@@ -0,0 +1,196 @@
+"""
+Per-view request metrics.
+
+Each request gets a ``RequestStats`` object that the middleware, the database
+execute wrapper, the instrumented cache backends and the template backend all
+add to. When the request finishes its numbers are folded into the in-process
+``registry``, keyed by the resolved URL name, and exposed in the Prometheus
+text format by ``monitoring.views.metrics``. Application caches that want
+their own hit rate (e.g. shipping quotes) count lookups in the registry by
+name with ``registry.record_cache_lookup()``.
+
+The registry lives in process memory, so with several gunicorn workers each
+worker reports its own counters; Prometheus sums them per scrape target.
+"""
+
+import threading
+import time
+from contextvars import ContextVar
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_current = ContextVar('monitoring_request_stats', default=None)
+
+
+class RequestStats:
+    """
+    Counters for a single request.
+    """
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.render_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        # Installed with connection.execute_wrapper()
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+
+
+def start_request():
+    stats = RequestStats()
+    return stats, _current.set(stats)
+
+
+def finish_request(token):
+    _current.reset(token)
+
+
+def current_stats():
+    """
+    Stats for the request being handled, or None outside a request.
+    """
+    return _current.get()
+
+
+def record_cache_access(hit, count=1):
+    stats = _current.get()
+    if stats is None:
+        return
+    if hit:
+        stats.cache_hits += count
+    else:
+        stats.cache_misses += count
+
+
+def record_render_time(seconds):
+    stats = _current.get()
+    if stats is not None:
+        stats.render_time += seconds
+
+
+class ViewMetrics:
+    def __init__(self):
+        self.responses = {}
+        self.queries = 0
+        self.db_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.render_time = 0.0
+        self.budget_exceeded = 0
+        self.buckets = [0] * len(DURATION_BUCKETS)
+        self.duration_count = 0
+        self.duration_sum = 0.0
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+        self._cache_lookups = {}
+
+    def record(self, view, method, status, stats, duration, budget_exceeded=False):
+        with self._lock:
+            metrics = self._views.get(view)
+            if metrics is None:
+                metrics = self._views[view] = ViewMetrics()
+            key = (method, status)
+            metrics.responses[key] = metrics.responses.get(key, 0) + 1
+            metrics.queries += stats.queries
+            metrics.db_time += stats.db_time
+            metrics.cache_hits += stats.cache_hits
+            metrics.cache_misses += stats.cache_misses
+            metrics.render_time += stats.render_time
+            metrics.budget_exceeded += budget_exceeded
+            metrics.duration_count += 1
+            metrics.duration_sum += duration
+            for index, bound in enumerate(DURATION_BUCKETS):
+                if duration <= bound:
+                    metrics.buckets[index] += 1
+
+    def record_cache_lookup(self, cache, hit):
+        key = (cache, 'hit' if hit else 'miss')
+        with self._lock:
+            self._cache_lookups[key] = self._cache_lookups.get(key, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self._views = {}
+            self._cache_lookups = {}
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                view: {**vars(metrics), 'responses': dict(metrics.responses), 'buckets': list(metrics.buckets)}
+                for view, metrics in self._views.items()
+            }
+
+    def cache_lookups(self):
+        with self._lock:
+            return dict(self._cache_lookups)
+
+
+registry = MetricsRegistry()
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_prometheus(snapshot=None, cache_lookups=None):
+    """
+    Render the registry in the Prometheus text exposition format.
+    """
+    snapshot = registry.snapshot() if snapshot is None else snapshot
+    cache_lookups = registry.cache_lookups() if cache_lookups is None else cache_lookups
+    views = sorted(snapshot.items())
+    lines = []
+
+    def family(name, kind, help_text, samples):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        lines.extend(samples)
+
+    family('django_view_requests_total', 'counter', 'Responses returned per view.', [
+        f'django_view_requests_total{{view="{_label(view)}",method="{method}",status="{status}"}} {count}'
+        for view, metrics in views
+        for (method, status), count in sorted(metrics['responses'].items())
+    ])
+    for name, field, help_text in (
+        ('django_view_db_queries_total', 'queries', 'SQL queries executed per view.'),
+        ('django_view_db_seconds_total', 'db_time', 'Time spent executing SQL per view.'),
+        ('django_view_cache_hits_total', 'cache_hits', 'Cache hits per view.'),
+        ('django_view_cache_misses_total', 'cache_misses', 'Cache misses per view.'),
+        ('django_view_render_seconds_total', 'render_time', 'Time spent rendering templates per view.'),
+        ('django_view_query_budget_exceeded_total', 'budget_exceeded',
+         'Requests that issued more queries than the view budget.'),
+    ):
+        family(name, 'counter', help_text, [
+            f'{name}{{view="{_label(view)}"}} {metrics[field]}'
+            for view, metrics in views
+        ])
+
+    samples = []
+    for view, metrics in views:
+        label = _label(view)
+        for bound, count in zip(DURATION_BUCKETS, metrics['buckets']):
+            samples.append(f'django_view_duration_seconds_bucket{{view="{label}",le="{bound}"}} {count}')
+        samples.append(
+            f'django_view_duration_seconds_bucket{{view="{label}",le="+Inf"}} {metrics["duration_count"]}'
+        )
+        samples.append(f'django_view_duration_seconds_sum{{view="{label}"}} {metrics["duration_sum"]}')
+        samples.append(f'django_view_duration_seconds_count{{view="{label}"}} {metrics["duration_count"]}')
+    family('django_view_duration_seconds', 'histogram', 'Request latency per view.', samples)
+
+    family('app_cache_lookups_total', 'counter', 'Lookups in named application caches, by result.', [
+        f'app_cache_lookups_total{{cache="{_label(cache)}",result="{result}"}} {count}'
+        for (cache, result), count in sorted(cache_lookups.items())
+    ])
+
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,149 @@
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.utils import translation
+
+from . import metrics
+from .models import RequestProfile
+from .profiling import check_header_token, make_profiler
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    """
+    Raised when a view issues more queries than its budget allows and
+    QUERY_BUDGET_ACTION is 'raise'.
+    """
+
+
+def get_view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return '<unresolved>'
+    return match.view_name
+
+
+def get_query_budget(view_name):
+    budgets = getattr(settings, 'QUERY_BUDGETS', {})
+    return budgets.get(view_name, getattr(settings, 'QUERY_BUDGET_DEFAULT', None))
+
+
+class MetricsMiddleware:
+    """
+    Record query count, DB time, cache hits/misses, render time and latency
+    for every request, keyed by the resolved URL name.
+
+    Should sit at the top of MIDDLEWARE so queries made by other middleware
+    (sessions, auth, the cart context) are attributed to the view as well.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats, token = metrics.start_request()
+        request.metrics = stats
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(stats))
+                response = self.get_response(request)
+        finally:
+            metrics.finish_request(token)
+        duration = time.perf_counter() - started
+
+        view_name = get_view_name(request)
+        budget = get_query_budget(view_name)
+        exceeded = budget is not None and stats.queries > budget
+
+        metrics.registry.record(
+            view_name, request.method, response.status_code, stats, duration, budget_exceeded=exceeded,
+        )
+
+        if settings.DEBUG:
+            response['Server-Timing'] = ', '.join([
+                f'db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries"',
+                f'render;dur={stats.render_time * 1000:.1f}',
+                f'total;dur={duration * 1000:.1f}',
+            ])
+
+        if exceeded:
+            message = f'{view_name} issued {stats.queries} queries, budget is {budget}'
+            if getattr(settings, 'QUERY_BUDGET_ACTION', 'log') == 'raise':
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+        return response
+
+
+def get_user_type(request):
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return 'anonymous'
+    return 'staff' if user.is_staff else 'customer'
+
+
+class ProfilingMiddleware:
+    """
+    Profile a sampled fraction of requests, plus any request carrying a valid
+    signed X-Profile-Request header, and keep the slow ones.
+
+    Sampled profiles are only stored when the request took longer than
+    PROFILING_THRESHOLD_MS; header-triggered ones are always stored. Storage
+    is a ring buffer of the most recent PROFILING_MAX_PROFILES rows.
+
+    Place it above MetricsMiddleware so saving a profile does not count
+    against the view's query budget.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def _trigger(self, request):
+        header = request.headers.get('X-Profile-Request')
+        if header and check_header_token(header, settings.PROFILING_HEADER_MAX_AGE):
+            return 'header'
+        if settings.PROFILING_SAMPLE_RATE and random.random() < settings.PROFILING_SAMPLE_RATE:
+            return 'sample'
+        return None
+
+    def __call__(self, request):
+        trigger = self._trigger(request)
+        if trigger is None:
+            return self.get_response(request)
+
+        profiler = make_profiler(settings.PROFILING_MODE, interval=settings.PROFILING_INTERVAL)
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.stop()
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        if trigger == 'header' or duration_ms >= settings.PROFILING_THRESHOLD_MS:
+            self.save(request, response, profiler, trigger, duration_ms)
+        return response
+
+    def save(self, request, response, profiler, trigger, duration_ms):
+        stats = getattr(request, 'metrics', None)
+        RequestProfile.objects.create(
+            view_name=get_view_name(request),
+            method=request.method,
+            path=request.get_full_path()[:500],
+            status_code=response.status_code,
+            language=getattr(request, 'LANGUAGE_CODE', None) or translation.get_language() or '',
+            user_type=get_user_type(request),
+            trigger=trigger,
+            mode=profiler.mode,
+            duration_ms=duration_ms,
+            queries=stats.queries if stats else 0,
+            samples=profiler.samples,
+            folded_stacks=profiler.folded_stacks(),
+            stats=profiler.stats(),
+        )
+        RequestProfile.prune(settings.PROFILING_MAX_PROFILES)
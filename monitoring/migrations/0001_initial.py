@@ -0,0 +1,39 @@
+# Generated by Django 5.0 on 2026-10-19 16:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('view_name', models.CharField(max_length=200)),
+                ('method', models.CharField(max_length=10)),
+                ('path', models.CharField(max_length=500)),
+                ('status_code', models.PositiveSmallIntegerField()),
+                ('language', models.CharField(blank=True, max_length=10)),
+                ('user_type', models.CharField(choices=[('anonymous', 'Anonymous'), ('customer', 'Customer'), ('staff', 'Staff')], max_length=10)),
+                ('trigger', models.CharField(choices=[('sample', 'Sampled'), ('header', 'Debug header')], max_length=10)),
+                ('mode', models.CharField(max_length=10)),
+                ('duration_ms', models.FloatField()),
+                ('queries', models.PositiveIntegerField(default=0)),
+                ('samples', models.PositiveIntegerField(default=0)),
+                ('folded_stacks', models.TextField(blank=True)),
+                ('stats', models.TextField(blank=True)),
+            ],
+            options={
+                'verbose_name': 'Request Profile',
+                'verbose_name_plural': 'Request Profiles',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class RequestProfile(models.Model):
+    TRIGGER_CHOICES = [
+        ('sample', _('Sampled')),
+        ('header', _('Debug header')),
+    ]
+
+    USER_TYPE_CHOICES = [
+        ('anonymous', _('Anonymous')),
+        ('customer', _('Customer')),
+        ('staff', _('Staff')),
+    ]
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    view_name = models.CharField(max_length=200)
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=500)
+    status_code = models.PositiveSmallIntegerField()
+    language = models.CharField(max_length=10, blank=True)
+    user_type = models.CharField(max_length=10, choices=USER_TYPE_CHOICES)
+    trigger = models.CharField(max_length=10, choices=TRIGGER_CHOICES)
+    mode = models.CharField(max_length=10)
+    duration_ms = models.FloatField()
+    queries = models.PositiveIntegerField(default=0)
+    samples = models.PositiveIntegerField(default=0)
+    folded_stacks = models.TextField(blank=True)
+    stats = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = _('Request Profile')
+        verbose_name_plural = _('Request Profiles')
+
+    def __str__(self):
+        return f"{self.view_name} {self.duration_ms:.0f}ms"
+
+    @classmethod
+    def prune(cls, keep):
+        """
+        Delete all but the ``keep`` most recent profiles.
+        """
+        cutoff = list(cls.objects.order_by('-id').values_list('id', flat=True)[keep:keep + 1])
+        if cutoff:
+            cls.objects.filter(id__lte=cutoff[0]).delete()
@@ -0,0 +1,113 @@
+"""
+Request profilers.
+
+``StackSampler`` is a pure-Python sampling profiler: a background thread looks
+at the request thread's current frame every few milliseconds and counts the
+stacks it sees. The result is written in the "folded stacks" format
+(``frame;frame;frame count`` per line) that flamegraph.pl, speedscope and
+inferno read directly.
+
+``CProfiler`` wraps cProfile for when exact call counts matter more than a
+flame graph; its output is the usual pstats listing.
+"""
+
+import cProfile
+import io
+import pstats
+import sys
+import threading
+from collections import Counter
+
+from django.core import signing
+
+HEADER_SALT = 'monitoring.profiling'
+
+
+class StackSampler:
+    mode = 'sampler'
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.stacks = Counter()
+        self._thread_id = threading.get_ident()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is not None:
+                self.stacks[self._fold(frame)] += 1
+
+    @staticmethod
+    def _fold(frame):
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{frame.f_globals.get('__name__', '?')}:{code.co_name}")
+            frame = frame.f_back
+        return ';'.join(reversed(names))
+
+    @property
+    def samples(self):
+        return sum(self.stacks.values())
+
+    def folded_stacks(self):
+        return '\n'.join(f'{stack} {count}' for stack, count in self.stacks.most_common())
+
+    def stats(self):
+        return ''
+
+
+class CProfiler:
+    mode = 'cprofile'
+
+    def __init__(self, limit=60):
+        self.limit = limit
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+
+    @property
+    def samples(self):
+        return 0
+
+    def folded_stacks(self):
+        return ''
+
+    def stats(self):
+        output = io.StringIO()
+        pstats.Stats(self.profile, stream=output).sort_stats('cumulative').print_stats(self.limit)
+        return output.getvalue()
+
+
+def make_profiler(mode, interval=0.005):
+    if mode == CProfiler.mode:
+        return CProfiler()
+    return StackSampler(interval=interval)
+
+
+def make_header_token():
+    """
+    Value for the X-Profile-Request header that forces a request to be profiled.
+    """
+    return signing.TimestampSigner(salt=HEADER_SALT).sign('profile')
+
+
+def check_header_token(value, max_age):
+    try:
+        return signing.TimestampSigner(salt=HEADER_SALT).unsign(value, max_age=max_age) == 'profile'
+    except signing.BadSignature:
+        return False
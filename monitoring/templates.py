@@ -0,0 +1,36 @@
+"""
+Template backend that reports render time to the request metrics.
+
+Only top-level renders go through the backend; includes and extends are
+resolved by the engine and count towards the template that pulled them in.
+Queries run lazily from inside a template are included in its render time.
+"""
+
+import time
+
+from django.template.backends.django import DjangoTemplates as BaseDjangoTemplates
+
+from .metrics import record_render_time
+
+
+class TimedTemplate:
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        started = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            record_render_time(time.perf_counter() - started)
+
+
+class DjangoTemplates(BaseDjangoTemplates):
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
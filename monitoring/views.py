@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+from .metrics import render_prometheus
+
+
+def _metrics_authorized(request):
+    if request.user.is_authenticated and request.user.is_staff:
+        return True
+
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if not token:
+        return False
+
+    header = request.headers.get('Authorization', '')
+    supplied = header[len('Bearer '):] if header.startswith('Bearer ') else ''
+    return constant_time_compare(supplied, token)
+
+
+def metrics(request):
+    """
+    Per-view request metrics in the Prometheus text format.
+    """
+    if not _metrics_authorized(request):
+        return HttpResponseForbidden()
+    return HttpResponse(render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
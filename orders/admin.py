@@ -1,18 +1,53 @@
-from django.contrib import admin
-from .models import Order, OrderItem
+from django.conf import settings
+from django.contrib import admin, messages
+from django.db import transaction
+from .models import (
+    ArchivedOrder, ArchivedOrderItem, InvalidTransition, Order, OrderItem, OrderStatusHistory, Shipment,
+    ShippingManifest, TrackingEvent,
+)
+from .tasks import create_order_shipments, refresh_order_tracking
 
 class OrderItemInline(admin.TabularInline):
     model = OrderItem
     extra = 0
-    readonly_fields = ['price', 'quantity']
+    readonly_fields = ['product_name', 'variant_name', 'price', 'quantity']
+
+class TrackingEventInline(admin.TabularInline):
+    model = TrackingEvent
+    extra = 0
+    can_delete = False
+    readonly_fields = ['tracking_number', 'status', 'description', 'location', 'occurred_at']
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+class ShipmentInline(admin.TabularInline):
+    model = Shipment
+    extra = 0
+    can_delete = False
+    readonly_fields = ['carrier', 'status', 'tracking_number', 'label', 'manifest', 'error', 'created_at']
+    fields = readonly_fields
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+class OrderStatusHistoryInline(admin.TabularInline):
+    model = OrderStatusHistory
+    extra = 0
+    can_delete = False
+    readonly_fields = ['from_status', 'to_status', 'source', 'changed_by', 'note', 'created_at']
+
+    def has_add_permission(self, request, obj=None):
+        return False
 
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
-    list_display = ['id', 'user', 'status', 'total', 'created_at']
+    list_display = ['id', 'user', 'status', 'item_count', 'total', 'created_at']
     list_filter = ['status', 'created_at']
     search_fields = ['id', 'user__email', 'tracking_number']
     readonly_fields = ['created_at', 'updated_at']
-    inlines = [OrderItemInline]
+    inlines = [OrderItemInline, OrderStatusHistoryInline, ShipmentInline, TrackingEventInline]
+    actions = ['mark_processing', 'create_shipments', 'mark_shipped', 'mark_delivered', 'cancel_orders']
     
     fieldsets = (
         (None, {
@@ -25,7 +60,7 @@ class OrderAdmin(admin.ModelAdmin):
             'fields': ('currency', 'exchange_rate', 'subtotal', 'shipping_cost', 'tax', 'total')
         }),
         ('Shipping', {
-            'fields': ('tracking_number',)
+            'fields': ('shipping_method', 'tracking_number')
         }),
         ('Notes', {
             'fields': ('notes',)
@@ -39,3 +74,92 @@ class OrderAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         })
     )
+
+    def get_readonly_fields(self, request, obj=None):
+        # Existing orders only change status through the actions below
+        if obj is not None:
+            return self.readonly_fields + ['status']
+        return self.readonly_fields
+
+    def _transition(self, request, queryset, status):
+        changed = skipped = 0
+        for order in queryset.only('id', 'status'):
+            try:
+                order.transition_to(status, user=request.user, source='admin')
+            except InvalidTransition:
+                skipped += 1
+            else:
+                changed += 1
+        if changed:
+            self.message_user(request, f'{changed} order(s) moved to {status}.', messages.SUCCESS)
+        if skipped:
+            self.message_user(request, f'{skipped} order(s) cannot move to {status} and were skipped.', messages.WARNING)
+
+    @admin.action(description='Mark selected orders as processing')
+    def mark_processing(self, request, queryset):
+        self._transition(request, queryset, 'processing')
+
+    @admin.action(description='Create shipping labels for selected orders')
+    def create_shipments(self, request, queryset):
+        order_ids = list(queryset.filter(status='processing').values_list('id', flat=True))
+        size = settings.SHIPPING_LABEL_BATCH_SIZE
+        for start in range(0, len(order_ids), size):
+            create_order_shipments.delay(order_ids[start:start + size])
+        self.message_user(
+            request, f'Labels for {len(order_ids)} processing order(s) are being created.', messages.SUCCESS
+        )
+
+    @admin.action(description='Mark selected orders as shipped')
+    def mark_shipped(self, request, queryset):
+        self._transition(request, queryset, 'shipped')
+
+    @admin.action(description='Mark selected orders as delivered')
+    def mark_delivered(self, request, queryset):
+        self._transition(request, queryset, 'delivered')
+
+    @admin.action(description='Cancel selected orders')
+    def cancel_orders(self, request, queryset):
+        self._transition(request, queryset, 'cancelled')
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if 'tracking_number' in form.changed_data and obj.tracking_number:
+            transaction.on_commit(lambda: refresh_order_tracking.delay(obj.pk))
+
+
+class ArchivedOrderItemInline(admin.TabularInline):
+    model = ArchivedOrderItem
+    extra = 0
+    can_delete = False
+    readonly_fields = ['product_name', 'variant_name', 'price', 'quantity']
+    fields = readonly_fields
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(admin.ModelAdmin):
+    list_display = ['id', 'user', 'status', 'item_count', 'total', 'created_at', 'archived_at']
+    list_filter = ['status']
+    search_fields = ['id', 'user__email']
+    inlines = [ArchivedOrderItemInline]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(Shipment)
+class ShipmentAdmin(admin.ModelAdmin):
+    list_display = ['id', 'order', 'carrier', 'status', 'tracking_number', 'manifest', 'created_at']
+    list_filter = ['status', 'carrier', 'created_at']
+    search_fields = ['tracking_number', 'order__id']
+    raw_id_fields = ['order', 'manifest']
+    readonly_fields = ['created_at', 'updated_at']
+
+@admin.register(ShippingManifest)
+class ShippingManifestAdmin(admin.ModelAdmin):
+    list_display = ['id', 'carrier', 'reference', 'document', 'created_at']
+    list_filter = ['carrier', 'created_at']
+    search_fields = ['reference']
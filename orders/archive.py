@@ -0,0 +1,90 @@
+"""
+Order archival.
+
+Orders that reached a final status long ago are rarely read and never
+written, but they make every index on the live tables bigger. archive_orders()
+moves them, in batches, to ArchivedOrder/ArchivedOrderItem with their original
+ids; the order history views read both tables, so customers do not notice.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem, OrderStatusHistory, Shipment
+
+# Only orders nothing can happen to any more
+ARCHIVE_STATUSES = ('delivered', 'cancelled')
+
+_ORDER_FIELDS = [
+    field.attname for field in ArchivedOrder._meta.concrete_fields
+    if field.name not in ('status_history', 'shipments', 'archived_at')
+]
+_ITEM_FIELDS = [field.attname for field in ArchivedOrderItem._meta.concrete_fields if field.name != 'id']
+
+
+def archive_cutoff():
+    return timezone.now() - timedelta(days=settings.ORDER_ARCHIVE_AFTER_DAYS)
+
+
+def _archive_batch(before, batch_size):
+    with transaction.atomic():
+        # skip_locked: leave orders another transaction is working on for the next run
+        order_ids = list(
+            Order.objects.select_for_update(skip_locked=True).filter(
+                created_at__lt=before, status__in=ARCHIVE_STATUSES
+            ).order_by('id').values_list('id', flat=True)[:batch_size]
+        )
+        if not order_ids:
+            return 0
+
+        history = defaultdict(list)
+        for entry in OrderStatusHistory.objects.filter(order_id__in=order_ids).order_by('created_at', 'id').values(
+            'order_id', 'from_status', 'to_status', 'source', 'changed_by_id', 'note', 'created_at'
+        ):
+            entry['created_at'] = entry['created_at'].isoformat()
+            history[entry.pop('order_id')].append(entry)
+
+        shipments = defaultdict(list)
+        for entry in Shipment.objects.filter(order_id__in=order_ids).order_by('created_at', 'id').values(
+            'order_id', 'id', 'carrier', 'status', 'tracking_number', 'label', 'error',
+            'shipping_method_id', 'manifest_id', 'manifest__reference', 'created_at',
+        ):
+            entry['manifest_reference'] = entry.pop('manifest__reference')
+            entry['created_at'] = entry['created_at'].isoformat()
+            shipments[entry.pop('order_id')].append(entry)
+
+        ArchivedOrder.objects.bulk_create([
+            ArchivedOrder(status_history=history[row['id']], shipments=shipments[row['id']], **row)
+            for row in Order.objects.filter(id__in=order_ids).values(*_ORDER_FIELDS)
+        ])
+        ArchivedOrderItem.objects.bulk_create([
+            ArchivedOrderItem(**row)
+            for row in OrderItem.objects.filter(order_id__in=order_ids).order_by('id').values(*_ITEM_FIELDS)
+        ], batch_size=1000)
+
+        # Shipments go explicitly, once copied above; the order delete
+        # cascades to the items, status history and tracking events
+        Shipment.objects.filter(order_id__in=order_ids).delete()
+        Order.objects.filter(id__in=order_ids).delete()
+    return len(order_ids)
+
+
+def archive_orders(before=None, batch_size=500, max_batches=None):
+    """
+    Move finished orders placed before ``before`` (default: older than
+    ORDER_ARCHIVE_AFTER_DAYS) to the archive tables, one transaction per
+    batch. Returns the number of orders archived.
+    """
+    before = before or archive_cutoff()
+    archived = batches = 0
+    while max_batches is None or batches < max_batches:
+        count = _archive_batch(before, batch_size)
+        if not count:
+            break
+        archived += count
+        batches += 1
+    return archived
@@ -0,0 +1,149 @@
+"""
+Order exports for fulfillment partners (CSV and JSONL).
+
+Lines are read straight from OrderItem joined to its order, product, variant
+and shipping method as plain values, through a server-side cursor, so memory
+use stays flat however many orders are exported. Exports are resumable: each
+run covers orders with an id above ``after`` up to a ``through`` id fixed
+before streaming starts, and the next run continues from ``through``.
+"""
+
+from datetime import timedelta
+from itertools import groupby
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Max
+from django.utils import timezone
+
+from ecommerce.streaming import buffered, csv_chunks, encode, gzip_chunks, jsonl_chunks
+from .models import Order, OrderItem
+
+EXPORT_FORMATS = ('csv', 'jsonl')
+
+EXPORT_CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+# Paid and waiting to be shipped
+EXPORT_STATUSES = ('processing',)
+
+ORDER_FIELDS = [
+    'order_id', 'created_at', 'email', 'currency', 'shipping_method', 'shipping_address',
+    'subtotal', 'shipping_cost', 'tax', 'total', 'notes',
+]
+LINE_FIELDS = ['line_id', 'sku', 'product_name', 'variant_name', 'quantity', 'price']
+EXPORT_FIELDS = ORDER_FIELDS + LINE_FIELDS
+
+_VALUES = {
+    'order_id': 'order_id',
+    'created_at': 'order__created_at',
+    'email': 'order__email',
+    'currency': 'order__currency',
+    'shipping_method': 'order__shipping_method__name',
+    'shipping_address': 'order__shipping_address',
+    'subtotal': 'order__subtotal',
+    'shipping_cost': 'order__shipping_cost',
+    'tax': 'order__tax',
+    'total': 'order__total',
+    'notes': 'order__notes',
+    'line_id': 'id',
+    'product_name': 'product_name',
+    'variant_name': 'variant_name',
+    'quantity': 'quantity',
+    'price': 'price',
+    'variant_sku': 'variant__sku',
+    'product_sku': 'product__sku',
+}
+
+TOKEN_SALT = 'orders.exports'
+
+
+def export_through(after=0, statuses=EXPORT_STATUSES):
+    """
+    Highest order id the next export from ``after`` may include.
+
+    Ids are assigned when an order is placed, not when it is paid, so an
+    order still pending below the cutoff could be paid after the export and
+    be skipped forever. The cutoff therefore stops below any order placed
+    within ORDER_EXPORT_PENDING_GRACE that is still pending; older pending
+    orders are treated as abandoned.
+    """
+    through = Order.objects.filter(
+        id__gt=after, status__in=statuses
+    ).aggregate(latest=Max('id'))['latest'] or after
+
+    recent = timezone.now() - timedelta(seconds=settings.ORDER_EXPORT_PENDING_GRACE)
+    oldest_pending = Order.objects.filter(
+        id__gt=after, id__lte=through, status='pending', created_at__gte=recent
+    ).order_by('id').values_list('id', flat=True).first()
+    if oldest_pending is not None:
+        through = oldest_pending - 1
+    return through
+
+
+def iter_export_lines(after, through, statuses=EXPORT_STATUSES, chunk_size=2000):
+    """
+    Yield one dict per order line for orders in (after, through], ordered by
+    order and line.
+    """
+    lines = OrderItem.objects.filter(
+        order_id__gt=after,
+        order_id__lte=through,
+        order__status__in=statuses,
+    ).order_by('order_id', 'id').values(*_VALUES.values())
+
+    names = {value: key for key, value in _VALUES.items()}
+    for row in lines.iterator(chunk_size=chunk_size):
+        line = {names[key]: value for key, value in row.items()}
+        variant_sku, product_sku = line.pop('variant_sku'), line.pop('product_sku')
+        line['sku'] = variant_sku or product_sku or ''
+        line['created_at'] = line['created_at'].isoformat()
+        line['shipping_method'] = line['shipping_method'] or ''
+        yield line
+
+
+def iter_export_orders(lines):
+    """
+    Group consecutive lines into one dict per order with an ``items`` list.
+    """
+    for _order_id, group in groupby(lines, key=lambda line: line['order_id']):
+        group = list(group)
+        order = {field: group[0][field] for field in ORDER_FIELDS}
+        order['items'] = [{field: line[field] for field in LINE_FIELDS} for line in group]
+        yield order
+
+
+def stream_export(fmt, after, through, compress=False, statuses=EXPORT_STATUSES, chunk_size=2000):
+    """
+    Return an iterator of byte chunks: one row per order line for CSV, one
+    document per order (with its items) for JSONL.
+    """
+    lines = iter_export_lines(after, through, statuses=statuses, chunk_size=chunk_size)
+    if fmt == 'csv':
+        chunks = csv_chunks(EXPORT_FIELDS, lines)
+    elif fmt == 'jsonl':
+        chunks = jsonl_chunks(iter_export_orders(lines))
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+    chunks = encode(buffered(chunks))
+    if compress:
+        chunks = gzip_chunks(chunks)
+    return chunks
+
+
+def make_export_token(partner):
+    return signing.dumps({'partner': partner}, salt=TOKEN_SALT, compress=True)
+
+
+def check_export_token(token):
+    """
+    Return the partner name a token was issued for, or None if it is invalid
+    or older than ORDER_EXPORT_TOKEN_MAX_AGE.
+    """
+    try:
+        data = signing.loads(token, salt=TOKEN_SALT, max_age=settings.ORDER_EXPORT_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return None
+    return data.get('partner')
@@ -0,0 +1,142 @@
+"""
+Invoice PDFs.
+
+Each invoice is rendered once and stored on the default storage under a name
+derived from the order id, its updated_at and the language, so any change to
+the order produces a new file and an unchanged order is never rendered again.
+The name doubles as the ETag of the download.
+"""
+
+import hashlib
+import posixpath
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import translation
+from django.utils.formats import date_format
+from django.utils.translation import gettext as _
+
+from ecommerce.pdf import Document, truncate
+
+# Bump when the layout changes so stored invoices are re-rendered
+INVOICE_LAYOUT_VERSION = 1
+
+INVOICE_DIRECTORY = 'invoices'
+
+
+def invoice_key(order, language=None):
+    language = language or translation.get_language() or settings.LANGUAGE_CODE
+    source = f'{order.pk}:{order.updated_at.isoformat()}:{language}:{INVOICE_LAYOUT_VERSION}'
+    return hashlib.sha256(source.encode()).hexdigest()[:24]
+
+
+def invoice_name(order, language=None):
+    language = language or translation.get_language() or settings.LANGUAGE_CODE
+    return posixpath.join(INVOICE_DIRECTORY, str(order.pk), language, f'{invoice_key(order, language)}.pdf')
+
+
+def _money(order, amount):
+    return f'{order.currency} {amount:,.2f}'
+
+
+def render_invoice(order):
+    """
+    Render the invoice for ``order`` in the active language and return the
+    PDF bytes. Load the order with ``Order.objects.with_items()``.
+    """
+    document = Document(title=_('Invoice #%(number)s') % {'number': order.pk})
+    page = document.add_page()
+    left, right = 50, document.width - 50
+
+    y = document.height - 60
+    page.text(left, y, _('Invoice'), size=20, bold=True)
+    page.text(right, y, f'#{order.pk}', size=14, bold=True, align='right')
+    y -= 20
+    page.text(right, y, date_format(order.created_at, 'DATE_FORMAT'), align='right')
+
+    y -= 30
+    page.text(left, y, _('Bill to'), bold=True)
+    page.text(left + 250, y, _('Ship to'), bold=True)
+    billing = order.billing_address.splitlines() or ['']
+    shipping = order.shipping_address.splitlines() or ['']
+    for index in range(max(len(billing), len(shipping))):
+        y -= 14
+        if index < len(billing):
+            page.text(left, y, truncate(billing[index], 240, 10))
+        if index < len(shipping):
+            page.text(left + 250, y, truncate(shipping[index], 240, 10))
+    y -= 14
+    page.text(left, y, order.email)
+
+    columns = (
+        (left, _('Item'), 'left'),
+        (right - 170, _('Qty'), 'right'),
+        (right - 90, _('Price'), 'right'),
+        (right, _('Total'), 'right'),
+    )
+    y -= 36
+    for x, title, align in columns:
+        page.text(x, y, title, bold=True, align=align)
+    y -= 6
+    page.line(left, y, right, y)
+
+    for item in order.items.all():
+        if y < 120:
+            page = document.add_page()
+            y = document.height - 60
+        y -= 16
+        name = item.product_name
+        if item.variant_name:
+            name = f'{name} ({item.variant_name})'
+        page.text(left, y, truncate(name, right - 200 - left, 10))
+        page.text(right - 170, y, item.quantity, align='right')
+        page.text(right - 90, y, _money(order, item.price), align='right')
+        page.text(right, y, _money(order, item.total), align='right')
+
+    y -= 10
+    page.line(left, y, right, y)
+    for label, amount, bold in (
+        (_('Subtotal'), order.subtotal, False),
+        (_('Shipping'), order.shipping_cost, False),
+        (_('Tax'), order.tax, False),
+        (_('Total'), order.total, True),
+    ):
+        y -= 16
+        page.text(right - 90, y, label, bold=bold, align='right')
+        page.text(right, y, _money(order, amount), bold=bold, align='right')
+
+    return document.render()
+
+
+def _latest_key(order, language):
+    return f'invoice:latest:{order.pk}:{language}'
+
+
+def get_invoice(order, language=None, force=False):
+    """
+    Return the storage name of the order's invoice, rendering and storing it
+    first if needed. The previous render in the same language, if known, is
+    removed.
+    """
+    language = language or translation.get_language() or settings.LANGUAGE_CODE
+    name = invoice_name(order, language)
+    if not force and default_storage.exists(name):
+        return name
+
+    with translation.override(language):
+        content = render_invoice(order)
+    if default_storage.exists(name):
+        default_storage.delete(name)
+    # The storage may rename the file if a concurrent render saved the same name first
+    name = default_storage.save(name, ContentFile(content))
+
+    # Only the render this one replaces is deleted, never a file another
+    # process may have just saved next to it
+    latest = _latest_key(order, language)
+    previous = cache.get(latest)
+    cache.set(latest, name, None)
+    if previous and previous != name:
+        default_storage.delete(previous)
+    return name
@@ -0,0 +1,67 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from orders.exports import EXPORT_FORMATS, EXPORT_STATUSES, export_through, stream_export
+from orders.models import ExportCheckpoint
+
+
+class Command(BaseCommand):
+    help = 'Export newly paid orders with their lines as CSV or JSONL, resuming where the last export stopped'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv')
+        parser.add_argument('--output', default='-', help='File to write to, "-" for stdout')
+        parser.add_argument('--gzip', action='store_true', help='Compress the export with gzip')
+        parser.add_argument(
+            '--checkpoint', default='fulfillment',
+            help='Name of the checkpoint to resume from and advance on success',
+        )
+        parser.add_argument('--after', type=int, help='Start after this order id instead of the checkpoint')
+        parser.add_argument('--status', action='append', help='Statuses to export (repeatable)')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('--dry-run', action='store_true', help='Do not advance the checkpoint')
+
+    def handle(self, *args, **options):
+        checkpoint, _ = ExportCheckpoint.objects.get_or_create(name=options['checkpoint'])
+        after = options['after'] if options['after'] is not None else checkpoint.last_order_id
+        if after < 0:
+            raise CommandError('--after must not be negative')
+        statuses = options['status'] or EXPORT_STATUSES
+        through = export_through(after, statuses)
+
+        chunks = stream_export(
+            options['format'], after, through,
+            compress=options['gzip'],
+            statuses=statuses,
+            chunk_size=options['chunk_size'],
+        )
+
+        if options['output'] == '-':
+            written = self._write(sys.stdout.buffer, chunks)
+        else:
+            with open(options['output'], 'wb') as output:
+                written = self._write(output, chunks)
+
+        # Only advance once everything up to ``through`` has been written
+        if not options['dry_run'] and through > checkpoint.last_order_id:
+            checkpoint.last_order_id = through
+            checkpoint.exported_at = timezone.now()
+            checkpoint.save()
+
+        if through == after:
+            self.stderr.write(f'No new orders after {after}')
+            return
+        self.stderr.write(self.style.SUCCESS(
+            f"Exported orders {after + 1}..{through} ({written} bytes), "
+            f"checkpoint {checkpoint.name} at {checkpoint.last_order_id}"
+        ))
+
+    def _write(self, output, chunks):
+        written = 0
+        for chunk in chunks:
+            output.write(chunk)
+            written += len(chunk)
+        output.flush()
+        return written
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+
+from orders.exports import make_export_token
+
+
+class Command(BaseCommand):
+    help = 'Print a signed order export token and URL for a fulfillment partner'
+
+    def add_arguments(self, parser):
+        parser.add_argument('partner', help='Name of the partner the token is issued to')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], default='csv')
+
+    def handle(self, *args, **options):
+        url = reverse('orders:export', kwargs={'fmt': options['format']})
+        self.stdout.write(f"URL: {url}")
+        self.stdout.write(f"Header: Authorization: Bearer {make_export_token(options['partner'])}")
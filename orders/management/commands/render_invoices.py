@@ -0,0 +1,97 @@
+import multiprocessing
+import os
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+
+from orders import invoices
+from orders.models import Order
+
+
+def _chunks(ids, size):
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def _render_chunk(task):
+    """
+    Render the invoices for one chunk of order ids. Returns (rendered, cached).
+    """
+    order_ids, language, force = task
+    rendered = cached = 0
+    for order in Order.objects.with_items().filter(pk__in=order_ids).order_by('pk'):
+        name = invoices.invoice_name(order, language)
+        if not force and default_storage.exists(name):
+            cached += 1
+            continue
+        invoices.get_invoice(order, language, force=True)
+        rendered += 1
+    return rendered, cached
+
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f'Invalid date "{value}", expected YYYY-MM-DD')
+
+
+class Command(BaseCommand):
+    help = 'Render and store invoice PDFs for the orders placed in a date range'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='start', required=True, help='First day, YYYY-MM-DD')
+        parser.add_argument('--to', dest='end', help='Last day (inclusive), defaults to --from')
+        parser.add_argument('--status', action='append', help='Only orders with this status (repeatable)')
+        parser.add_argument('--language', default=settings.LANGUAGE_CODE)
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--chunk-size', type=int, default=200)
+        parser.add_argument('--force', action='store_true', help='Re-render invoices that are already stored')
+
+    def handle(self, *args, **options):
+        start = _parse_date(options['start'])
+        end = _parse_date(options['end']) if options['end'] else start
+        if end < start:
+            raise CommandError('--to must not be before --from')
+
+        orders = Order.objects.filter(
+            created_at__gte=timezone.make_aware(datetime.combine(start, time.min)),
+            created_at__lt=timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min)),
+        )
+        if options['status']:
+            orders = orders.filter(status__in=options['status'])
+        order_ids = list(orders.order_by('pk').values_list('pk', flat=True))
+        if not order_ids:
+            self.stdout.write('No orders in that range')
+            return
+
+        tasks = [
+            (chunk, options['language'], options['force'])
+            for chunk in _chunks(order_ids, options['chunk_size'])
+        ]
+        workers = max(1, min(options['workers'], len(tasks)))
+
+        rendered = cached = 0
+        if workers > 1:
+            # Children must open their own connections rather than share the parent's
+            connections.close_all()
+            context = multiprocessing.get_context('fork')
+            with context.Pool(workers) as pool:
+                for chunk_rendered, chunk_cached in pool.imap_unordered(_render_chunk, tasks):
+                    rendered += chunk_rendered
+                    cached += chunk_cached
+                    if options['verbosity'] > 1:
+                        self.stdout.write(f'{rendered + cached}/{len(order_ids)}')
+        else:
+            for task in tasks:
+                chunk_rendered, chunk_cached = _render_chunk(task)
+                rendered += chunk_rendered
+                cached += chunk_cached
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(order_ids)} invoices: {rendered} rendered, {cached} already stored'
+        ))
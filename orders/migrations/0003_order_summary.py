@@ -0,0 +1,78 @@
+# Generated by Django 5.0 on 2026-10-19 16:24
+
+from django.db import migrations, models
+from django.db.models import Case, IntegerField, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+
+def backfill_summaries(apps, schema_editor):
+    Order = apps.get_model('orders', 'Order')
+    OrderItem = apps.get_model('orders', 'OrderItem')
+    ProductTranslation = apps.get_model('catalog', 'ProductTranslation')
+    ProductVariant = apps.get_model('catalog', 'ProductVariant')
+    ProductImage = apps.get_model('catalog', 'ProductImage')
+
+    # Set-based updates so this stays a handful of statements on large tables
+    OrderItem.objects.update(
+        product_name=Coalesce(Subquery(
+            ProductTranslation.objects.filter(master_id=OuterRef('product_id')).order_by(
+                Case(When(language_code='en', then=Value(0)), default=Value(1), output_field=IntegerField()),
+                'language_code',
+            ).values('name')[:1]
+        ), Value('')),
+        variant_name=Coalesce(Subquery(
+            ProductVariant.objects.filter(pk=OuterRef('variant_id')).values('name')[:1]
+        ), Value('')),
+    )
+
+    first_item = OrderItem.objects.filter(order_id=OuterRef('pk')).order_by('id')
+    Order.objects.update(
+        item_count=Coalesce(Subquery(
+            OrderItem.objects.filter(order_id=OuterRef('pk')).order_by().values('order_id').annotate(
+                total=Sum('quantity')
+            ).values('total')
+        ), Value(0)),
+        first_item_name=Coalesce(Subquery(first_item.values('product_name')[:1]), Value('')),
+        first_item_thumbnail=Coalesce(Subquery(
+            ProductImage.objects.filter(
+                product_id=Subquery(first_item.values('product_id')[:1])
+            ).order_by('-is_primary', 'created_at').values('image')[:1]
+        ), Value('')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0002_order_history_indexes'),
+        ('catalog', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='first_item_name',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='first_item_thumbnail',
+            field=models.ImageField(blank=True, max_length=255, upload_to='products/'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='item_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='product_name',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='variant_name',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
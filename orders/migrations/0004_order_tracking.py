@@ -0,0 +1,41 @@
+# Generated by Django 5.0 on 2026-10-19 16:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_order_summary'),
+        ('shipping', '0002_shippingmethod_carrier'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='shipping_method',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='orders', to='shipping.shippingmethod'),
+        ),
+        migrations.CreateModel(
+            name='TrackingEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tracking_number', models.CharField(max_length=100)),
+                ('status', models.CharField(choices=[('label_created', 'Label created'), ('in_transit', 'In transit'), ('out_for_delivery', 'Out for delivery'), ('delivered', 'Delivered'), ('exception', 'Delivery exception')], max_length=20)),
+                ('description', models.CharField(blank=True, max_length=255)),
+                ('location', models.CharField(blank=True, max_length=100)),
+                ('occurred_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tracking_events', to='orders.order')),
+            ],
+            options={
+                'ordering': ['occurred_at', 'id'],
+                'indexes': [models.Index(fields=['order', 'tracking_number', 'occurred_at'], name='tracking_event_order_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='trackingevent',
+            constraint=models.UniqueConstraint(fields=('tracking_number', 'status', 'occurred_at'), name='tracking_event_unique'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.0 on 2026-10-19 16:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_order_rollup_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_order_id', models.PositiveBigIntegerField(default=0)),
+                ('exported_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.0 on 2026-10-19 16:39
+
+from django.db import migrations
+
+
+def merge_carts(apps, schema_editor):
+    """
+    Move orders.Cart/CartItem rows into checkout.Cart/CartItem. A user who
+    already has a checkout cart keeps it, with the other cart's lines added.
+    """
+    OldCart = apps.get_model('orders', 'Cart')
+    OldCartItem = apps.get_model('orders', 'CartItem')
+    Cart = apps.get_model('checkout', 'Cart')
+    CartItem = apps.get_model('checkout', 'CartItem')
+
+    existing = {}
+    for cart_id, user_id in Cart.objects.filter(user__isnull=False).order_by('-id').values_list('id', 'user_id'):
+        existing[user_id] = cart_id
+
+    old_carts = list(OldCart.objects.order_by('id'))
+    targets = {}
+    new_carts = []
+    for old in old_carts:
+        if old.user_id in existing:
+            targets[old.id] = existing[old.user_id]
+        else:
+            new_carts.append((old.id, Cart(
+                user_id=old.user_id,
+                session_key=old.session_key or '',
+                currency=old.currency,
+            )))
+    created = Cart.objects.bulk_create([cart for _, cart in new_carts], batch_size=1000)
+    for (old_id, _), cart in zip(new_carts, created):
+        targets[old_id] = cart.pk
+
+    lines = {}
+    for item in OldCartItem.objects.order_by('id').iterator(chunk_size=2000):
+        key = (targets[item.cart_id], item.product_id, item.variant_id)
+        lines[key] = lines.get(key, 0) + item.quantity
+
+    current = {
+        (item.cart_id, item.product_id, item.variant_id): item
+        for item in CartItem.objects.filter(cart_id__in=set(existing.values()))
+    }
+    updated, added = [], []
+    for key, quantity in lines.items():
+        if key in current:
+            current[key].quantity += quantity
+            updated.append(current[key])
+        else:
+            added.append(CartItem(cart_id=key[0], product_id=key[1], variant_id=key[2], quantity=quantity))
+    CartItem.objects.bulk_update(updated, ['quantity'], batch_size=1000)
+    CartItem.objects.bulk_create(added, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0008_order_archive'),
+        ('checkout', '0004_checkout_session_stale_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_carts, migrations.RunPython.noop),
+        migrations.DeleteModel(
+            name='CartItem',
+        ),
+        migrations.DeleteModel(
+            name='Cart',
+        ),
+    ]
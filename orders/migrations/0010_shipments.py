@@ -0,0 +1,48 @@
+# Generated by Django 5.0 on 2026-10-19 17:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0009_merge_carts_into_checkout'),
+        ('shipping', '0007_delivery_calendars'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShippingManifest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('carrier', models.CharField(max_length=30)),
+                ('reference', models.CharField(blank=True, max_length=100)),
+                ('document', models.FileField(blank=True, max_length=255, upload_to='shipping/manifests/')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-created_at', '-id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Shipment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('carrier', models.CharField(max_length=30)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('labelled', 'Labelled'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('tracking_number', models.CharField(blank=True, max_length=100)),
+                ('label', models.FileField(blank=True, max_length=255, upload_to='shipping/labels/')),
+                ('error', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shipments', to='orders.order')),
+                ('shipping_method', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='shipments', to='shipping.shippingmethod')),
+                ('manifest', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='shipments', to='orders.shippingmanifest')),
+            ],
+            options={
+                'ordering': ['-created_at', '-id'],
+                'indexes': [models.Index(fields=['status', 'carrier'], name='shipment_status_carrier_idx'), models.Index(fields=['tracking_number'], name='shipment_tracking_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.0 on 2026-10-19 17:16
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_line_counts(apps, schema_editor):
+    for order_model, item_model in (('Order', 'OrderItem'), ('ArchivedOrder', 'ArchivedOrderItem')):
+        Order = apps.get_model('orders', order_model)
+        OrderItem = apps.get_model('orders', item_model)
+        Order.objects.update(line_count=Coalesce(Subquery(
+            OrderItem.objects.filter(order_id=OuterRef('pk')).order_by().values('order_id').annotate(
+                lines=Count('id')
+            ).values('lines')
+        ), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0010_shipments'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedorder',
+            name='line_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='line_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_line_counts, migrations.RunPython.noop),
+    ]
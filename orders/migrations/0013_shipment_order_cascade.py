@@ -0,0 +1,19 @@
+# Generated by Django 5.0 on 2026-10-19 17:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0012_archive_shipments'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='shipment',
+            name='order',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shipments', to='orders.order'),
+        ),
+    ]
@@ -1,10 +1,45 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Prefetch
 from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
-from catalog.models import Product, ProductVariant
+from catalog.models import Product, ProductVariant, ProductImage
 
 
-class Order(models.Model):
+class InvalidTransition(Exception):
+    """
+    The order is not in a status the requested transition can start from.
+    """
+    def __init__(self, order_id, current, target):
+        self.current = current
+        self.target = target
+        super().__init__(f'Order {order_id} cannot go from {current} to {target}')
+
+
+class OrderQuerySet(models.QuerySet):
+    def with_items(self):
+        """
+        Prefetch items with their products, variants, translations and images,
+        so rendering an order's lines takes a fixed number of queries.
+        """
+        item_model = self.model._meta.get_field('items').related_model
+        return self.prefetch_related(
+            Prefetch(
+                'items',
+                queryset=item_model.objects.select_related(
+                    'product', 'variant'
+                ).prefetch_related(
+                    'product__translations', 'product__images'
+                ).order_by('id')
+            )
+        )
+
+
+class AbstractOrder(models.Model):
+    """
+    Fields shared by live orders and their archived copies.
+    """
     STATUS_CHOICES = [
         ('pending', _('Pending')),
         ('processing', _('Processing')),
@@ -13,7 +48,6 @@ class Order(models.Model):
         ('cancelled', _('Cancelled')),
     ]
 
-    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='orders')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     email = models.EmailField()
     shipping_address = models.TextField()
@@ -30,7 +64,18 @@ class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Summary of the items, kept on the order so lists never touch OrderItem
+    item_count = models.PositiveIntegerField(default=0)
+    line_count = models.PositiveIntegerField(default=0)
+    first_item_name = models.CharField(max_length=255, blank=True)
+    first_item_thumbnail = models.ImageField(upload_to='products/', max_length=255, blank=True)
+
+    objects = OrderQuerySet.as_manager()
+
+    is_archived = False
+
     class Meta:
+        abstract = True
         ordering = ['-created_at']
 
     def __str__(self):
@@ -40,57 +85,316 @@ class Order(models.Model):
     def formatted_total(self):
         return f"{self.currency} {self.total}"
 
+    @property
+    def other_item_count(self):
+        # Lines, not units: "Widget and 2 more items" names the other products
+        return max(self.line_count - 1, 0)
 
-class OrderItem(models.Model):
-    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items')
+
+class Order(AbstractOrder):
+    # Allowed status changes; anything else is rejected by transition_to()
+    TRANSITIONS = {
+        'pending': ('processing', 'cancelled'),
+        'processing': ('shipped', 'cancelled'),
+        'shipped': ('delivered',),
+        'delivered': (),
+        'cancelled': (),
+    }
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='orders')
+    shipping_method = models.ForeignKey(
+        'shipping.ShippingMethod', on_delete=models.SET_NULL, null=True, blank=True, related_name='orders'
+    )
+
+    class Meta(AbstractOrder.Meta):
+        indexes = [
+            # Order history: newest first per customer, optionally by status,
+            # with id as the keyset tie-breaker
+            models.Index(fields=['user', '-created_at', '-id'], name='order_user_created_idx'),
+            models.Index(fields=['user', 'status', '-created_at', '-id'], name='order_user_status_created_idx'),
+            models.Index(fields=['stripe_payment_intent'], name='order_payment_intent_idx'),
+            # Sales rollups: changed orders since the watermark, and whole days by placement
+            models.Index(fields=['updated_at'], name='order_updated_idx'),
+            models.Index(fields=['created_at'], name='order_created_idx'),
+        ]
+
+    def get_tracking_info(self):
+        """
+        Tracking steps for display. Reads cached carrier events only; the
+        carrier itself is polled by orders.tasks.refresh_order_tracking.
+        """
+        from .tracking import get_tracking_info
+        return get_tracking_info(self)
+
+    def get_tracking_url(self):
+        if not self.tracking_number or not self.shipping_method:
+            return ''
+        from shipping.carriers import BaseCarrier, get_carrier
+        try:
+            carrier = get_carrier(self.shipping_method.carrier)
+        except ImproperlyConfigured:
+            # A carrier dropped from SHIPPING_CARRIERS must not break the tracking page
+            carrier = BaseCarrier()
+        return carrier.tracking_url(self.tracking_number, self.shipping_method)
+
+    def can_transition_to(self, status):
+        return status in self.TRANSITIONS.get(self.status, ())
+
+    def transition_to(self, status, user=None, source='system', note=''):
+        """
+        Move the order to ``status`` and record it in the status history.
+
+        The UPDATE only matches the status this instance last saw, so two
+        concurrent transitions cannot both win: the loser re-reads the status
+        and tries again if the transition is still allowed from there, or
+        raises InvalidTransition.
+        """
+        if status not in self.TRANSITIONS:
+            raise ValueError(f'Unknown order status: {status}')
+
+        with transaction.atomic():
+            # Terminates: statuses only move forward through TRANSITIONS
+            while True:
+                current = self.status
+                if not self.can_transition_to(status):
+                    raise InvalidTransition(self.pk, current, status)
+                now = timezone.now()
+                if Order.objects.filter(pk=self.pk, status=current).update(status=status, updated_at=now):
+                    break
+                self.status = Order.objects.values_list('status', flat=True).get(pk=self.pk)
+
+            OrderStatusHistory.objects.create(
+                order=self, from_status=current, to_status=status,
+                changed_by=user, source=source, note=note,
+            )
+
+        self.status = status
+        self.updated_at = now
+
+    def can_cancel(self):
+        return self.can_transition_to('cancelled')
+
+    def cancel(self, user=None, source='customer', note=''):
+        self.transition_to('cancelled', user=user, source=source, note=note)
+
+    def refresh_summary(self, save=True):
+        """
+        Recompute item_count, line_count and the first item's name and thumbnail.
+        Call once the order's items have been created.
+        """
+        items = list(self.items.order_by('id').values_list('quantity', 'product_name', 'product_id'))
+        self.item_count = sum(quantity for quantity, _name, _product in items)
+        self.line_count = len(items)
+        self.first_item_name = items[0][1] if items else ''
+        image = None
+        if items and items[0][2]:
+            image = ProductImage.objects.filter(product_id=items[0][2]).values_list('image', flat=True).first()
+        self.first_item_thumbnail = image or ''
+        if save:
+            self.save(update_fields=['item_count', 'line_count', 'first_item_name', 'first_item_thumbnail'])
+
+
+class AbstractOrderItem(models.Model):
     product = models.ForeignKey(Product, on_delete=models.SET_NULL, null=True)
     variant = models.ForeignKey(ProductVariant, on_delete=models.SET_NULL, null=True)
+    product_name = models.CharField(max_length=255, blank=True)
+    variant_name = models.CharField(max_length=100, blank=True)
     quantity = models.PositiveIntegerField()
     price = models.DecimalField(max_digits=10, decimal_places=2)
     currency = models.CharField(max_length=3)
     exchange_rate = models.DecimalField(max_digits=10, decimal_places=6, default=1.0)
 
+    class Meta:
+        abstract = True
+
     def __str__(self):
-        return f"{self.quantity}x {self.product.name} in Order {self.order.id}"
+        return f"{self.quantity}x {self.product_name} in Order {self.order_id}"
+
+    def save(self, *args, **kwargs):
+        # Snapshot the names at placement time; products can be renamed or deleted later
+        if not self.product_name and self.product:
+            self.product_name = self.product.safe_translation_getter('name', any_language=True) or ''
+        if not self.variant_name and self.variant:
+            self.variant_name = self.variant.name
+        super().save(*args, **kwargs)
 
     @property
     def total(self):
         return self.quantity * self.price
 
 
-class Cart(models.Model):
-    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True)
-    session_key = models.CharField(max_length=40, null=True, blank=True)
-    currency = models.CharField(max_length=3, default='USD')
+class OrderItem(AbstractOrderItem):
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items')
+
+
+class ArchivedOrder(AbstractOrder):
+    """
+    An order moved out of the live tables by orders.archive. It keeps the
+    original id, so order URLs and invoices keep working, and its status
+    history as JSON.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='archived_orders')
+    shipping_method = models.ForeignKey(
+        'shipping.ShippingMethod', on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    # Copied as-is, not stamped on save
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    status_history = models.JSONField(default=list, blank=True)
+    # The order's Shipment rows; label and manifest files stay in storage
+    shipments = models.JSONField(default=list, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    is_archived = True
+
+    class Meta(AbstractOrder.Meta):
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='archived_order_user_idx'),
+            models.Index(fields=['user', 'status', '-created_at', '-id'], name='archived_order_status_idx'),
+            models.Index(fields=['created_at'], name='archived_order_created_idx'),
+        ]
+
+    def can_cancel(self):
+        return False
+
+
+class ArchivedOrderItem(AbstractOrderItem):
+    order = models.ForeignKey(ArchivedOrder, on_delete=models.CASCADE, related_name='items')
+
+
+class TrackingEvent(models.Model):
+    STATUS_CHOICES = [
+        ('label_created', _('Label created')),
+        ('in_transit', _('In transit')),
+        ('out_for_delivery', _('Out for delivery')),
+        ('delivered', _('Delivered')),
+        ('exception', _('Delivery exception')),
+    ]
+
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='tracking_events')
+    tracking_number = models.CharField(max_length=100)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES)
+    description = models.CharField(max_length=255, blank=True)
+    location = models.CharField(max_length=100, blank=True)
+    occurred_at = models.DateTimeField()
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
+        ordering = ['occurred_at', 'id']
         constraints = [
-            models.CheckConstraint(
-                check=models.Q(user__isnull=False) | models.Q(session_key__isnull=False),
-                name='cart_user_or_session'
-            )
+            # Lets a refresh re-insert everything the carrier reports without duplicates
+            models.UniqueConstraint(
+                fields=['tracking_number', 'status', 'occurred_at'],
+                name='tracking_event_unique',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['order', 'tracking_number', 'occurred_at'], name='tracking_event_order_idx'),
         ]
 
     def __str__(self):
-        return f"Cart for {self.user.email if self.user else 'Anonymous'}"
+        return f"{self.tracking_number} {self.status} at {self.occurred_at}"
 
 
-class CartItem(models.Model):
-    cart = models.ForeignKey(Cart, on_delete=models.CASCADE, related_name='items')
-    product = models.ForeignKey(Product, on_delete=models.CASCADE)
-    variant = models.ForeignKey(ProductVariant, on_delete=models.CASCADE, null=True)
-    quantity = models.PositiveIntegerField(default=1)
+class OrderStatusHistory(models.Model):
+    """
+    Append-only log of status changes, written by Order.transition_to().
+    """
+    SOURCE_CHOICES = [
+        ('customer', _('Customer')),
+        ('admin', _('Admin')),
+        ('carrier', _('Carrier')),
+        ('payment', _('Payment')),
+        ('system', _('System')),
+    ]
+
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='status_history')
+    from_status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    to_status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    changed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES, default='system')
+    note = models.CharField(max_length=255, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
-        unique_together = ('cart', 'product', 'variant')
+        ordering = ['created_at', 'id']
+        verbose_name_plural = 'order status history'
+        indexes = [
+            models.Index(fields=['order', 'created_at'], name='order_status_history_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.quantity}x {self.product.name} in Cart {self.cart.id}"
+        return f"Order {self.order_id}: {self.from_status} -> {self.to_status}"
 
-    @property
-    def total(self):
-        return self.quantity * (self.variant.price if self.variant else self.product.base_price)
+    def save(self, *args, **kwargs):
+        if self.pk:
+            raise ValueError('Order status history is append-only')
+        super().save(*args, **kwargs)
+
+
+class ExportCheckpoint(models.Model):
+    """
+    Where a named, resumable order export (see orders.exports) left off.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    last_order_id = models.PositiveBigIntegerField(default=0)
+    exported_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.name} through order {self.last_order_id}"
+
+
+class ShippingManifest(models.Model):
+    """
+    A carrier's list of parcels handed over in one pickup (see orders.shipments).
+    """
+    carrier = models.CharField(max_length=30)
+    reference = models.CharField(max_length=100, blank=True)
+    document = models.FileField(upload_to='shipping/manifests/', max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+
+    def __str__(self):
+        return f"{self.carrier} manifest {self.reference or self.pk}"
+
+
+class Shipment(models.Model):
+    """
+    A labelled parcel for an order, created by orders.shipments.
+    """
+    STATUS_CHOICES = [
+        ('pending', _('Pending')),
+        ('labelled', _('Labelled')),
+        ('failed', _('Failed')),
+    ]
+
+    # orders.archive copies shipments to the archive before deleting its orders
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='shipments')
+    shipping_method = models.ForeignKey(
+        'shipping.ShippingMethod', on_delete=models.SET_NULL, null=True, blank=True, related_name='shipments'
+    )
+    manifest = models.ForeignKey(
+        ShippingManifest, on_delete=models.SET_NULL, null=True, blank=True, related_name='shipments'
+    )
+    carrier = models.CharField(max_length=30)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    tracking_number = models.CharField(max_length=100, blank=True)
+    label = models.FileField(upload_to='shipping/labels/', max_length=255, blank=True)
+    error = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['status', 'carrier'], name='shipment_status_carrier_idx'),
+            models.Index(fields=['tracking_number'], name='shipment_tracking_idx'),
+        ]
+
+    def __str__(self):
+        return f"Shipment {self.pk} for order {self.order_id}"
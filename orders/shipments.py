@@ -0,0 +1,184 @@
+"""
+Shipments, labels and manifests for a wave of paid orders.
+
+``create_shipments(order_ids)`` claims the processing orders of the batch that
+are not already labelled or being labelled, gives each a pending Shipment, and
+buys the labels from each order's carrier (see shipping.carriers) in a thread
+pool of SHIPPING_LABEL_WORKERS, so one slow carrier call does not hold up the
+rest. The threads only talk to carriers and the file storage; the database is
+read before and written after, in bulk: shipments and the orders' tracking
+numbers are saved with bulk_update, then each carrier's new labels are closed
+out in one manifest.
+
+A label the carrier (or the storage) fails on marks its shipment failed with
+the error, and the next batch that includes the order tries again. Whatever
+was finished is written back even if the batch dies part way; shipments a
+dead batch left pending are claimed again once they are
+SHIPPING_LABEL_CLAIM_TIMEOUT seconds old.
+"""
+
+import logging
+import posixpath
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from shipping.carriers import LabelRequest, get_carrier
+from .models import Order, Shipment, ShippingManifest
+
+logger = logging.getLogger(__name__)
+
+LABEL_DIRECTORY = 'shipping/labels'
+MANIFEST_DIRECTORY = 'shipping/manifests'
+
+
+def _claim(order_ids):
+    """
+    Pending shipments for the orders in ``order_ids`` that can be labelled,
+    reusing failed ones and ones a dead batch left pending. Orders locked by
+    another batch are left to it.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.SHIPPING_LABEL_CLAIM_TIMEOUT)
+    with transaction.atomic():
+        busy = Shipment.objects.filter(Q(status='labelled') | Q(status='pending', updated_at__gte=stale))
+        orders = list(
+            Order.objects.select_for_update(skip_locked=True, of=('self',))
+            .filter(pk__in=order_ids, status='processing')
+            .exclude(pk__in=busy.values('order_id'))
+            .select_related('shipping_method')
+        )
+        retried = {
+            shipment.order_id: shipment
+            for shipment in Shipment.objects.filter(order__in=orders, status__in=('failed', 'pending'))
+        }
+        new = []
+        for order in orders:
+            method = order.shipping_method
+            carrier = (method.carrier if method else '') or settings.SHIPPING_DEFAULT_CARRIER
+            shipment = retried.get(order.pk)
+            if shipment is None:
+                new.append(Shipment(order=order, shipping_method=method, carrier=carrier))
+            else:
+                shipment.carrier, shipment.status, shipment.error = carrier, 'pending', ''
+                shipment.updated_at = now
+        Shipment.objects.bulk_create(new)
+        Shipment.objects.bulk_update(retried.values(), ['carrier', 'status', 'error', 'updated_at'])
+
+    shipments = new + list(retried.values())
+    by_id = {order.pk: order for order in orders}
+    for shipment in shipments:
+        shipment.order = by_id[shipment.order_id]
+    return shipments
+
+
+def _label_request(shipment):
+    order = shipment.order
+    return LabelRequest(
+        shipment_id=shipment.pk,
+        order_id=order.pk,
+        reference=f'Order {order.pk}',
+        address=order.shipping_address,
+        email=order.email,
+        service=order.shipping_method.name if order.shipping_method else '',
+    )
+
+
+def _buy_label(carrier, request):
+    label = carrier.create_label(request)
+    name = posixpath.join(LABEL_DIRECTORY, str(request.order_id), f'{label.tracking_number}.{label.format}')
+    return label, default_storage.save(name, ContentFile(label.content))
+
+
+def _close_out(carrier, labels):
+    manifest = carrier.create_manifest([(request, label) for _shipment, request, label in labels])
+    name = posixpath.join(MANIFEST_DIRECTORY, f'{manifest.reference}.{manifest.format}')
+    return manifest, default_storage.save(name, ContentFile(manifest.content))
+
+
+def _save(shipments):
+    """
+    Write the shipments' outcome, and the labelled ones' tracking numbers to
+    their orders. Returns the number labelled.
+    """
+    now = timezone.now()
+    orders = []
+    for shipment in shipments:
+        shipment.updated_at = now
+        if shipment.status == 'labelled':
+            shipment.order.tracking_number = shipment.tracking_number
+            shipment.order.updated_at = now
+            orders.append(shipment.order)
+    Shipment.objects.bulk_update(
+        shipments, ['status', 'tracking_number', 'label', 'error', 'updated_at'], batch_size=500
+    )
+    Order.objects.bulk_update(orders, ['tracking_number', 'updated_at'], batch_size=500)
+    return len(orders)
+
+
+def create_shipments(order_ids):
+    """
+    Label the orders in ``order_ids`` and manifest them per carrier. Returns
+    counts of labelled and failed shipments and of manifests.
+    """
+    shipments = _claim(order_ids)
+    labelled = {}
+    manifests = {}
+
+    # Adapters are pluggable, so any exception fails just its shipment, and
+    # labels already bought are saved even if the batch itself dies
+    try:
+        with ThreadPoolExecutor(max_workers=settings.SHIPPING_LABEL_WORKERS) as pool:
+            futures = {}
+            for shipment in shipments:
+                try:
+                    carrier = get_carrier(shipment.carrier)
+                except Exception as e:
+                    shipment.status, shipment.error = 'failed', str(e)[:255]
+                    continue
+                request = _label_request(shipment)
+                futures[pool.submit(_buy_label, carrier, request)] = (shipment, carrier, request)
+
+            for future in as_completed(futures):
+                shipment, carrier, request = futures[future]
+                try:
+                    label, name = future.result()
+                except Exception as e:
+                    logger.warning('Label for order %s failed: %s', request.order_id, e)
+                    shipment.status, shipment.error = 'failed', str(e)[:255]
+                    continue
+                shipment.status, shipment.error = 'labelled', ''
+                shipment.tracking_number = label.tracking_number
+                shipment.label.name = name
+                labelled.setdefault(carrier, []).append((shipment, request, label))
+
+            # The carriers' manifests are independent calls too
+            manifests = {pool.submit(_close_out, carrier, labels): carrier for carrier, labels in labelled.items()}
+    finally:
+        labelled_count = _save(shipments)
+
+    manifest_count = 0
+    for future, carrier in manifests.items():
+        try:
+            manifest, name = future.result()
+        except Exception as e:
+            # The labels stand; the parcels can go on the next manifest by hand
+            logger.warning('Manifest for carrier %s failed: %s', carrier.code, e)
+            continue
+        record = ShippingManifest.objects.create(carrier=carrier.code, reference=manifest.reference, document=name)
+        Shipment.objects.filter(
+            pk__in=[shipment.pk for shipment, _request, _label in labelled[carrier]]
+        ).update(manifest=record)
+        manifest_count += 1
+
+    return {
+        'labelled': labelled_count,
+        'failed': sum(shipment.status == 'failed' for shipment in shipments),
+        'manifests': manifest_count,
+    }
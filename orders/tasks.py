@@ -0,0 +1,51 @@
+from celery import shared_task
+
+from shipping.carriers import CarrierError
+from .models import Order
+from .archive import archive_orders
+from .shipments import create_shipments
+from .tracking import refresh_tracking
+
+
+@shared_task(autoretry_for=(CarrierError,), retry_backoff=True, max_retries=5)
+def refresh_order_tracking(order_id):
+    """
+    Fetch carrier events for one order and update its tracking cache.
+    """
+    order = Order.objects.select_related('shipping_method').filter(
+        pk=order_id
+    ).exclude(tracking_number='').first()
+    if order is None:
+        return 0
+    return refresh_tracking(order)
+
+
+@shared_task
+def refresh_active_tracking():
+    """
+    Periodic task: queue a tracking refresh for every order in transit.
+    """
+    order_ids = Order.objects.filter(status='shipped').exclude(
+        tracking_number=''
+    ).values_list('id', flat=True)
+    queued = 0
+    for order_id in order_ids.iterator(chunk_size=2000):
+        refresh_order_tracking.delay(order_id)
+        queued += 1
+    return queued
+
+
+@shared_task
+def archive_old_orders():
+    """
+    Periodic task: move finished orders past ORDER_ARCHIVE_AFTER_DAYS to the archive.
+    """
+    return archive_orders()
+
+
+@shared_task
+def create_order_shipments(order_ids):
+    """
+    Buy labels for a wave of processing orders and manifest them per carrier.
+    """
+    return create_shipments(order_ids)
@@ -0,0 +1,115 @@
+"""
+Order tracking.
+
+Carrier events are fetched by Celery workers (``orders.tasks``), stored as
+``TrackingEvent`` rows and cached per tracking number. The tracking page and
+its htmx polling only ever read that cache, falling back to the stored events
+on a miss, so no request waits on a carrier.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext as _
+
+from shipping.carriers import get_carrier
+from .models import InvalidTransition, TrackingEvent
+
+
+def cache_key(tracking_number):
+    return f'orders:tracking:{tracking_number}'
+
+
+def load_events(tracking_number):
+    return list(
+        TrackingEvent.objects.filter(tracking_number=tracking_number).order_by(
+            'occurred_at', 'id'
+        ).values('status', 'description', 'location', 'occurred_at')
+    )
+
+
+def get_events(tracking_number):
+    key = cache_key(tracking_number)
+    events = cache.get(key)
+    if events is None:
+        events = load_events(tracking_number)
+        cache.set(key, events, settings.TRACKING_CACHE_TIMEOUT)
+    return events
+
+
+def refresh_tracking(order):
+    """
+    Pull the latest events from the order's carrier, store new ones and
+    refresh the cache. Returns the number of events the carrier reported.
+    """
+    method = order.shipping_method
+    carrier = get_carrier(method.carrier if method else None)
+    events = carrier.track(order.tracking_number, method)
+
+    TrackingEvent.objects.bulk_create([
+        TrackingEvent(
+            order=order,
+            tracking_number=order.tracking_number,
+            status=event.status,
+            description=event.description,
+            location=event.location,
+            occurred_at=event.occurred_at,
+        )
+        for event in events
+    ], ignore_conflicts=True)
+
+    if any(event.status == 'delivered' for event in events) and order.can_transition_to('delivered'):
+        try:
+            order.transition_to('delivered', source='carrier')
+        except InvalidTransition:
+            # Changed underneath us, e.g. cancelled or already marked delivered
+            pass
+
+    cache.set(cache_key(order.tracking_number), load_events(order.tracking_number), settings.TRACKING_CACHE_TIMEOUT)
+    return len(events)
+
+
+def _step(title, description, completed, timestamp=None):
+    return {
+        'title': title,
+        'description': description,
+        'completed': completed,
+        'timestamp': timestamp,
+    }
+
+
+def get_tracking_info(order):
+    """
+    Steps for orders/partials/tracking_info.html, oldest first.
+    """
+    steps = [_step(_('Order placed'), _('We have received your order.'), True, order.created_at)]
+    if order.status == 'cancelled':
+        steps.append(_step(_('Cancelled'), _('This order was cancelled.'), True, order.updated_at))
+        return steps
+
+    latest = {}
+    if order.tracking_number:
+        for event in get_events(order.tracking_number):
+            latest[event['status']] = event
+
+    def from_event(status, title, default_description, completed=False):
+        event = latest.get(status)
+        if event is None:
+            return _step(title, default_description, completed)
+        description = event['description'] or default_description
+        if event['location']:
+            description = f"{description} ({event['location']})"
+        return _step(title, description, True, event['occurred_at'])
+
+    shipped = order.status in ('shipped', 'delivered')
+    delivered = order.status == 'delivered'
+    steps.append(_step(
+        _('Processing'), _('Your order is being prepared.'),
+        order.status != 'pending',
+    ))
+    steps.append(from_event('label_created', _('Shipped'), _('Your order has been handed to the carrier.'), shipped))
+    steps.append(from_event('in_transit', _('In transit'), _('Your package is on its way.'), delivered))
+    steps.append(from_event('out_for_delivery', _('Out for delivery'), _('Your package will arrive today.'), delivered))
+    if 'exception' in latest and 'delivered' not in latest:
+        steps.append(from_event('exception', _('Delivery exception'), _('The carrier reported a problem.')))
+    steps.append(from_event('delivered', _('Delivered'), _('Your package has been delivered.'), delivered))
+    return steps
@@ -1,4 +1,4 @@
-from django.urls import path
+from django.urls import path, re_path
 from . import views
 
 app_name = 'orders'
@@ -9,4 +9,5 @@ urlpatterns = [
     path('<int:order_id>/track/', views.order_track, name='track'),
     path('<int:order_id>/invoice/', views.order_invoice, name='invoice'),
     path('<int:order_id>/cancel/', views.cancel_order, name='cancel'),
+    re_path(r'^export\.(?P<fmt>csv|jsonl)(?P<compressed>\.gz)?$', views.order_export, name='export'),
 ]
\ No newline at end of file
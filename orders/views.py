@@ -1,44 +1,73 @@
-from django.shortcuts import render, get_object_or_404
+from django.shortcuts import render, redirect, get_object_or_404
+from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
+from django.http import Http404, HttpResponseForbidden, JsonResponse, StreamingHttpResponse
+from django.core.files.storage import default_storage
+from django.utils.cache import get_conditional_response, patch_cache_control
 from django.utils.translation import gettext_lazy as _
-from django.core.paginator import Paginator
 from django.db.models import Q
+from django.utils.http import urlencode
 
-from .models import Order, OrderItem
+from ecommerce.pagination import KeysetPaginator
+from ecommerce.streaming import bearer_token, ranged_file_response
+
+from . import exports, invoices
+from .models import ArchivedOrder, InvalidTransition, Order, OrderItem
+
+def _search_filter(search):
+    """
+    Match an order number exactly, a full Stripe id exactly, or any other
+    fragment of a payment id with a substring match (trigram-indexed on
+    PostgreSQL). Casting the primary key to text for a LIKE is never needed.
+    """
+    term = search.strip().lstrip('#')
+    if term.isdigit():
+        return Q(id=int(term))
+    if term.startswith(('pi_', 'cs_')) and len(term) >= 20:
+        return Q(stripe_payment_intent=term)
+    return Q(stripe_payment_intent__contains=term)
+
+def _get_user_order(request, order_id, with_items=False):
+    """
+    The user's order from the live table or, failing that, the archive.
+    """
+    for model in (Order, ArchivedOrder):
+        orders = model.objects.with_items() if with_items else model.objects.all()
+        order = orders.filter(id=order_id, user=request.user).first()
+        if order is not None:
+            return order
+    raise Http404
 
 @login_required
 def order_list(request):
-    orders = Order.objects.filter(user=request.user).order_by('-created_at')
+    # Live and archived orders, read page by page and merged
+    querysets = [Order.objects.filter(user=request.user), ArchivedOrder.objects.filter(user=request.user)]
     
     # Filter by status if provided
     status = request.GET.get('status')
     if status:
-        orders = orders.filter(status=status)
+        querysets = [orders.filter(status=status) for orders in querysets]
     
-    # Search by order ID
-    search = request.GET.get('search')
+    # Search by order ID or payment ID
+    search = request.GET.get('search', '').strip()
     if search:
-        orders = orders.filter(
-            Q(id__icontains=search) |
-            Q(stripe_payment_intent__icontains=search)
-        )
+        querysets = [orders.filter(_search_filter(search)) for orders in querysets]
     
-    # Pagination
-    paginator = Paginator(orders, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Keyset pagination: constant time at any depth and no COUNT query
+    paginator = KeysetPaginator(querysets, per_page=10, ordering=('-created_at', '-id'))
+    page_obj = paginator.get_page(after=request.GET.get('after'), before=request.GET.get('before'))
     
     return render(request, 'orders/order_list.html', {
         'page_obj': page_obj,
         'status_choices': Order.STATUS_CHOICES,
         'current_status': status,
         'search': search,
+        'filter_query': urlencode({key: value for key, value in (('search', search), ('status', status)) if value}),
     })
 
 @login_required
 def order_detail(request, order_id):
-    order = get_object_or_404(Order, id=order_id, user=request.user)
+    order = _get_user_order(request, order_id, with_items=True)
     return render(request, 'orders/order_detail.html', {
         'order': order,
     })
@@ -61,18 +90,44 @@ def order_track(request, order_id):
 
 @login_required
 def order_invoice(request, order_id):
-    order = get_object_or_404(Order, id=order_id, user=request.user)
-    return render(request, 'orders/order_invoice.html', {
-        'order': order,
-    })
+    order = _get_user_order(request, order_id)
+    etag = f'"{invoices.invoice_key(order)}"'
+
+    # Repeat downloads are answered from the ETag alone
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        name = invoices.invoice_name(order)
+        if not default_storage.exists(name):
+            order = type(order).objects.with_items().get(pk=order.pk)
+            name = invoices.get_invoice(order)
+        response = ranged_file_response(
+            request, default_storage.open(name, 'rb'), default_storage.size(name),
+            'application/pdf', etag=etag,
+        )
+        response['Content-Disposition'] = f'inline; filename="invoice-{order.pk}.pdf"'
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, max_age=3600)
+    return response
 
 @login_required
 def cancel_order(request, order_id):
     order = get_object_or_404(Order, id=order_id, user=request.user)
     
     if request.method == 'POST':
-        if order.can_cancel():
-            order.cancel()
+        try:
+            order.cancel(user=request.user)
+        except InvalidTransition:
+            cancelled = False
+        else:
+            cancelled = True
+
+        if not request.headers.get('HX-Request'):
+            if cancelled:
+                messages.success(request, _('Order cancelled successfully.'))
+            else:
+                messages.error(request, _('This order cannot be cancelled.'))
+            return redirect('orders:detail', order_id=order.id)
+        if cancelled:
             return JsonResponse({
                 'status': 'success',
                 'message': _('Order cancelled successfully.')
@@ -85,3 +140,29 @@ def cancel_order(request, order_id):
     return render(request, 'orders/cancel_order.html', {
         'order': order,
     })
+
+def order_export(request, fmt, compressed=None):
+    """
+    Orders paid since ``after`` for a fulfillment partner, authenticated by
+    the signed bearer token from ``manage.py order_export_token``. The response
+    covers orders up to X-Export-Through; pass that as ``after`` next time.
+    """
+    partner = exports.check_export_token(bearer_token(request))
+    if partner is None:
+        return HttpResponseForbidden()
+    try:
+        after = max(int(request.GET.get('after', 0)), 0)
+    except ValueError:
+        after = 0
+
+    through = exports.export_through(after)
+    compress = bool(compressed)
+    response = StreamingHttpResponse(
+        exports.stream_export(fmt, after, through, compress=compress),
+        content_type='application/gzip' if compress else exports.EXPORT_CONTENT_TYPES[fmt],
+    )
+    filename = f"orders-{after + 1}-{through}.{fmt}{'.gz' if compress else ''}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['X-Export-After'] = str(after)
+    response['X-Export-Through'] = str(through)
+    return response
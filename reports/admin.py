@@ -0,0 +1,12 @@
+from django.contrib import admin
+
+from .models import RollupWatermark
+
+
+@admin.register(RollupWatermark)
+class RollupWatermarkAdmin(admin.ModelAdmin):
+    list_display = ['name', 'updated_at', 'last_run', 'days_rebuilt']
+    readonly_fields = ['name', 'updated_at', 'last_run', 'days_rebuilt']
+
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from reports.rollups import update_rollups
+
+
+class Command(BaseCommand):
+    help = 'Fold orders changed since the last run into the daily sales rollups'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help='Recompute every day from scratch')
+
+    def handle(self, *args, **options):
+        days = update_rollups(rebuild=options['rebuild'])
+        self.stdout.write(self.style.SUCCESS(f'Recomputed {days} day(s)'))
@@ -0,0 +1,89 @@
+from django.db import models
+
+from catalog.models import Product, ProductVariant
+from orders.models import Order
+
+
+class DailySales(models.Model):
+    """
+    Revenue per day and currency, excluding cancelled orders.
+    """
+    date = models.DateField()
+    currency = models.CharField(max_length=3)
+    orders = models.PositiveIntegerField(default=0)
+    units = models.PositiveIntegerField(default=0)
+    subtotal = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    shipping = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    tax = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        ordering = ['-date', 'currency']
+        verbose_name_plural = 'daily sales'
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'currency'], name='daily_sales_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.currency} {self.revenue}"
+
+
+class DailyProductSales(models.Model):
+    """
+    Units and revenue per day, product, variant and currency, excluding
+    cancelled orders. Names are copied from the order lines so rows survive
+    the product being renamed or deleted.
+    """
+    date = models.DateField()
+    product = models.ForeignKey(
+        Product, on_delete=models.DO_NOTHING, db_constraint=False, null=True, related_name='+'
+    )
+    variant = models.ForeignKey(
+        ProductVariant, on_delete=models.DO_NOTHING, db_constraint=False, null=True, related_name='+'
+    )
+    product_name = models.CharField(max_length=255, blank=True)
+    variant_name = models.CharField(max_length=100, blank=True)
+    currency = models.CharField(max_length=3)
+    units = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        ordering = ['-date', '-units']
+        verbose_name_plural = 'daily product sales'
+        indexes = [
+            models.Index(fields=['date', 'product'], name='daily_product_sales_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.product_name} x{self.units}"
+
+
+class DailyStatusCount(models.Model):
+    """
+    Orders placed per day, by their current status.
+    """
+    date = models.DateField()
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    orders = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-date', 'status']
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'status'], name='daily_status_count_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.status}: {self.orders}"
+
+
+class RollupWatermark(models.Model):
+    """
+    Highest Order.updated_at already folded into the rollups.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    updated_at = models.DateTimeField(null=True, blank=True)
+    last_run = models.DateTimeField(null=True, blank=True)
+    days_rebuilt = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} @ {self.updated_at}"
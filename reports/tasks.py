@@ -0,0 +1,11 @@
+from celery import shared_task
+
+from .rollups import update_rollups
+
+
+@shared_task
+def update_sales_rollups():
+    """
+    Periodic task: fold changed orders into the daily sales rollups.
+    """
+    return update_rollups()
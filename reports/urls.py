@@ -0,0 +1,10 @@
+from django.urls import path, re_path
+
+from . import views
+
+app_name = 'reports'
+
+urlpatterns = [
+    path('sales/', views.sales_dashboard, name='sales'),
+    re_path(rf"^sales/(?P<kind>{'|'.join(views.CSV_EXPORTS)})\.csv$", views.sales_csv, name='sales_csv'),
+]
@@ -0,0 +1,73 @@
+from datetime import date, timedelta
+
+from django.contrib import admin
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db.models import Sum
+from django.http import StreamingHttpResponse
+from django.shortcuts import render
+from django.utils.dateparse import parse_date
+
+from ecommerce.streaming import csv_chunks, encode
+from .models import DailyProductSales, DailySales, DailyStatusCount, RollupWatermark
+from .rollups import WATERMARK_NAME
+
+CSV_EXPORTS = {
+    'sales': (
+        DailySales,
+        ['date', 'currency', 'orders', 'units', 'subtotal', 'shipping', 'tax', 'revenue'],
+    ),
+    'products': (
+        DailyProductSales,
+        ['date', 'product_id', 'variant_id', 'product_name', 'variant_name', 'currency', 'units', 'revenue'],
+    ),
+    'statuses': (
+        DailyStatusCount,
+        ['date', 'status', 'orders'],
+    ),
+}
+
+
+def _date_range(request):
+    end = parse_date(request.GET.get('to') or '') or date.today()
+    start = parse_date(request.GET.get('from') or '') or end - timedelta(days=29)
+    return min(start, end), end
+
+
+@staff_member_required
+def sales_dashboard(request):
+    start, end = _date_range(request)
+    period = {'date__gte': start, 'date__lte': end}
+
+    sales = DailySales.objects.filter(**period)
+    totals = sales.order_by().values('currency').annotate(
+        orders=Sum('orders'), units=Sum('units'), revenue=Sum('revenue'),
+    ).order_by('currency')
+    top_products = DailyProductSales.objects.filter(**period).order_by().values(
+        'product_id', 'variant_id', 'product_name', 'variant_name', 'currency',
+    ).annotate(units=Sum('units'), revenue=Sum('revenue')).order_by('-units')[:20]
+    statuses = DailyStatusCount.objects.filter(**period).order_by().values(
+        'status'
+    ).annotate(orders=Sum('orders')).order_by('status')
+
+    return render(request, 'reports/sales_dashboard.html', {
+        **admin.site.each_context(request),
+        'title': 'Sales',
+        'start': start,
+        'end': end,
+        'totals': totals,
+        'daily': sales.order_by('-date', 'currency'),
+        'top_products': top_products,
+        'statuses': statuses,
+        'watermark': RollupWatermark.objects.filter(name=WATERMARK_NAME).first(),
+        'csv_exports': CSV_EXPORTS,
+    })
+
+
+@staff_member_required
+def sales_csv(request, kind):
+    model, fields = CSV_EXPORTS[kind]
+    start, end = _date_range(request)
+    rows = model.objects.filter(date__gte=start, date__lte=end).order_by('date', 'pk').values(*fields)
+    response = StreamingHttpResponse(encode(csv_chunks(fields, rows.iterator(chunk_size=2000))), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{kind}-{start}-{end}.csv"'
+    return response
@@ -1,12 +1,14 @@
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
-from .models import ShippingZone, ShippingMethod, ShippingRate, ShippingAddress
+from .models import (
+    ShippingZone, ShippingMethod, ShippingRate, ShippingAddress, ShippingBox, ShippingHoliday, TransitTime,
+)
 
 @admin.register(ShippingZone)
 class ShippingZoneAdmin(admin.ModelAdmin):
     list_display = ['name', 'description', 'is_active']
     list_filter = ['is_active']
-    search_fields = ['name', 'description', 'countries']
+    search_fields = ['name', 'description', 'country_memberships__country']
 
 @admin.register(ShippingMethod)
 class ShippingMethodAdmin(admin.ModelAdmin):
@@ -18,7 +20,7 @@ class ShippingMethodAdmin(admin.ModelAdmin):
             'fields': ('name', 'description', 'is_active')
         }),
         (_('Calculation Settings'), {
-            'fields': ('calculation_type', 'estimated_days')
+            'fields': ('calculation_type', 'estimated_days', 'cutoff_time', 'volumetric_divisor')
         }),
         (_('Tracking'), {
             'fields': ('tracking_url_template',),
@@ -45,6 +47,23 @@ class ShippingRateAdmin(admin.ModelAdmin):
         })
     )
 
+@admin.register(ShippingBox)
+class ShippingBoxAdmin(admin.ModelAdmin):
+    list_display = ['name', 'length', 'width', 'height', 'max_weight', 'empty_weight', 'is_active']
+    list_filter = ['is_active']
+    search_fields = ['name']
+
+@admin.register(TransitTime)
+class TransitTimeAdmin(admin.ModelAdmin):
+    list_display = ['shipping_method', 'shipping_zone', 'distribution']
+    list_filter = ['shipping_method', 'shipping_zone']
+
+@admin.register(ShippingHoliday)
+class ShippingHolidayAdmin(admin.ModelAdmin):
+    list_display = ['date', 'calendar', 'name']
+    list_filter = ['calendar']
+    date_hierarchy = 'date'
+
 @admin.register(ShippingAddress)
 class ShippingAddressAdmin(admin.ModelAdmin):
     list_display = ['user', 'get_full_name', 'city', 'country', 'is_default']
@@ -6,3 +6,6 @@ class ShippingConfig(AppConfig):
     name = 'shipping'
     label = 'shipping'
     verbose_name = 'Shipping'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,239 @@
+"""
+Carrier adapters for shipment tracking, labels and manifests.
+
+Each carrier turns a tracking number into a list of ``CarrierEvent`` objects,
+and, if it supports it, a ``LabelRequest`` into a ``CarrierLabel`` and a
+batch of labels into a ``CarrierManifest``. Adapters are registered by code
+in the SHIPPING_CARRIERS setting and chosen per shipping method, so adding a
+carrier means writing a class here (or in another module) and adding one
+line of configuration.
+
+Carriers are only ever called from Celery workers (see ``orders.tasks``);
+request handlers read the stored events instead.
+"""
+
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+from urllib.error import URLError
+from urllib.parse import quote
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.dateparse import parse_datetime
+from django.utils.module_loading import import_string
+
+from ecommerce.pdf import Document, text_width, truncate
+
+TRACKING_STATUSES = ['label_created', 'in_transit', 'out_for_delivery', 'delivered', 'exception']
+
+
+class CarrierError(Exception):
+    """
+    The carrier could not be reached or returned something unusable.
+    """
+
+
+class CarrierEvent:
+    def __init__(self, status, occurred_at, description='', location=''):
+        self.status = status
+        self.occurred_at = occurred_at
+        self.description = description
+        self.location = location
+
+    def __repr__(self):
+        return f'<CarrierEvent {self.status} {self.occurred_at:%Y-%m-%d %H:%M}>'
+
+
+class LabelRequest:
+    """
+    What a carrier needs to label one shipment. Plain values only: labels are
+    requested from worker threads that do not touch the database.
+    """
+    __slots__ = ('shipment_id', 'order_id', 'reference', 'address', 'email', 'service')
+
+    def __init__(self, shipment_id, order_id, reference, address, email='', service=''):
+        self.shipment_id = shipment_id
+        self.order_id = order_id
+        self.reference = reference
+        self.address = address
+        self.email = email
+        self.service = service
+
+
+class CarrierLabel:
+    __slots__ = ('tracking_number', 'content', 'format')
+
+    def __init__(self, tracking_number, content, format):
+        self.tracking_number = tracking_number
+        self.content = content
+        self.format = format
+
+
+class CarrierManifest:
+    __slots__ = ('reference', 'content', 'format')
+
+    def __init__(self, reference, content, format='pdf'):
+        self.reference = reference
+        self.content = content
+        self.format = format
+
+
+class BaseCarrier:
+    code = None
+
+    def tracking_url(self, tracking_number, shipping_method=None):
+        template = shipping_method.tracking_url_template if shipping_method else ''
+        if not template:
+            return ''
+        return template.replace('{tracking_number}', quote(tracking_number))
+
+    def track(self, tracking_number, shipping_method=None):
+        """
+        Return every known event for the shipment, oldest first.
+        """
+        raise NotImplementedError
+
+    def create_label(self, request):
+        """
+        Buy a label for one shipment and return it as a ``CarrierLabel``.
+        Called from several threads at once.
+        """
+        raise CarrierError(f'Carrier {self.code} cannot create labels')
+
+    def create_manifest(self, labels):
+        """
+        Close out a batch of (LabelRequest, CarrierLabel) pairs for pickup.
+        Carriers without a manifest API get a local PDF listing the parcels.
+        """
+        reference = f'{self.code}-{datetime.now(timezone.utc):%Y%m%d%H%M%S}-{len(labels)}'
+        document = Document(title=f'Manifest {reference}')
+        page = document.add_page()
+        left, right = 50, document.width - 50
+        y = document.height - 60
+        page.text(left, y, f'{self.code} manifest', size=18, bold=True)
+        page.text(right, y, reference, align='right')
+        y -= 30
+        for request, label in labels:
+            if y < 60:
+                page = document.add_page()
+                y = document.height - 60
+            y -= 16
+            page.text(left, y, label.tracking_number)
+            page.text(left + 180, y, request.reference)
+            page.text(right, y, truncate((request.address.splitlines() or [''])[0], 220, 10), align='right')
+        y -= 24
+        page.text(left, y, f'{len(labels)} parcel(s)', bold=True)
+        return CarrierManifest(reference, document.render(), 'pdf')
+
+
+class StubCarrier(BaseCarrier):
+    """
+    Local carrier for development and tests. Progress is derived from the
+    tracking number, so on a given day the same number always yields the
+    same events, all within the last three days.
+    """
+    code = 'stub'
+
+    def track(self, tracking_number, shipping_method=None):
+        digest = hashlib.sha256(tracking_number.encode()).digest()
+        stages = 1 + digest[0] % 4
+        today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        start = today - timedelta(days=3) + timedelta(minutes=int.from_bytes(digest[1:3], 'big') % 1440)
+        return [
+            CarrierEvent(
+                status=status,
+                occurred_at=start + timedelta(hours=12 * index),
+                description=status.replace('_', ' ').capitalize(),
+                location='Stub hub',
+            )
+            for index, status in enumerate(TRACKING_STATUSES[:stages])
+        ]
+
+    def create_label(self, request):
+        """
+        A local label in SHIPPING_LABEL_FORMAT ('pdf' or 'zpl'), with a
+        tracking number derived from the shipment.
+        """
+        digest = hashlib.sha256(f'{request.shipment_id}:{request.reference}'.encode()).hexdigest()
+        tracking_number = f'STUB{digest[:12].upper()}'
+        lines = [request.service, request.reference] + request.address.splitlines()
+        if settings.SHIPPING_LABEL_FORMAT == 'zpl':
+            fields = ''.join(
+                f'^FO40,{40 + 35 * index}^FD{line.replace("^", " ")}^FS' for index, line in enumerate(lines)
+            )
+            content = f'^XA^CF0,28{fields}^FO40,{80 + 35 * len(lines)}^BCN,120,Y,N,N^FD{tracking_number}^FS^XZ'
+            return CarrierLabel(tracking_number, content.encode(), 'zpl')
+
+        # 4 x 6 in
+        document = Document(size=(288, 432), title=tracking_number)
+        page = document.add_page()
+        y = 400
+        for line in lines:
+            page.text(20, y, truncate(line, 248, 11), size=11)
+            y -= 16
+        page.line(20, y, 268, y)
+        page.text(144 - text_width(tracking_number, 16, True) / 2, y - 30, tracking_number, size=16, bold=True)
+        return CarrierLabel(tracking_number, document.render(), 'pdf')
+
+
+class JSONCarrier(BaseCarrier):
+    """
+    Carrier that exposes tracking as JSON at the shipping method's
+    tracking_url_template, in the form::
+
+        {"events": [{"status": "in_transit", "timestamp": "2024-01-01T10:00:00Z",
+                     "description": "...", "location": "..."}]}
+    """
+    code = 'json'
+
+    def track(self, tracking_number, shipping_method=None):
+        url = self.tracking_url(tracking_number, shipping_method)
+        if not url:
+            raise CarrierError('Shipping method has no tracking URL template')
+
+        request = Request(url, headers={'Accept': 'application/json'})
+        try:
+            with urlopen(request, timeout=settings.SHIPPING_CARRIER_TIMEOUT) as response:
+                payload = json.load(response)
+        except (URLError, TimeoutError, ValueError) as e:
+            raise CarrierError(str(e)) from e
+
+        events = []
+        for entry in payload.get('events', []):
+            occurred_at = parse_datetime(entry.get('timestamp') or '')
+            if entry.get('status') not in TRACKING_STATUSES or occurred_at is None:
+                continue
+            if occurred_at.tzinfo is None:
+                occurred_at = occurred_at.replace(tzinfo=timezone.utc)
+            events.append(CarrierEvent(
+                status=entry['status'],
+                occurred_at=occurred_at,
+                description=entry.get('description', '')[:255],
+                location=entry.get('location', '')[:100],
+            ))
+        return sorted(events, key=lambda event: event.occurred_at)
+
+
+_carriers = {}
+
+
+def get_carrier(code=None):
+    """
+    Carrier adapter for ``code``, falling back to SHIPPING_DEFAULT_CARRIER.
+    An unknown code or adapter path raises ImproperlyConfigured, not
+    CarrierError: retrying will not fix the configuration.
+    """
+    code = code or settings.SHIPPING_DEFAULT_CARRIER
+    if code not in _carriers:
+        try:
+            path = settings.SHIPPING_CARRIERS[code]
+        except KeyError:
+            raise ImproperlyConfigured(f'Unknown carrier: {code}')
+        try:
+            adapter = import_string(path)
+        except ImportError as e:
+            raise ImproperlyConfigured(f'Carrier {code}: {e}') from e
+        _carriers[code] = adapter()
+    return _carriers[code]
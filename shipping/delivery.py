@@ -0,0 +1,195 @@
+"""
+Delivery date estimates.
+
+Each shipping method's transit time in a zone comes from its TransitTime
+distribution: the earliest day parcels arrived, and the day by which
+SHIPPING_DELIVERY_PROMISE_PERCENTILE of them had. Methods without one use
+``estimated_days`` for both. Orders are dispatched on the next warehouse
+business day (the same day if placed before the method's cutoff) and then
+spend that many carrier business days in transit. Days outside
+SHIPPING_BUSINESS_DAYS and ShippingHoliday dates of the warehouse or the
+carrier are skipped.
+
+``DeliveryTable`` works all of this out ahead of time for one warehouse date:
+for every country and method, the earliest and arrives-by dates on either
+side of the cutoff. ``delivery_estimates()`` is then a dictionary lookup and
+one time comparison per method, cheap enough for every product card on a
+listing page. Each process compiles the table once a day, and again whenever
+the rate table is invalidated, which transit time and holiday changes do too.
+"""
+
+import logging
+from bisect import bisect_left
+from datetime import date, time, timedelta
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+
+from .models import ShippingHoliday, TransitTime, validate_distribution
+from .rates import get_rate_table
+
+logger = logging.getLogger(__name__)
+
+# Calendar days of business days worked out ahead
+HORIZON_DAYS = 366
+
+COUNTRY_SESSION_KEY = 'shipping_country'
+
+
+def warehouse_now():
+    return timezone.now().astimezone(ZoneInfo(settings.SHIPPING_WAREHOUSE_TIMEZONE))
+
+
+class BusinessCalendar:
+    def __init__(self, start, holidays=()):
+        weekdays = set(settings.SHIPPING_BUSINESS_DAYS)
+        holidays = {day.toordinal() for day in holidays}
+        first = start.toordinal()
+        self.days = [
+            ordinal for ordinal in range(first, first + HORIZON_DAYS)
+            if date.fromordinal(ordinal).weekday() in weekdays and ordinal not in holidays
+        ]
+
+    def shift(self, day, business_days):
+        """
+        The business day ``business_days`` after ``day``; for 0, ``day``
+        itself or the next business day. None beyond the horizon.
+        """
+        index = bisect_left(self.days, day.toordinal()) + max(business_days, 0)
+        if index >= len(self.days):
+            return None
+        return date.fromordinal(self.days[index])
+
+
+class DeliveryEstimate:
+    __slots__ = ('method', 'earliest', 'arrives_by')
+
+    def __init__(self, method, earliest, arrives_by):
+        self.method = method
+        self.earliest = earliest
+        self.arrives_by = arrives_by
+
+    def __repr__(self):
+        return f'<DeliveryEstimate {self.method.name} {self.earliest}..{self.arrives_by}>'
+
+
+class DeliveryTable:
+    def __init__(self, rate_table, transit_times, holidays, today):
+        """
+        ``transit_times`` maps (method id, zone id) to (earliest, promised)
+        business days; ``holidays`` maps calendar names to dates.
+        """
+        self.rate_table = rate_table
+        self.today = today
+        self.transit = {}
+
+        warehouse = BusinessCalendar(today, holidays.get(ShippingHoliday.WAREHOUSE, ()))
+        # Before and after the cutoff
+        dispatch = (warehouse.shift(today, 0), warehouse.shift(today + timedelta(days=1), 0))
+        carriers = {}
+        default_cutoff = time.fromisoformat(settings.SHIPPING_DISPATCH_CUTOFF)
+
+        self.countries = {}
+        for country, (_lower_bounds, rates) in rate_table.countries.items():
+            # The slowest zone wins if a country is in several for a method
+            days = {}
+            for rate in rates:
+                method = rate.shipping_method
+                found = transit_times.get((method.pk, rate.shipping_zone_id))
+                if found is None and method.estimated_days is not None:
+                    found = (method.estimated_days, method.estimated_days)
+                if found is not None:
+                    current = days.get(method.pk)
+                    days[method.pk] = found if current is None else max(current, found, key=lambda pair: pair[1])
+            self.transit[country] = {method_id: promised for method_id, (_, promised) in days.items()}
+
+            entries = []
+            for method_id, (earliest, promised) in days.items():
+                method = rate_table.method(method_id)
+                code = method.carrier or settings.SHIPPING_DEFAULT_CARRIER
+                if code not in carriers:
+                    carriers[code] = BusinessCalendar(today, holidays.get(code, ()))
+                carrier = carriers[code]
+                sides = [
+                    (carrier.shift(day, earliest), carrier.shift(day, promised)) if day else (None, None)
+                    for day in dispatch
+                ]
+                entries.append((method, method.cutoff_time or default_cutoff, sides[0], sides[1]))
+            self.countries[country] = entries
+
+    @classmethod
+    def compile(cls, rate_table, today):
+        percentile = settings.SHIPPING_DELIVERY_PROMISE_PERCENTILE
+        transit_times = {}
+        for transit in TransitTime.objects.all():
+            # Rows saved around the model validation (bulk, shell, SQL) must not break every estimate
+            try:
+                validate_distribution(transit.distribution)
+            except ValidationError:
+                logger.warning('Ignoring invalid transit distribution %s', transit.pk)
+                continue
+            key = (transit.shipping_method_id, transit.shipping_zone_id)
+            transit_times[key] = (transit.earliest_days, transit.days_for(percentile))
+        holidays = {}
+        for calendar, day in ShippingHoliday.objects.filter(
+            date__gte=today, date__lt=today + timedelta(days=HORIZON_DAYS)
+        ).values_list('calendar', 'date'):
+            holidays.setdefault(calendar, []).append(day)
+        return cls(rate_table, transit_times, holidays, today)
+
+    def estimates(self, country, now):
+        """
+        Estimates for every method serving ``country``, for an order placed
+        at ``now`` (warehouse local time), soonest first.
+        """
+        estimates = []
+        for method, cutoff, before, after in self.countries.get(country, ()):
+            earliest, arrives_by = before if now.time() < cutoff else after
+            if arrives_by is not None:
+                estimates.append(DeliveryEstimate(method, earliest, arrives_by))
+        estimates.sort(key=lambda estimate: (estimate.arrives_by, estimate.earliest, estimate.method.pk))
+        return estimates
+
+    def promised_days(self, country, shipping_method_id):
+        return self.transit.get(country, {}).get(shipping_method_id)
+
+
+_table = None
+
+
+def get_delivery_table(today=None):
+    global _table
+    rate_table = get_rate_table()
+    today = today or warehouse_now().date()
+    if _table is None or _table.rate_table is not rate_table or _table.today != today:
+        _table = DeliveryTable.compile(rate_table, today)
+    return _table
+
+
+def delivery_estimates(country, now=None):
+    """
+    Earliest and arrives-by dates of every method serving ``country``,
+    soonest first.
+    """
+    now = now or warehouse_now()
+    return get_delivery_table(now.date()).estimates(str(country).upper(), now)
+
+
+def shopper_country(request):
+    """
+    The country to estimate delivery to before checkout: the signed-in
+    customer's default shipping address (remembered in the session), or
+    SHIPPING_DEFAULT_COUNTRY.
+    """
+    country = request.session.get(COUNTRY_SESSION_KEY)
+    if country:
+        return country
+    if not request.user.is_authenticated:
+        return settings.SHIPPING_DEFAULT_COUNTRY
+    country = request.user.shipping_addresses.filter(
+        is_default=True
+    ).values_list('country', flat=True).first() or settings.SHIPPING_DEFAULT_COUNTRY
+    request.session[COUNTRY_SESSION_KEY] = country
+    return country
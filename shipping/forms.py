@@ -1,6 +1,7 @@
 from django import forms
 from django.utils.translation import gettext_lazy as _
 from shipping.models import ShippingAddress, ShippingMethod
+from shipping.postal import validate_address
 
 class ShippingAddressForm(forms.ModelForm):
     class Meta:
@@ -51,6 +52,22 @@ class ShippingAddressForm(forms.ModelForm):
             }),
         }
 
+    def clean(self):
+        cleaned_data = super().clean()
+        fields = ('country', 'postal_code', 'city', 'state')
+        if any(field in self.errors or not cleaned_data.get(field) for field in fields[:2]):
+            return cleaned_data
+
+        check = validate_address(*(cleaned_data.get(field, '') for field in fields))
+        for field, message in check.errors.items():
+            self.add_error(field, message)
+        if check.known and check.is_valid:
+            cleaned_data.update(postal_code=check.postal_code, city=check.city, state=check.state)
+        # None unless checked, so an edit to another country drops the old coordinates
+        self.instance.latitude = check.latitude
+        self.instance.longitude = check.longitude
+        return cleaned_data
+
 class ShippingMethodForm(forms.Form):
     shipping_method = forms.ModelChoiceField(
         queryset=ShippingMethod.objects.none(),
@@ -0,0 +1,46 @@
+import csv
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from shipping.postal import write_postal_index
+
+# GeoNames postal code dump columns (https://download.geonames.org/export/zip/)
+COUNTRY, POSTAL_CODE, PLACE, STATE, STATE_CODE = 0, 1, 2, 3, 4
+LATITUDE, LONGITUDE = 9, 10
+
+
+class Command(BaseCommand):
+    help = 'Compile a GeoNames postal code file into per-country indexes in POSTAL_INDEX_DIR'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'source',
+            help='Tab-separated GeoNames file, e.g. allCountries.txt, US.txt or GB_full.txt '
+                 '(allCountries.txt has only the leading part of GB, CA, NL, ... codes)',
+        )
+        parser.add_argument('--country', action='append', help='Only index this country (repeatable)')
+        parser.add_argument('--output-dir', default=None, help='Defaults to POSTAL_INDEX_DIR')
+
+    def handle(self, *args, **options):
+        source = Path(options['source'])
+        if not source.exists():
+            raise CommandError(f'{source} does not exist')
+        only = {country.upper() for country in options['country'] or ()}
+        output = Path(options['output_dir'] or settings.POSTAL_INDEX_DIR)
+
+        rows = {}
+        with open(source, newline='', encoding='utf-8') as f:
+            for row in csv.reader(f, delimiter='\t', quoting=csv.QUOTE_NONE):
+                if len(row) <= LONGITUDE or (only and row[COUNTRY] not in only):
+                    continue
+                rows.setdefault(row[COUNTRY], []).append((
+                    row[POSTAL_CODE], row[PLACE], row[STATE], row[STATE_CODE],
+                    row[LATITUDE], row[LONGITUDE],
+                ))
+
+        for country, country_rows in sorted(rows.items()):
+            count = write_postal_index(output / f'{country}.idx', country_rows)
+            self.stdout.write(f'{country}: {count} postal code(s)')
+        self.stdout.write(self.style.SUCCESS(f'Indexed {len(rows)} countries into {output}'))
@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand
+
+from customers.models import Address
+from shipping.models import ShippingAddress
+from shipping.postal import validate_address
+
+# Tables to check, with the fields --fix writes
+TABLES = [
+    (ShippingAddress, ['postal_code', 'city', 'state', 'latitude', 'longitude']),
+    (Address, ['postal_code', 'city', 'state']),
+]
+
+
+class Command(BaseCommand):
+    help = 'Check saved shipping and customer addresses against the postal reference data'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true', help='Save normalized values for valid addresses')
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        for model, fix_fields in TABLES:
+            checked = invalid = unknown = normalized_count = 0
+            changed = []
+            addresses = model.objects.order_by('pk').only('pk', 'country', *fix_fields)
+            for address in addresses.iterator(chunk_size=options['batch_size']):
+                checked += 1
+                check = validate_address(address.country, address.postal_code, address.city, address.state)
+                if not check.known:
+                    unknown += 1
+                    continue
+                if not check.is_valid:
+                    invalid += 1
+                    if options['verbosity'] > 1:
+                        errors = '; '.join(f'{field}: {message}' for field, message in check.errors.items())
+                        self.stdout.write(f'{model.__name__} {address.pk}: {errors}')
+                    continue
+
+                normalized = {field: getattr(check, field) for field in fix_fields}
+                if all(getattr(address, field) == value for field, value in normalized.items()):
+                    continue
+                normalized_count += 1
+                if options['fix']:
+                    for field, value in normalized.items():
+                        setattr(address, field, value)
+                    changed.append(address)
+                    if len(changed) >= options['batch_size']:
+                        model.objects.bulk_update(changed, fix_fields)
+                        changed = []
+            if changed:
+                model.objects.bulk_update(changed, fix_fields)
+
+            action = 'normalized' if options['fix'] else 'would be normalized'
+            self.stdout.write(
+                f'{model._meta.verbose_name_plural}: {checked} checked, {invalid} invalid, '
+                f'{unknown} without reference data, {normalized_count} {action}'
+            )
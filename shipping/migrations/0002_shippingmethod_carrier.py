@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-19 16:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shipping', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shippingmethod',
+            name='carrier',
+            field=models.CharField(blank=True, help_text='Carrier adapter code from SHIPPING_CARRIERS; blank uses the default carrier', max_length=30, verbose_name='Carrier'),
+        ),
+    ]
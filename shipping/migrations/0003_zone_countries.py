@@ -0,0 +1,41 @@
+# Generated by Django 5.0 on 2026-10-19 16:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_zone_countries(apps, schema_editor):
+    ShippingZone = apps.get_model('shipping', 'ShippingZone')
+    ShippingZoneCountry = apps.get_model('shipping', 'ShippingZoneCountry')
+    memberships = []
+    for zone_id, countries in ShippingZone.objects.values_list('id', 'countries').iterator():
+        for country in dict.fromkeys(str(country).strip().upper() for country in countries or []):
+            memberships.append(ShippingZoneCountry(zone_id=zone_id, country=country))
+    ShippingZoneCountry.objects.bulk_create(memberships, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shipping', '0002_shippingmethod_carrier'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShippingZoneCountry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('country', models.CharField(max_length=2, verbose_name='Country')),
+                ('zone', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='country_memberships', to='shipping.shippingzone')),
+            ],
+            options={
+                'verbose_name': 'Shipping Zone Country',
+                'verbose_name_plural': 'Shipping Zone Countries',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='shippingzonecountry',
+            constraint=models.UniqueConstraint(fields=('country', 'zone'), name='shipping_zone_country_unique'),
+        ),
+        migrations.RunPython(backfill_zone_countries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.0 on 2026-10-19 16:56
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shipping', '0003_zone_countries'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShippingBox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Name')),
+                ('length', models.DecimalField(decimal_places=2, max_digits=8, validators=[django.core.validators.MinValueValidator(0)], verbose_name='Length')),
+                ('width', models.DecimalField(decimal_places=2, max_digits=8, validators=[django.core.validators.MinValueValidator(0)], verbose_name='Width')),
+                ('height', models.DecimalField(decimal_places=2, max_digits=8, validators=[django.core.validators.MinValueValidator(0)], verbose_name='Height')),
+                ('max_weight', models.DecimalField(blank=True, decimal_places=3, help_text='Heaviest contents the box can hold, in kg', max_digits=8, null=True, validators=[django.core.validators.MinValueValidator(0)], verbose_name='Maximum Weight')),
+                ('empty_weight', models.DecimalField(decimal_places=3, default=0, max_digits=8, validators=[django.core.validators.MinValueValidator(0)], verbose_name='Empty Weight')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Active')),
+            ],
+            options={
+                'verbose_name': 'Shipping Box',
+                'verbose_name_plural': 'Shipping Boxes',
+            },
+        ),
+        migrations.AddField(
+            model_name='shippingmethod',
+            name='volumetric_divisor',
+            field=models.PositiveIntegerField(blank=True, help_text='cm³ per kg of dimensional weight (e.g. 5000); blank charges actual weight only', null=True, verbose_name='Volumetric Divisor'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.0 on 2026-10-19 17:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def drop_extra_defaults(apps, schema_editor):
+    # Keep the most recently updated default of users that have several
+    ShippingAddress = apps.get_model('shipping', 'ShippingAddress')
+    users = (
+        ShippingAddress.objects.filter(is_default=True)
+        .values('user_id').annotate(defaults=models.Count('id')).filter(defaults__gt=1)
+        .values_list('user_id', flat=True)
+    )
+    for user_id in users.iterator():
+        keep = ShippingAddress.objects.filter(
+            user_id=user_id, is_default=True
+        ).order_by('-updated_at', '-id').values_list('id', flat=True)[0]
+        ShippingAddress.objects.filter(user_id=user_id, is_default=True).exclude(id=keep).update(is_default=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shipping', '0004_packing_boxes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_extra_defaults, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='shippingaddress',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_default', True)), fields=('user',), name='shipping_address_one_default'),
+        ),
+    ]
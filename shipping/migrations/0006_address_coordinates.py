@@ -0,0 +1,23 @@
+# Generated by Django 5.0 on 2026-10-19 17:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shipping', '0005_address_one_default'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shippingaddress',
+            name='latitude',
+            field=models.DecimalField(blank=True, decimal_places=4, max_digits=7, null=True, verbose_name='Latitude'),
+        ),
+        migrations.AddField(
+            model_name='shippingaddress',
+            name='longitude',
+            field=models.DecimalField(blank=True, decimal_places=4, max_digits=7, null=True, verbose_name='Longitude'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.0 on 2026-10-19 17:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shipping', '0006_address_coordinates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shippingmethod',
+            name='cutoff_time',
+            field=models.TimeField(blank=True, help_text='Orders placed after this warehouse time ship the next business day; blank uses SHIPPING_DISPATCH_CUTOFF', null=True, verbose_name='Dispatch Cutoff'),
+        ),
+        migrations.CreateModel(
+            name='ShippingHoliday',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('calendar', models.CharField(default='warehouse', help_text='"warehouse", or a carrier code from SHIPPING_CARRIERS', max_length=30, verbose_name='Calendar')),
+                ('date', models.DateField(verbose_name='Date')),
+                ('name', models.CharField(blank=True, max_length=100, verbose_name='Name')),
+            ],
+            options={
+                'verbose_name': 'Shipping Holiday',
+                'verbose_name_plural': 'Shipping Holidays',
+                'ordering': ['date'],
+                'unique_together': {('calendar', 'date')},
+            },
+        ),
+        migrations.CreateModel(
+            name='TransitTime',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('distribution', models.JSONField(help_text='Share of parcels delivered after 0, 1, 2, ... business days, e.g. [0, 0.1, 0.7, 0.2]', verbose_name='Distribution')),
+                ('shipping_method', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transit_times', to='shipping.shippingmethod')),
+                ('shipping_zone', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transit_times', to='shipping.shippingzone')),
+            ],
+            options={
+                'verbose_name': 'Transit Time',
+                'verbose_name_plural': 'Transit Times',
+                'unique_together': {('shipping_method', 'shipping_zone')},
+            },
+        ),
+    ]
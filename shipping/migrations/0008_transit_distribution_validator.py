@@ -0,0 +1,19 @@
+# Generated by Django 5.0 on 2026-10-19 17:20
+
+import shipping.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shipping', '0007_delivery_calendars'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='transittime',
+            name='distribution',
+            field=models.JSONField(help_text='Share of parcels delivered after 0, 1, 2, ... business days, e.g. [0, 0.1, 0.7, 0.2]', validators=[shipping.models.validate_distribution], verbose_name='Distribution'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0 on 2026-10-19 17:31
+
+import shipping.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shipping', '0008_transit_distribution_validator'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='shippingmethod',
+            name='carrier',
+            field=models.CharField(blank=True, help_text='Carrier adapter code from SHIPPING_CARRIERS; blank uses the default carrier', max_length=30, validators=[shipping.models.validate_carrier], verbose_name='Carrier'),
+        ),
+    ]
@@ -1,10 +1,22 @@
-from django.db import models
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import models, transaction
 from django.utils.translation import gettext_lazy as _
+from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
+
+def validate_carrier(value):
+    if value and value not in settings.SHIPPING_CARRIERS:
+        raise ValidationError(
+            _('Unknown carrier "%(code)s"; use one of: %(codes)s.'),
+            params={'code': value, 'codes': ', '.join(sorted(settings.SHIPPING_CARRIERS))},
+        )
+
 class ShippingZone(models.Model):
     """
     Represents a shipping zone (e.g., domestic, international, specific regions)
@@ -21,6 +33,45 @@ class ShippingZone(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.countries = list(dict.fromkeys(str(country).strip().upper() for country in self.countries or []))
+        # One transaction, so the rate table is invalidated after the sync
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self.sync_countries()
+
+    def sync_countries(self):
+        """
+        Make the zone's ShippingZoneCountry rows match ``countries``.
+        """
+        current = set(self.country_memberships.values_list('country', flat=True))
+        wanted = set(self.countries)
+        if current - wanted:
+            self.country_memberships.filter(country__in=current - wanted).delete()
+        ShippingZoneCountry.objects.bulk_create(
+            [ShippingZoneCountry(zone=self, country=country) for country in sorted(wanted - current)],
+            ignore_conflicts=True,
+        )
+
+
+class ShippingZoneCountry(models.Model):
+    """
+    One country of a shipping zone, kept in sync with ShippingZone.countries
+    so zones can be found by country with an index lookup.
+    """
+    zone = models.ForeignKey(ShippingZone, on_delete=models.CASCADE, related_name='country_memberships')
+    country = models.CharField(_('Country'), max_length=2)
+
+    class Meta:
+        verbose_name = _('Shipping Zone Country')
+        verbose_name_plural = _('Shipping Zone Countries')
+        constraints = [
+            models.UniqueConstraint(fields=['country', 'zone'], name='shipping_zone_country_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.country} in {self.zone_id}"
+
 class ShippingMethod(models.Model):
     """
     Represents a shipping method (e.g., Standard, Express, Next Day)
@@ -51,6 +102,26 @@ class ShippingMethod(models.Model):
         blank=True,
         help_text=_('URL template for tracking. Use {tracking_number} as placeholder')
     )
+    carrier = models.CharField(
+        _('Carrier'),
+        max_length=30,
+        blank=True,
+        validators=[validate_carrier],
+        help_text=_('Carrier adapter code from SHIPPING_CARRIERS; blank uses the default carrier')
+    )
+    cutoff_time = models.TimeField(
+        _('Dispatch Cutoff'),
+        null=True,
+        blank=True,
+        help_text=_('Orders placed after this warehouse time ship the next business day; '
+                    'blank uses SHIPPING_DISPATCH_CUTOFF')
+    )
+    volumetric_divisor = models.PositiveIntegerField(
+        _('Volumetric Divisor'),
+        null=True,
+        blank=True,
+        help_text=_('cm³ per kg of dimensional weight (e.g. 5000); blank charges actual weight only')
+    )
 
     class Meta:
         verbose_name = _('Shipping Method')
@@ -59,6 +130,53 @@ class ShippingMethod(models.Model):
     def __str__(self):
         return self.name
 
+    def billable_weight(self, weight, volume):
+        """
+        The weight a parcel is charged at: its actual weight or, if larger,
+        its dimensional weight.
+        """
+        if not self.volumetric_divisor or not volume:
+            return weight
+        return max(weight, (Decimal(volume) / self.volumetric_divisor).quantize(Decimal('0.001')))
+
+
+class ShippingBox(models.Model):
+    """
+    A box size the warehouse packs orders into (inner dimensions in cm)
+    """
+    name = models.CharField(_('Name'), max_length=100)
+    length = models.DecimalField(_('Length'), max_digits=8, decimal_places=2, validators=[MinValueValidator(0)])
+    width = models.DecimalField(_('Width'), max_digits=8, decimal_places=2, validators=[MinValueValidator(0)])
+    height = models.DecimalField(_('Height'), max_digits=8, decimal_places=2, validators=[MinValueValidator(0)])
+    max_weight = models.DecimalField(
+        _('Maximum Weight'),
+        max_digits=8,
+        decimal_places=3,
+        validators=[MinValueValidator(0)],
+        null=True,
+        blank=True,
+        help_text=_('Heaviest contents the box can hold, in kg')
+    )
+    empty_weight = models.DecimalField(
+        _('Empty Weight'),
+        max_digits=8,
+        decimal_places=3,
+        default=0,
+        validators=[MinValueValidator(0)]
+    )
+    is_active = models.BooleanField(_('Active'), default=True)
+
+    class Meta:
+        verbose_name = _('Shipping Box')
+        verbose_name_plural = _('Shipping Boxes')
+
+    def __str__(self):
+        return f"{self.name} ({self.length} x {self.width} x {self.height} cm)"
+
+    @property
+    def volume(self):
+        return self.length * self.width * self.height
+
 class ShippingAddress(models.Model):
     """
     Represents a shipping address for orders
@@ -75,27 +193,61 @@ class ShippingAddress(models.Model):
     postal_code = models.CharField(_('Postal Code'), max_length=20)
     phone = models.CharField(_('Phone Number'), max_length=50, blank=True)
     is_default = models.BooleanField(_('Default Address'), default=False)
+    # From the postal reference data (shipping/postal.py), when available
+    latitude = models.DecimalField(_('Latitude'), max_digits=7, decimal_places=4, null=True, blank=True)
+    longitude = models.DecimalField(_('Longitude'), max_digits=7, decimal_places=4, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = _('Shipping Address')
         verbose_name_plural = _('Shipping Addresses')
+        constraints = [
+            # One default per user; also the index for default lookups
+            models.UniqueConstraint(
+                fields=['user'],
+                condition=models.Q(is_default=True),
+                name='shipping_address_one_default',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.first_name} {self.last_name} - {self.address_line1}, {self.city}"
 
+    def _clear_other_defaults(self):
+        # Touches the current default row only, found through the partial index
+        ShippingAddress.objects.filter(
+            user_id=self.user_id, is_default=True
+        ).exclude(pk=self.pk).update(is_default=False)
+
     def save(self, *args, **kwargs):
         # If this is being set as default, remove default from other addresses
         if self.is_default:
-            ShippingAddress.objects.filter(
-                user=self.user,
-                is_default=True
-            ).update(is_default=False)
-        # If this is the user's only address, make it the default
-        elif not self.pk and not ShippingAddress.objects.filter(user=self.user).exists():
-            self.is_default = True
+            with transaction.atomic():
+                self._clear_other_defaults()
+                super().save(*args, **kwargs)
+            return
+
+        adding = self._state.adding
         super().save(*args, **kwargs)
+        if adding:
+            # A new address becomes the default if the user has none, in
+            # the same statement as the check
+            has_default = ShippingAddress.objects.filter(user_id=self.user_id, is_default=True)
+            self.is_default = bool(
+                ShippingAddress.objects.filter(pk=self.pk)
+                .exclude(models.Exists(has_default))
+                .update(is_default=True)
+            )
+
+    def make_default(self):
+        """
+        Make this the user's default address, writing only the flag.
+        """
+        with transaction.atomic():
+            self._clear_other_defaults()
+            ShippingAddress.objects.filter(pk=self.pk).update(is_default=True)
+        self.is_default = True
 
 
 class ShippingRate(models.Model):
@@ -168,6 +320,21 @@ class ShippingRate(models.Model):
     def __str__(self):
         return f"{self.shipping_method.name} - {self.shipping_zone.name}"
 
+    def calculate_parcels_cost(self, parcels, order_total=None):
+        """
+        Cost of sending ``parcels`` (see shipping.packing) with this rate:
+        each parcel is charged separately at its billable weight. None if
+        any parcel is outside the rate's limits.
+        """
+        total = Decimal('0')
+        for parcel in parcels:
+            weight = self.shipping_method.billable_weight(parcel.weight, parcel.volume)
+            cost = self.calculate_shipping_cost(weight=weight, order_total=order_total)
+            if cost is None:
+                return None
+            total += cost
+        return total
+
     def calculate_shipping_cost(self, weight=None, order_total=None):
         """
         Calculate shipping cost based on the method type and input parameters
@@ -194,3 +361,75 @@ class ShippingRate(models.Model):
         return cost
 
 
+def validate_distribution(value):
+    """
+    A transit distribution: a non-empty list of non-negative shares, not all zero.
+    """
+    if not isinstance(value, list) or not value:
+        raise ValidationError(_('Enter a non-empty list of shares.'))
+    if not all(isinstance(share, (int, float)) and not isinstance(share, bool) and share >= 0 for share in value):
+        raise ValidationError(_('Every share must be a non-negative number.'))
+    if not any(value):
+        raise ValidationError(_('At least one share must be positive.'))
+
+
+class TransitTime(models.Model):
+    """
+    How long a shipping method takes to deliver within a zone, as observed
+    """
+    shipping_method = models.ForeignKey(ShippingMethod, on_delete=models.CASCADE, related_name='transit_times')
+    shipping_zone = models.ForeignKey(ShippingZone, on_delete=models.CASCADE, related_name='transit_times')
+    distribution = models.JSONField(
+        _('Distribution'),
+        validators=[validate_distribution],
+        help_text=_('Share of parcels delivered after 0, 1, 2, ... business days, e.g. [0, 0.1, 0.7, 0.2]')
+    )
+
+    class Meta:
+        verbose_name = _('Transit Time')
+        verbose_name_plural = _('Transit Times')
+        unique_together = ('shipping_method', 'shipping_zone')
+
+    def __str__(self):
+        return f"{self.shipping_method} - {self.shipping_zone}"
+
+    def days_for(self, percentile):
+        """
+        Business days within which ``percentile`` of parcels arrive.
+        """
+        total = sum(self.distribution) or 1
+        delivered = 0
+        for days, share in enumerate(self.distribution):
+            delivered += share
+            if delivered / total >= percentile:
+                return days
+        return max(len(self.distribution) - 1, 0)
+
+    @property
+    def earliest_days(self):
+        return next((days for days, share in enumerate(self.distribution) if share), 0)
+
+
+class ShippingHoliday(models.Model):
+    """
+    A day the warehouse does not dispatch or a carrier does not deliver
+    """
+    WAREHOUSE = 'warehouse'
+
+    calendar = models.CharField(
+        _('Calendar'),
+        max_length=30,
+        default=WAREHOUSE,
+        help_text=_('"warehouse", or a carrier code from SHIPPING_CARRIERS')
+    )
+    date = models.DateField(_('Date'))
+    name = models.CharField(_('Name'), max_length=100, blank=True)
+
+    class Meta:
+        verbose_name = _('Shipping Holiday')
+        verbose_name_plural = _('Shipping Holidays')
+        unique_together = ('calendar', 'date')
+        ordering = ['date']
+
+    def __str__(self):
+        return f"{self.name or self.date} ({self.calendar})"
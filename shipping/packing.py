@@ -0,0 +1,192 @@
+"""
+Packing cart contents into parcels.
+
+``pack()`` runs first-fit decreasing over the active ShippingBox sizes: units
+are taken largest first and each goes into the first open parcel with room
+left (by volume and weight, and with every side of the unit fitting the box
+in some orientation), otherwise into a new parcel using the largest box it
+fits. Identical units are placed together, as many at a time as a parcel
+has room for, so the work grows with the number of lines and parcels rather
+than the quantity. Each parcel is then moved to the smallest box that still
+holds its contents. It is a volume heuristic, not a 3D placement, which is what
+carriers' own quoting tools assume too.
+
+A unit that fits no box ships on its own, measured as itself. With no boxes
+configured everything ships as one parcel.
+
+Packings are memoized in the cache under a hash of the contents and the rate
+table version, so re-quoting the same cart never packs it twice.
+"""
+
+import hashlib
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .rates import get_rate_table
+
+CACHE_PREFIX = 'shipping:packing:'
+
+
+class Unit:
+    __slots__ = ('weight', 'dimensions', 'volume')
+
+    def __init__(self, weight, dimensions):
+        self.weight = weight
+        self.dimensions = tuple(sorted(dimensions))
+        self.volume = self.dimensions[0] * self.dimensions[1] * self.dimensions[2]
+
+
+def _fits_in(dimensions, box):
+    return all(side <= limit for side, limit in zip(dimensions, box.sorted_dimensions))
+
+
+class Parcel:
+    """
+    A box and what is in it. ``weight`` includes the empty box and
+    ``volume`` is the box's (or, with no box, the contents').
+    """
+    def __init__(self, box=None, weight=Decimal('0'), volume=Decimal('0')):
+        self.box = box
+        self.contents_weight = weight
+        self.contents_volume = volume
+        self.largest = (Decimal('0'),) * 3
+
+    @property
+    def weight(self):
+        return self.contents_weight + (self.box.empty_weight if self.box else 0)
+
+    @property
+    def volume(self):
+        return self.box.volume if self.box else self.contents_volume
+
+    def holds(self, box, weight, volume, largest):
+        return (
+            volume <= box.volume
+            and (box.max_weight is None or weight <= box.max_weight)
+            and _fits_in(largest, box)
+        )
+
+    def room_for(self, unit, count):
+        """
+        How many of ``count`` copies of ``unit`` fit in the parcel.
+        """
+        box = self.box
+        if box is None or not _fits_in(unit.dimensions, box):
+            return 0
+        if unit.volume:
+            count = min(count, int((box.volume - self.contents_volume) // unit.volume))
+        if unit.weight and box.max_weight is not None:
+            count = min(count, int((box.max_weight - self.contents_weight) // unit.weight))
+        return max(count, 0)
+
+    def add(self, unit, count=1):
+        self.contents_weight += unit.weight * count
+        self.contents_volume += unit.volume * count
+        self.largest = tuple(max(pair) for pair in zip(self.largest, unit.dimensions))
+
+    def as_dict(self):
+        return {
+            'box': self.box.pk if self.box else None,
+            'weight': str(self.weight),
+            'volume': str(self.volume),
+        }
+
+
+class PackedParcel:
+    """
+    A parcel as stored in the cache and on checkout sessions: just what
+    quoting needs.
+    """
+    __slots__ = ('box_id', 'weight', 'volume')
+
+    def __init__(self, box, weight, volume):
+        self.box_id = box
+        self.weight = Decimal(weight)
+        self.volume = Decimal(volume)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['box'], data['weight'], data['volume'])
+
+    def as_dict(self):
+        return {'box': self.box_id, 'weight': str(self.weight), 'volume': str(self.volume)}
+
+    def __repr__(self):
+        return f'<PackedParcel {self.weight} kg {self.volume} cm³>'
+
+
+def first_fit_decreasing(units, boxes):
+    """
+    Pack ``units``, (unit, count) pairs, into parcels using ``boxes``
+    (sorted smallest first).
+    """
+    parcels = []
+    for unit, count in sorted(units, key=lambda pair: (pair[0].volume, pair[0].weight), reverse=True):
+        for parcel in parcels:
+            if not count:
+                break
+            fitted = parcel.room_for(unit, count)
+            if fitted:
+                parcel.add(unit, fitted)
+                count -= fitted
+
+        candidates = [
+            box for box in boxes
+            if Parcel().holds(box, unit.weight, unit.volume, unit.dimensions)
+        ]
+        while count:
+            parcel = Parcel(candidates[-1] if candidates else None)
+            # A unit that fits no box ships on its own
+            fitted = max(parcel.room_for(unit, count), 1)
+            parcel.add(unit, fitted)
+            parcels.append(parcel)
+            count -= fitted
+
+    for parcel in parcels:
+        if parcel.box is not None:
+            parcel.box = next(
+                box for box in boxes
+                if parcel.holds(box, parcel.contents_weight, parcel.contents_volume, parcel.largest)
+            )
+    return parcels
+
+
+def content_key(items, version):
+    source = repr((version, sorted(
+        (str(weight), tuple(str(side) for side in sorted(dimensions)), quantity)
+        for weight, dimensions, quantity in items
+    )))
+    return CACHE_PREFIX + hashlib.sha256(source.encode()).hexdigest()
+
+
+def pack(items):
+    """
+    Pack ``items``, (weight, (length, width, height), quantity) tuples, into
+    a list of ``PackedParcel``.
+    """
+    items = [(Decimal(weight), dimensions, quantity) for weight, dimensions, quantity in items if quantity > 0]
+    if not items:
+        return []
+
+    table = get_rate_table()
+    key = content_key(items, table.version)
+    packed = cache.get(key)
+    if packed is None:
+        if table.boxes:
+            units = [
+                (Unit(weight, [Decimal(side) for side in dimensions]), quantity)
+                for weight, dimensions, quantity in items
+            ]
+            parcels = first_fit_decreasing(units, table.boxes)
+        else:
+            parcel = Parcel()
+            for weight, dimensions, quantity in items:
+                unit = Unit(weight, [Decimal(side) for side in dimensions])
+                parcel.contents_weight += unit.weight * quantity
+                parcel.contents_volume += unit.volume * quantity
+            parcels = [parcel]
+        packed = [parcel.as_dict() for parcel in parcels]
+        cache.set(key, packed, settings.SHIPPING_PACKING_CACHE_TIMEOUT)
+    return [PackedParcel.from_dict(data) for data in packed]
@@ -0,0 +1,269 @@
+"""
+Address validation against a local postal-code reference dataset.
+
+``build_postal_index`` compiles a GeoNames-style postal code dump into one
+index file per country under POSTAL_INDEX_DIR. Each file is a header, an
+array of fixed-size records sorted by normalized postal code, and a table
+of the (deduplicated) strings they point to:
+
+    header   b'PST1', record count, strings offset
+    record   postal key (12 bytes, NUL padded), offsets of the display postal
+             code, place name, state name and state code, latitude, longitude
+    strings  NUL-terminated UTF-8
+
+Files are opened with mmap and searched in place with bisect, so a lookup
+reads a few dozen bytes, whatever the size of the dataset, and the pages
+are shared between worker processes. Countries without an index file are
+not validated.
+
+GeoNames' allCountries.txt only has the leading part of some countries'
+codes (PARTIAL_CODE_COUNTRIES: GB outward codes, CA forward sortation areas,
+...). For those a full code that is not in the index is matched by its
+longest indexed prefix, and kept as the customer entered it. Build from the
+``<country>_full`` files to validate complete codes instead.
+
+Indexes are opened once per process; restart workers after rebuilding them.
+"""
+
+import mmap
+import os
+import struct
+import threading
+import unicodedata
+from bisect import bisect_left, bisect_right
+from decimal import Decimal
+from pathlib import Path
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+
+MAGIC = b'PST1'
+HEADER = struct.Struct('<4sII')
+RECORD = struct.Struct('<12sIIIIff')
+KEY_LENGTH = 12
+
+# Countries allCountries.txt carries truncated postal codes for
+PARTIAL_CODE_COUNTRIES = {'AR', 'CA', 'GB', 'IE', 'MT', 'NL'}
+
+
+def postal_key(postal_code):
+    """
+    The form postal codes are indexed under: upper case, without spaces or
+    dashes. None if it cannot be indexed.
+    """
+    key = ''.join(str(postal_code).split()).replace('-', '').upper()
+    if not key or len(key) > KEY_LENGTH or not key.isascii():
+        return None
+    return key.encode('ascii').ljust(KEY_LENGTH, b'\0')
+
+
+def fold(text):
+    """
+    Text for comparison: accents removed, case folded, punctuation and
+    repeated spaces dropped.
+    """
+    text = unicodedata.normalize('NFKD', str(text))
+    text = ''.join(char for char in text if not unicodedata.combining(char)).casefold()
+    return ' '.join(''.join(char if char.isalnum() else ' ' for char in text).split())
+
+
+class PostalPlace:
+    __slots__ = ('postal_code', 'city', 'state', 'state_code', 'latitude', 'longitude')
+
+    def __init__(self, postal_code, city, state, state_code, latitude, longitude):
+        self.postal_code = postal_code
+        self.city = city
+        self.state = state
+        self.state_code = state_code
+        self.latitude = latitude
+        self.longitude = longitude
+
+    def __repr__(self):
+        return f'<PostalPlace {self.postal_code} {self.city}, {self.state_code or self.state}>'
+
+
+class _Keys:
+    """
+    The record keys of an index as a sequence, for bisect.
+    """
+    def __init__(self, index):
+        self.index = index
+
+    def __len__(self):
+        return self.index.count
+
+    def __getitem__(self, position):
+        start = HEADER.size + position * RECORD.size
+        return self.index.buffer[start:start + KEY_LENGTH]
+
+
+class PostalIndex:
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, self.strings = HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not a postal index')
+        self.keys = _Keys(self)
+
+    def _string(self, offset):
+        start = self.strings + offset
+        return self.buffer[start:self.buffer.find(b'\0', start)].decode()
+
+    def lookup(self, postal_code):
+        """
+        Every place with the given postal code.
+        """
+        key = postal_key(postal_code)
+        if key is None:
+            return []
+        return self._places(key)
+
+    def lookup_prefix(self, postal_code):
+        """
+        Every place with the longest indexed code that ``postal_code``
+        starts with (at least two characters), for truncated datasets.
+        """
+        key = postal_key(postal_code)
+        if key is None:
+            return []
+        code = key.rstrip(b'\0')
+        for length in range(len(code) - 1, 1, -1):
+            places = self._places(code[:length].ljust(KEY_LENGTH, b'\0'))
+            if places:
+                return places
+        return []
+
+    def _places(self, key):
+        places = []
+        for position in range(bisect_left(self.keys, key), bisect_right(self.keys, key)):
+            _key, postal, city, state, state_code, latitude, longitude = RECORD.unpack_from(
+                self.buffer, HEADER.size + position * RECORD.size
+            )
+            places.append(PostalPlace(
+                self._string(postal), self._string(city), self._string(state), self._string(state_code),
+                Decimal(f'{latitude:.4f}'), Decimal(f'{longitude:.4f}'),
+            ))
+        return places
+
+
+def write_postal_index(path, rows):
+    """
+    Write an index of ``rows``, (postal code, place, state, state code,
+    latitude, longitude) tuples. The file is replaced atomically.
+    """
+    strings = {}
+    blob = bytearray()
+
+    def offset(text):
+        if text not in strings:
+            strings[text] = len(blob)
+            blob.extend(text.encode() + b'\0')
+        return strings[text]
+
+    records = []
+    for postal_code, place, state, state_code, latitude, longitude in rows:
+        key = postal_key(postal_code)
+        if key is None:
+            continue
+        records.append((key, fold(place), RECORD.pack(
+            key, offset(postal_code.strip()), offset(place), offset(state), offset(state_code),
+            float(latitude or 0), float(longitude or 0),
+        )))
+    records.sort(key=lambda record: record[:2])
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_suffix('.tmp')
+    with open(temporary, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(records), HEADER.size + len(records) * RECORD.size))
+        for _key, _place, record in records:
+            f.write(record)
+        f.write(blob)
+    os.replace(temporary, path)
+    return len(records)
+
+
+_indexes = {}
+_lock = threading.Lock()
+
+
+def get_postal_index(country):
+    """
+    The index for ``country``, or None if there is no data for it.
+    """
+    country = str(country).upper()
+    try:
+        return _indexes[country]
+    except KeyError:
+        pass
+    with _lock:
+        if country not in _indexes:
+            path = Path(settings.POSTAL_INDEX_DIR) / f'{country}.idx'
+            _indexes[country] = PostalIndex(path) if len(country) == 2 and path.exists() else None
+        return _indexes[country]
+
+
+class AddressCheck:
+    """
+    The outcome of ``validate_address``. ``errors`` maps field names to
+    messages; the other attributes are the normalized values (unchanged if
+    the country has no reference data).
+    """
+    __slots__ = ('known', 'errors', 'postal_code', 'city', 'state', 'latitude', 'longitude')
+
+    def __init__(self, postal_code, city, state, known=False):
+        self.known = known
+        self.errors = {}
+        self.postal_code = postal_code
+        self.city = city
+        self.state = state
+        self.latitude = None
+        self.longitude = None
+
+    @property
+    def is_valid(self):
+        return not self.errors
+
+
+def validate_address(country, postal_code, city='', state=''):
+    """
+    Check that ``postal_code`` exists in ``country`` and that ``city`` and
+    ``state`` (either may be blank) belong to it.
+    """
+    index = get_postal_index(country)
+    check = AddressCheck(postal_code, city, state, known=index is not None)
+    if index is None:
+        return check
+
+    places = index.lookup(postal_code)
+    partial = False
+    if not places and str(country).upper() in PARTIAL_CODE_COUNTRIES:
+        places = index.lookup_prefix(postal_code)
+        partial = bool(places)
+    if not places:
+        check.errors['postal_code'] = _('Unknown postal code for this country.')
+        return check
+
+    if city:
+        matching = [place for place in places if fold(place.city) == fold(city)]
+        if not matching:
+            check.errors['city'] = _('This city does not match the postal code.')
+            return check
+        places = matching
+
+    if state:
+        places = [place for place in places if fold(state) in (fold(place.state), fold(place.state_code))]
+        if not places:
+            check.errors['state'] = _('This state does not match the postal code.')
+            return check
+
+    place = places[0]
+    # The index only has the start of a partially matched code
+    check.postal_code = postal_code.strip() if partial else place.postal_code
+    check.city = place.city
+    # Keep whichever of name and code the customer used
+    check.state = place.state if state and fold(state) == fold(place.state) else place.state_code or place.state
+    check.latitude = place.latitude
+    check.longitude = place.longitude
+    return check
@@ -0,0 +1,168 @@
+"""
+Batch shipping quotes.
+
+Quotes many (country, weight, order total) destinations at once against the
+compiled rate table (see shipping/rates.py). Every rate is flattened into one
+entry per country it serves, and the entries' bounds and prices are kept as
+NumPy arrays, so each batch is evaluated as a few array comparisons over a
+destinations x entries grid instead of a Python loop per destination.
+
+Weights and amounts are converted to integers (thousandths of a weight unit
+and cents), so comparisons and costs are exact for the two decimal places
+rates are stored with.
+"""
+
+from decimal import ROUND_HALF_UP, Decimal
+
+import numpy as np
+
+from .rates import get_rate_table
+
+WEIGHT_SCALE = 1000
+MONEY_SCALE = 100
+
+# Destinations x entries cells evaluated per chunk
+CHUNK_CELLS = 1_000_000
+
+_NO_MIN = np.iinfo(np.int64).min
+_NO_MAX = np.iinfo(np.int64).max
+
+
+def _scaled(value, scale, default):
+    if value is None:
+        return default
+    return int((Decimal(value) * scale).to_integral_value(ROUND_HALF_UP))
+
+
+def _scaled_array(values, scale):
+    """
+    (scaled int64 array, present mask) for a list of numbers or Nones.
+    """
+    floats = np.array([np.nan if value is None else float(value) for value in values], dtype=np.float64)
+    present = ~np.isnan(floats)
+    return np.rint(np.where(present, floats, 0) * scale).astype(np.int64), present
+
+
+class ShippingQuote:
+    __slots__ = ('rate', 'method', 'cost', 'arrives_by')
+
+    def __init__(self, rate, method, cost, arrives_by=None):
+        self.rate = rate
+        self.method = method
+        self.cost = cost
+        self.arrives_by = arrives_by
+
+    def __repr__(self):
+        return f'<ShippingQuote {self.method.name} {self.cost}>'
+
+    def as_dict(self):
+        return {
+            'method_id': self.method.pk,
+            'method': self.method.name,
+            'cost': self.cost,
+            'estimated_days': self.method.estimated_days,
+            'arrives_by': self.arrives_by.isoformat() if self.arrives_by else None,
+        }
+
+
+class QuoteArrays:
+    """
+    The rate table as parallel arrays, one element per (rate, country).
+    """
+    def __init__(self, table):
+        self.table = table
+        self.country_index = {country: index for index, country in enumerate(sorted(table.countries))}
+
+        self.rates = []
+        self.methods = []
+        columns = {name: [] for name in (
+            'country', 'method', 'min_weight', 'max_weight', 'min_total', 'max_total', 'base', 'weight_rate',
+        )}
+        for country, (_lower_bounds, rates) in table.countries.items():
+            for rate in rates:
+                self.rates.append(rate)
+                self.methods.append(rate.shipping_method)
+                columns['country'].append(self.country_index[country])
+                columns['method'].append(rate.shipping_method_id)
+                columns['min_weight'].append(_scaled(rate.min_weight, WEIGHT_SCALE, _NO_MIN))
+                columns['max_weight'].append(_scaled(rate.max_weight, WEIGHT_SCALE, _NO_MAX))
+                columns['min_total'].append(_scaled(rate.min_order_amount, MONEY_SCALE, _NO_MIN))
+                columns['max_total'].append(_scaled(rate.max_order_amount, MONEY_SCALE, _NO_MAX))
+                columns['base'].append(_scaled(rate.base_rate, MONEY_SCALE, 0))
+                # Same rule as ShippingRate.calculate_shipping_cost
+                weighted = rate.shipping_method.calculation_type == 'weight' and rate.weight_rate
+                columns['weight_rate'].append(_scaled(rate.weight_rate, MONEY_SCALE, 0) if weighted else 0)
+        for name, values in columns.items():
+            setattr(self, name, np.array(values, dtype=np.int64))
+
+    def evaluate(self, countries, weights, has_weight, totals, has_total):
+        """
+        Return (destination, entry, cost) arrays for every entry that applies
+        to a destination, cheapest first per destination. Costs are in cents,
+        rounded half up.
+        """
+        country = countries[:, None]
+        weight = weights[:, None]
+        total = totals[:, None]
+
+        applies = country == self.country
+        applies &= ~has_weight[:, None] | ((self.min_weight <= weight) & (weight <= self.max_weight))
+        applies &= ~has_total[:, None] | ((self.min_total <= total) & (total <= self.max_total))
+
+        destinations, entries = np.nonzero(applies)
+        costs = (
+            self.base[entries] * WEIGHT_SCALE
+            + np.where(has_weight[destinations], weights[destinations], 0) * self.weight_rate[entries]
+            + WEIGHT_SCALE // 2
+        ) // WEIGHT_SCALE
+        order = np.lexsort((self.method[entries], costs, destinations))
+        return destinations[order], entries[order], costs[order]
+
+
+_arrays = None
+
+
+def get_quote_arrays():
+    global _arrays
+    table = get_rate_table()
+    if _arrays is None or _arrays.table is not table:
+        _arrays = QuoteArrays(table)
+    return _arrays
+
+
+def quote_many(destinations):
+    """
+    Quote every available shipping method for each destination, as one
+    parcel of the given weight (see ShippingCalculator for packed parcels).
+
+    ``destinations`` is a sequence of (country_code, weight, order_total)
+    tuples; weight and order total may be None to skip that restriction, as
+    with ``ShippingCalculator``. Returns one list of ``ShippingQuote`` per
+    destination, in the same order, cheapest first.
+    """
+    destinations = list(destinations)
+    arrays = get_quote_arrays()
+    results = [[] for _ in destinations]
+    if not destinations or not arrays.rates:
+        return results
+
+    countries = np.array(
+        [arrays.country_index.get(str(country).upper(), -1) for country, _, _ in destinations], dtype=np.int64
+    )
+    weights, has_weight = _scaled_array([weight for _, weight, _ in destinations], WEIGHT_SCALE)
+    totals, has_total = _scaled_array([total for _, _, total in destinations], MONEY_SCALE)
+
+    chunk = max(1, CHUNK_CELLS // len(arrays.rates))
+    amounts = {}
+    for start in range(0, len(destinations), chunk):
+        end = start + chunk
+        found = arrays.evaluate(
+            countries[start:end], weights[start:end], has_weight[start:end],
+            totals[start:end], has_total[start:end],
+        )
+        for destination, entry, cents in zip(*(column.tolist() for column in found)):
+            cost = amounts.get(cents)
+            if cost is None:
+                cost = amounts[cents] = Decimal(cents).scaleb(-2)
+            results[start + destination].append(ShippingQuote(arrays.rates[entry], arrays.methods[entry], cost))
+    return results
@@ -0,0 +1,147 @@
+"""
+The shipping rate table.
+
+Every active rate of every active zone and method is loaded once into a
+``RateTable``: for each country, its rates sorted by the lower bound of their
+weight interval, so quoting a basket is a bisect and a few comparisons in
+memory instead of a zone query and a rate query per call. The active packing
+boxes are loaded with them.
+
+Each process keeps its own compiled table. Saving or deleting a zone, method,
+rate or box (or a transit time or holiday, for the delivery table built on
+top of it) writes a new version to the cache (Redis in production); processes
+compare their table's version with it at most every
+SHIPPING_RATE_TABLE_CHECK_INTERVAL seconds and recompile when it changed.
+Changes made without signals (``update()``, ``bulk_create()``) must call
+``invalidate_rate_table()`` themselves.
+"""
+
+import threading
+import time
+from bisect import bisect_right
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import ShippingBox, ShippingMethod, ShippingRate, ShippingZoneCountry
+
+VERSION_CACHE_KEY = 'shipping:rate-table:version'
+
+
+def _fits(value, low, high):
+    return (low is None or low <= value) and (high is None or value <= high)
+
+
+class RateTable:
+    def __init__(self, rates, methods, memberships, boxes=(), version=None):
+        """
+        ``memberships`` is an iterable of (zone id, country code) pairs.
+        """
+        self.version = version
+        self.methods = {method.pk: method for method in methods}
+        self.rates_by_id = {rate.pk: rate for rate in rates}
+        # Packing boxes (see shipping.packing), smallest first
+        self.boxes = sorted(boxes, key=lambda box: (box.volume, box.pk))
+        for box in self.boxes:
+            box.sorted_dimensions = tuple(sorted((box.length, box.width, box.height)))
+        rates_by_zone = {}
+        for rate in rates:
+            rates_by_zone.setdefault(rate.shipping_zone_id, []).append(rate)
+        by_country = {}
+        for zone_id, country in memberships:
+            by_country.setdefault(country, []).extend(rates_by_zone.get(zone_id, ()))
+        self.countries = {}
+        for country, country_rates in by_country.items():
+            country_rates.sort(key=lambda rate: (
+                rate.min_weight if rate.min_weight is not None else Decimal('0'),
+                rate.shipping_method_id,
+                rate.pk,
+            ))
+            lower_bounds = [
+                rate.min_weight if rate.min_weight is not None else Decimal('0')
+                for rate in country_rates
+            ]
+            self.countries[country] = (lower_bounds, country_rates)
+
+    @classmethod
+    def compile(cls, version=None):
+        rates = ShippingRate.objects.filter(
+            shipping_method__is_active=True,
+            shipping_zone__is_active=True,
+        ).select_related('shipping_method', 'shipping_zone').order_by('pk')
+        methods = ShippingMethod.objects.filter(is_active=True)
+        memberships = ShippingZoneCountry.objects.filter(
+            zone__is_active=True
+        ).values_list('zone_id', 'country')
+        boxes = ShippingBox.objects.filter(is_active=True)
+        return cls(list(rates), list(methods), list(memberships), list(boxes), version=version)
+
+    def rates(self, country_code, weight=None, order_total=None):
+        """
+        Rates for a destination whose weight and order total intervals
+        contain ``weight`` and ``order_total`` (either may be None to skip
+        that check).
+        """
+        lower_bounds, rates = self.countries.get(country_code, ((), ()))
+        if weight is not None:
+            # Only rates starting at or below the weight can contain it
+            rates = rates[:bisect_right(lower_bounds, weight)]
+            rates = [rate for rate in rates if _fits(weight, rate.min_weight, rate.max_weight)]
+        if order_total is not None:
+            rates = [
+                rate for rate in rates
+                if _fits(order_total, rate.min_order_amount, rate.max_order_amount)
+            ]
+        return list(rates)
+
+    def method(self, shipping_method_id):
+        return self.methods.get(shipping_method_id)
+
+    def rate(self, rate_id):
+        return self.rates_by_id.get(rate_id)
+
+
+_table = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def _current_version():
+    version = cache.get(VERSION_CACHE_KEY)
+    if version is None:
+        version = str(time.time_ns())
+        # Another process may have got there first; use whichever won
+        if not cache.add(VERSION_CACHE_KEY, version, None):
+            version = cache.get(VERSION_CACHE_KEY, version)
+    return version
+
+
+def get_rate_table():
+    """
+    This process's compiled rate table, recompiled if another process
+    invalidated it since the last check.
+    """
+    global _table, _checked_at
+
+    now = time.monotonic()
+    if _table is not None and now - _checked_at < settings.SHIPPING_RATE_TABLE_CHECK_INTERVAL:
+        return _table
+
+    with _lock:
+        if _table is not None and now - _checked_at < settings.SHIPPING_RATE_TABLE_CHECK_INTERVAL:
+            return _table
+        version = _current_version()
+        if _table is None or _table.version != version:
+            _table = RateTable.compile(version=version)
+        _checked_at = now
+    return _table
+
+
+def invalidate_rate_table():
+    """
+    Make every process recompile its rate table on its next check.
+    """
+    global _table
+    cache.set(VERSION_CACHE_KEY, str(time.time_ns()), None)
+    _table = None
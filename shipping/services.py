@@ -1,14 +1,46 @@
-from decimal import Decimal
+import hashlib
+from decimal import ROUND_HALF_UP, Decimal
 from typing import List, Optional
-from django.db.models import Q
-from .models import ShippingZone, ShippingMethod, ShippingRate
+
+from django.conf import settings
+from django.core.cache import cache
+
+from monitoring.metrics import registry
+from .delivery import delivery_estimates, get_delivery_table
+from .models import ShippingRate
+from .quotes import MONEY_SCALE, WEIGHT_SCALE, ShippingQuote, _scaled
+from .rates import get_rate_table
+
+QUOTE_CACHE_PREFIX = 'shipping:quotes:'
+
+
+def round_cost(cost):
+    """
+    A shipping cost to the cent, the same way wherever it is shown or charged.
+    """
+    return Decimal(str(cost)).quantize(Decimal('0.01'), ROUND_HALF_UP)
+
 
 class ShippingCalculator:
     """
-    Service class for calculating shipping rates and finding available shipping methods
+    Service class for calculating shipping rates and finding available shipping methods.
+
+    Lookups use the compiled rate table (see shipping/rates.py) and do not
+    query the database.
+
+    Pass ``parcels`` (from shipping.packing.pack) to quote each parcel
+    separately at its billable weight instead of one parcel of ``weight``.
+
+    ``get_quotes()`` results are cached for SHIPPING_QUOTE_CACHE_TIMEOUT
+    seconds under the basket's fingerprint and the rate table version, so
+    any rate change starts a new set of keys.
     """
-    def __init__(self, country_code: str, weight: Optional[Decimal] = None, order_total: Optional[Decimal] = None):
+    def __init__(self, country_code: str, weight: Optional[Decimal] = None, order_total: Optional[Decimal] = None,
+                 parcels: Optional[list] = None):
         self.country_code = country_code.upper()
+        self.parcels = parcels
+        if weight is None and parcels:
+            weight = sum(parcel.weight for parcel in parcels)
         self.weight = Decimal(str(weight)) if weight is not None else None
         self.order_total = Decimal(str(order_total)) if order_total is not None else None
 
@@ -16,61 +48,98 @@ class ShippingCalculator:
         """
         Get all available shipping rates for the given parameters
         """
-        # Find zones that include this country
-        zones = ShippingZone.objects.filter(
-            is_active=True,
-            countries__contains=[self.country_code]
+        table = get_rate_table()
+        if not self.parcels:
+            return table.rates(self.country_code, weight=self.weight, order_total=self.order_total)
+        return [
+            rate for rate in table.rates(self.country_code, order_total=self.order_total)
+            if rate.calculate_parcels_cost(self.parcels, self.order_total) is not None
+        ]
+
+    def fingerprint(self):
+        """
+        What the quotes depend on besides the rate table: the country, and
+        the weight (to the gram), parcels and order total (to the cent).
+        """
+        parcels = sorted(
+            (_scaled(parcel.weight, WEIGHT_SCALE, None), _scaled(parcel.volume, 1, None))
+            for parcel in self.parcels or ()
         )
+        return repr((
+            self.country_code,
+            _scaled(self.weight, WEIGHT_SCALE, None),
+            _scaled(self.order_total, MONEY_SCALE, None),
+            parcels,
+        ))
+
+    def get_quotes(self) -> List[ShippingQuote]:
+        """
+        Available shipping methods with their cost, cheapest first
+        """
+        quotes = self._priced_quotes()
+        # Dates move daily, so they are added after the cache
+        arrival = {estimate.method.pk: estimate.arrives_by for estimate in self.get_delivery_estimates()}
+        for quote in quotes:
+            quote.arrives_by = arrival.get(quote.method.pk)
+        return quotes
+
+    def _priced_quotes(self):
+        table = get_rate_table()
+        source = repr((table.version, self.fingerprint()))
+        key = QUOTE_CACHE_PREFIX + hashlib.sha256(source.encode()).hexdigest()
 
-        # Get rates for these zones
-        rates = ShippingRate.objects.filter(
-            shipping_zone__in=zones,
-            shipping_method__is_active=True
-        ).select_related('shipping_method', 'shipping_zone')
+        cached = cache.get(key)
+        quotes = None
+        if cached is not None:
+            quotes = [
+                ShippingQuote(table.rate(entry['rate_id']), table.method(entry['method_id']), entry['cost'])
+                for entry in cached
+            ]
+            # Only a table recompiled under the same version could miss one
+            if not all(quote.rate is not None and quote.method is not None for quote in quotes):
+                quotes = None
+        registry.record_cache_lookup('shipping_quotes', quotes is not None)
 
-        # Filter by weight if provided
-        if self.weight is not None:
-            rates = rates.filter(
-                Q(min_weight__isnull=True) | Q(min_weight__lte=self.weight),
-                Q(max_weight__isnull=True) | Q(max_weight__gte=self.weight)
-            )
+        if quotes is None:
+            quotes = self._compute_quotes()
+            cache.set(key, [
+                {**quote.as_dict(), 'rate_id': quote.rate.pk} for quote in quotes
+            ], settings.SHIPPING_QUOTE_CACHE_TIMEOUT)
+        return quotes
 
-        # Filter by order total if provided
-        if self.order_total is not None:
-            rates = rates.filter(
-                Q(min_order_amount__isnull=True) | Q(min_order_amount__lte=self.order_total),
-                Q(max_order_amount__isnull=True) | Q(max_order_amount__gte=self.order_total)
-            )
+    def _compute_quotes(self):
+        quotes = []
+        for rate in self.get_available_rates():
+            cost = self._rate_cost(rate)
+            if cost is not None:
+                quotes.append(ShippingQuote(rate, rate.shipping_method, round_cost(cost)))
+        return sorted(quotes, key=lambda quote: (quote.cost, quote.method.pk))
 
-        return rates
+    def _rate_cost(self, rate):
+        if self.parcels:
+            return rate.calculate_parcels_cost(self.parcels, self.order_total)
+        return rate.calculate_shipping_cost(weight=self.weight, order_total=self.order_total)
 
     def calculate_cost(self, shipping_method_id: int) -> Optional[Decimal]:
         """
-        Calculate shipping cost for a specific shipping method
+        Calculate shipping cost for a specific shipping method: its cheapest
+        quote, from the same rates (weight and order total intervals
+        included) as get_quotes(), so the charge is what was shown
         """
-        try:
-            rate = ShippingRate.objects.get(
-                shipping_method_id=shipping_method_id,
-                shipping_method__is_active=True,
-                shipping_zone__is_active=True,
-                shipping_zone__countries__contains=[self.country_code]
-            )
-            return rate.calculate_shipping_cost(
-                weight=self.weight,
-                order_total=self.order_total
-            )
-        except ShippingRate.DoesNotExist:
-            return None
+        for quote in self._priced_quotes():
+            if quote.method.pk == shipping_method_id:
+                return quote.cost
+        return None
 
     def get_estimated_delivery_days(self, shipping_method_id: int) -> Optional[int]:
         """
-        Get estimated delivery days for a shipping method
+        Business days in transit that a shipping method promises to this
+        country (see shipping/delivery.py)
+        """
+        return get_delivery_table().promised_days(self.country_code, shipping_method_id)
+
+    def get_delivery_estimates(self):
+        """
+        Earliest and arrives-by dates of every available method, soonest first
         """
-        try:
-            method = ShippingMethod.objects.get(
-                id=shipping_method_id,
-                is_active=True
-            )
-            return method.estimated_days
-        except ShippingMethod.DoesNotExist:
-            return None
\ No newline at end of file
+        return delivery_estimates(self.country_code)
@@ -0,0 +1,17 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import ShippingBox, ShippingHoliday, ShippingMethod, ShippingRate, ShippingZone, TransitTime
+from .rates import invalidate_rate_table
+
+
+@receiver([post_save, post_delete], sender=ShippingZone)
+@receiver([post_save, post_delete], sender=ShippingMethod)
+@receiver([post_save, post_delete], sender=ShippingRate)
+@receiver([post_save, post_delete], sender=ShippingBox)
+@receiver([post_save, post_delete], sender=TransitTime)
+@receiver([post_save, post_delete], sender=ShippingHoliday)
+def rates_changed(sender, **kwargs):
+    # After commit, so other processes cannot recompile from the old rows
+    transaction.on_commit(invalidate_rate_table)
@@ -10,4 +10,5 @@ urlpatterns = [
     path('addresses/<int:pk>/delete/', views.shipping_address_delete, name='address_delete'),
     path('addresses/<int:pk>/set-default/', views.set_default_address, name='set_default_address'),
     path('select-method/', views.select_shipping_method, name='select_method'),
-]
\ No newline at end of file
+    path('quotes/', views.shipping_quotes, name='quotes'),
+]
@@ -1,11 +1,20 @@
+import json
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.http import JsonResponse
 from django.utils.translation import gettext_lazy as _
 from django.urls import reverse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 
-from .models import ShippingAddress
+from .delivery import COUNTRY_SESSION_KEY
+from .models import ShippingAddress, ShippingMethod
 from .forms import ShippingAddressForm, ShippingMethodForm
+from .quotes import quote_many
 from checkout.models import CheckoutSession
 
 @login_required
@@ -68,8 +77,7 @@ def shipping_address_delete(request, pk):
 @login_required
 def set_default_address(request, pk):
     address = get_object_or_404(ShippingAddress, pk=pk, user=request.user)
-    address.is_default = True
-    address.save()
+    address.make_default()
     messages.success(request, _('Default shipping address updated.'))
     return redirect('shipping:address_list')
 
@@ -78,28 +86,95 @@ def select_shipping_method(request):
         user=request.user if request.user.is_authenticated else None,
         session_key=request.session.session_key,
         status='pending'
-    ).first()
+    ).select_related('shipping_address').first()
 
     if not checkout_session or not checkout_session.shipping_address:
         messages.error(request, _('Please select a shipping address first.'))
-        return redirect('checkout:shipping_address')
+        return redirect('shipping:address_list')
 
-    available_methods = checkout_session.get_available_shipping_methods()
+    # Delivery estimates on product listings use this country from now on
+    country = checkout_session.shipping_address.country
+    if request.session.get(COUNTRY_SESSION_KEY) != country:
+        request.session[COUNTRY_SESSION_KEY] = country
+
+    # Quoted from the session's cart snapshot and the compiled rate table
+    quotes = checkout_session.get_shipping_quotes()
+    available_methods = ShippingMethod.objects.filter(pk__in=[quote.method.pk for quote in quotes])
 
     if request.method == 'POST':
         form = ShippingMethodForm(request.POST, available_methods=available_methods)
         if form.is_valid():
             checkout_session.shipping_method = form.cleaned_data['shipping_method']
+            checkout_session.save(update_fields=['shipping_method', 'updated_at'])
             checkout_session.calculate_shipping_cost()
-            checkout_session.save()
-            return redirect('checkout:payment')
+            return redirect('checkout:checkout')
     else:
         form = ShippingMethodForm(
             available_methods=available_methods,
-            initial={'shipping_method': checkout_session.shipping_method}
+            initial={'shipping_method': checkout_session.shipping_method_id}
         )
 
     return render(request, 'shipping/select_method.html', {
         'form': form,
+        'quotes': quotes,
         'checkout_session': checkout_session
     })
+
+
+# Weights and totals are stored with max_digits=10, decimal_places=2
+MAX_DESTINATION_VALUE = Decimal('100000000')
+
+
+def _parse_amount(name, value):
+    if value is None:
+        return None
+    amount = Decimal(str(value))
+    # NaN would read as "not given" and skip the rate limits; huge values overflow int64
+    if not amount.is_finite() or not 0 <= amount < MAX_DESTINATION_VALUE:
+        raise ValueError(f'Invalid {name}: {value!r}')
+    return amount
+
+
+def _parse_destination(entry):
+    country = entry['country']
+    if not isinstance(country, str) or len(country) != 2:
+        raise ValueError(f'Invalid country: {country!r}')
+    return (
+        country.upper(),
+        _parse_amount('weight', entry.get('weight')),
+        _parse_amount('order_total', entry.get('order_total')),
+    )
+
+
+# Read-only and anonymous, so it is open to marketplace integrations without a CSRF token
+@csrf_exempt
+@require_POST
+def shipping_quotes(request):
+    """
+    Quote shipping for many destinations at once. Expects a JSON body like
+    ``{"destinations": [{"country": "US", "weight": "2.5", "order_total": "40"}]}``
+    and returns the available methods and costs for each, cheapest first.
+    """
+    try:
+        entries = json.loads(request.body)['destinations']
+        destinations = [_parse_destination(entry) for entry in entries]
+    except (ValueError, KeyError, TypeError, InvalidOperation) as e:
+        return JsonResponse({'error': f'Invalid request: {e}'}, status=400)
+
+    if len(destinations) > settings.SHIPPING_QUOTE_MAX_DESTINATIONS:
+        return JsonResponse({
+            'error': f'At most {settings.SHIPPING_QUOTE_MAX_DESTINATIONS} destinations per request'
+        }, status=400)
+
+    results = quote_many(destinations)
+    return JsonResponse({
+        'quotes': [
+            {
+                'country': country,
+                'weight': weight,
+                'order_total': order_total,
+                'methods': [quote.as_dict() for quote in quotes],
+            }
+            for (country, weight, order_total), quotes in zip(destinations, results)
+        ]
+    })